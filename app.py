@@ -12,6 +12,9 @@ from models import AgentProfile, TurnRecord, AgentState
 from agent import Agent
 from memory_stream import MemoryStream
 from speaker_selector import SpeakerSelector
+from neon_spatial import SpatialGrid
+from sim_clock import SimClock
+import sim_clock
 import config
 
 # Page Config
@@ -95,7 +98,12 @@ if "transcript" not in st.session_state:
 if "turn_idx" not in st.session_state:
     st.session_state.turn_idx = 0
 if "selector" not in st.session_state:
-    st.session_state.selector = SpeakerSelector()
+    st.session_state.selector = SpeakerSelector(seed=config.SIM_SEED)
+if "clock" not in st.session_state:
+    st.session_state.clock = SimClock(config.SIM_SECONDS_PER_TURN, tick=st.session_state.turn_idx)
+# Memories are stamped and scored in turn time; opening a MemoryStream moves the
+# clock past memories stored by earlier sessions (see MemoryStream._load_index)
+sim_clock.set_clock(st.session_state.clock)
 
 def add_agent(name, traits, goal):
     if name in st.session_state.agents:
@@ -134,6 +142,17 @@ def init_default_agents():
 # Auto-initialize handled in Sidebar after API Key check
 
 # --- Simulation Logic ---
+def get_spatial_grid(agents):
+    """Return the session's spatial index, rebuilding it if the cast changed."""
+    grid = st.session_state.get("spatial_grid")
+    # Same count is not enough: an agent may have been swapped for another
+    if grid is None or grid.names() != agents.keys():
+        grid = SpatialGrid(cell_size=config.INTERACTION_RADIUS)
+        for name, agent in agents.items():
+            grid.insert(name, agent.state.x, agent.state.y)
+        st.session_state.spatial_grid = grid
+    return grid
+
 def run_simulation_step():
     agents = st.session_state.agents
     active_names = list(agents.keys())
@@ -160,6 +179,8 @@ def run_simulation_step():
                 st.error("Model reload failed. Please restart the app completely.")
                 return
             
+    grid = get_spatial_grid(agents)
+
     # 1. Move All Agents
     agent_positions = []
     for name, agent in agents.items():
@@ -169,6 +190,7 @@ def run_simulation_step():
             
         agent.state.current_action = "MOVING"
         agent.move()
+        grid.move(name, agent.state.x, agent.state.y)
         agent_positions.append({"name": name, "x": agent.state.x, "y": agent.state.y})
     
     # 2. Check Proximity (Who met whom?)
@@ -183,18 +205,15 @@ def run_simulation_step():
             continue
             
         group = [name_a]
-        agent_a = agents[name_a]
+        order_a = grid.order_of(name_a)
         
-        for name_b in active_names[i+1:]:
-            if name_b in processed:
+        # Only agents in adjacent grid cells are distance-checked
+        for name_b in grid.neighbors(name_a, config.INTERACTION_RADIUS):
+            if name_b in processed or grid.order_of(name_b) < order_a:
                 continue
             
-            agent_b = agents[name_b]
-            dist = ((agent_a.state.x - agent_b.state.x)**2 + (agent_a.state.y - agent_b.state.y)**2)**0.5
-            
-            if dist <= config.INTERACTION_RADIUS:
-                group.append(name_b)
-                processed.add(name_b)
+            group.append(name_b)
+            processed.add(name_b)
         
         if len(group) >= 2:
             interacting_groups.append(group)
@@ -221,6 +240,7 @@ def run_simulation_step():
 
     # Increment global time regardless
     st.session_state.turn_idx += 1
+    st.session_state.clock.advance()
 
 def run_conversation_turn(active_agent_names):
     agents = st.session_state.agents
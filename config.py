@@ -11,6 +11,17 @@ DEFAULT_TEMPERATURE = 0.7
 # Memory Settings
 TOP_N_RETRIEVAL = 20  # Fetch 20 from Vector DB
 K_FINAL_RETRIEVAL = 5  # Return top 5 after reranking
+RETRIEVAL_CACHE_SIZE = 64  # Per-agent cached vector searches (0 = off)
+
+# Retrieval Modes (metadata pre-filters, see models.RetrievalFilter)
+RETRIEVAL_MODE = "all"  # Default mode of MemoryStream.retrieve
+RETRIEVAL_MODES = {
+    "all": {},
+    "important": {"min_importance": 6},
+    "recent": {"within_hours": 24},
+    "reflections": {"memory_types": ["reflection"]},
+}
+RETRIEVAL_MAX_WIDENINGS = 3  # Filter relaxations tried when a query finds fewer than k memories
 
 # Scoring Weights
 WEIGHT_SIMILARITY = 1.0
@@ -20,11 +31,47 @@ WEIGHT_IMPORTANCE = 1.0
 # Decay Factor for Recency
 DECAY_FACTOR = 0.995
 
+# Simulation Clock
+SIM_SECONDS_PER_TURN = 900  # Sim time per classic turn (memories are stamped in sim time)
+DECAY_TABLE_TICKS = 4096  # Recency lookup table length, in turns of age
+
+# Reproducibility
+SIM_SEED = None  # Seed for speaker selection and mock LLM (None = nondeterministic)
+
 # Reflection
 REFLECTION_PERIOD = 5  # Reflect every 5 turns
 
+# Memory Consolidation
+CONSOLIDATE_MEMORIES = False  # Merge evicted memories into a rolling summary memory
+CONSOLIDATION_BATCH = 5  # Evicted memories merged per summarizer call
+SUMMARY_IMPORTANCE = 8  # Importance of the summary memory
+SUMMARY_MAX_CHARS = 400  # Summary length cap
+
+# Vector Store
+VECTOR_BACKEND = "chroma"  # "chroma" (on-disk ChromaDB) or "numpy" (in-process matrix)
+NUMPY_PERSIST_DIR = None  # Save NumPy stores here with np.save (None = in-memory only)
+WRITE_BEHIND = False  # Queue memory writes for a background worker (flushed before retrieve)
+WRITE_QUEUE_SIZE = 256  # Per-agent queued memories before add_memory blocks
+WRITE_RETRY_DELAY_S = 0.5  # First retry of a failed background flush (doubles per failure)
+WRITE_RETRY_MAX_DELAY_S = 30.0  # Retry delay cap
+
 # Paths
 CHROMA_PERSIST_DIR = os.path.join(os.getcwd(), "storage", "chroma")
+SHARED_COLLECTION = False  # Keep every agent's memories in one collection (filtered by "agent")
+SHARED_COLLECTION_NAME = "memories"
+
+# Embedding Cache
+EMBEDDING_CACHE = True  # Reuse embeddings of repeated text (keyed by content hash)
+# Per-user cache directory, so runs from any working directory share it and leave no files behind
+EMBEDDING_CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                    "sitcom-simulator", "embeddings.sqlite3")
+EMBEDDING_CACHE_SIZE = 50000  # LRU cap (entries)
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"  # Cache key namespace for the default embedder
+
+# Embedder
+EMBEDDER = "default"  # "default" (all-MiniLM via Chroma) or "hashing" (offline n-gram hashing)
+HASH_EMBEDDING_DIM = 512
+HASH_NGRAM_RANGE = (3, 4)  # Character n-gram lengths
 
 # Map Settings
 MAP_SIZE = 20  # 20x20 grid
@@ -0,0 +1,161 @@
+"""
+embedding_cache.py
+Persistent, content-addressed embedding cache (SQLite, size-bounded LRU).
+"""
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from utils import get_hash
+import config
+
+# texts -> one vector per text
+Embedder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by (model name, SHA256 of the text).
+    Repeated text costs one lookup instead of a model forward pass; the
+    least recently used entries of this model are dropped beyond
+    max_entries (other models sharing the file keep their own budget).
+    Hits only update recency in memory: it is written back (and the
+    database committed) when new entries are stored, on flush and on close.
+    """
+
+    def __init__(self, path: str = config.EMBEDDING_CACHE_PATH,
+                 model_name: str = config.EMBEDDING_MODEL_NAME,
+                 max_entries: int = config.EMBEDDING_CACHE_SIZE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+        """)
+        self._conn.execute("DROP INDEX IF EXISTS embeddings_lru")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_model_lru ON embeddings (model, last_used)")
+        self._conn.commit()
+        # Logical clock for LRU order
+        self._clock = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()[0]
+        self._size = self._count()
+        self._touched: Dict[str, int] = {}  # hash -> last_used not yet written back
+
+    def __len__(self) -> int:
+        return self._size
+
+    def embed(self, texts: List[str], embedder: Embedder) -> List[List[float]]:
+        """
+        Embeddings for texts, calling embedder once for all cache misses.
+        """
+        keys = [get_hash(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+
+        with self._lock:
+            found = self._lookup(unique)
+            missing = [key for key in unique if key not in found]
+            # Every text not sent to the model counts as a hit (repeats in one batch too)
+            self.hits += len(keys) - len(missing)
+
+            self._clock += 1
+            for key in found:
+                self._touched[key] = self._clock
+
+            if missing:
+                first_text = {}
+                for key, text in zip(keys, texts):
+                    first_text.setdefault(key, text)
+                vectors = embedder([first_text[key] for key in missing])
+                for key, vector in zip(missing, vectors):
+                    found[key] = np.asarray(vector, dtype=np.float32)
+                self.misses += len(missing)
+                self._store({key: found[key] for key in missing})
+                self._evict()
+                self._conn.commit()
+
+        return [found[key].tolist() for key in keys]
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [self.model_name, *chunk]
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _store(self, vectors: Dict[str, np.ndarray]) -> None:
+        self._size += self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(self.model_name, key, vector.tobytes(), self._clock) for key, vector in vectors.items()]
+        ).rowcount
+
+    def _count(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+        ).fetchone()[0]
+
+    def _write_touched(self) -> None:
+        """Write hit recency back to the database."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                [(last_used, self.model_name, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        if self._size <= self.max_entries:
+            return
+        # Another cache on the same file may have stored or evicted entries
+        self._size = self._count()
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._write_touched()  # Evict by up-to-date recency
+            self._size -= self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings WHERE model = ? ORDER BY last_used LIMIT ?)",
+                (self.model_name, excess)
+            ).rowcount
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        """Hit/miss counters since this cache was opened, plus current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "size": len(self),
+            "max_entries": self.max_entries
+        }
+
+    def flush(self) -> None:
+        """Write hit recency back and commit."""
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
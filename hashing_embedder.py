@@ -0,0 +1,74 @@
+"""
+hashing_embedder.py
+Offline, deterministic text embedder (hashed character n-grams).
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+import config
+
+# 64-bit FNV-1a parameters
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+# Texts hashed per pass (bounds the dense accumulator to CHUNK x dim)
+_CHUNK = 4096
+
+# Marks text boundaries so prefixes and suffixes get their own n-grams
+_START, _END = "\x02", "\x03"
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder: every character n-gram of the lower-cased text
+    is hashed (FNV-1a over code points) into one of dim buckets with a +-1
+    sign, and rows are L2-normalized. No model files, same output on every
+    machine, and a whole batch is hashed with a few array operations.
+    """
+    # Hashing is cheaper than a cache lookup, so MemoryStream skips the embedding cache
+    cacheable = False
+
+    def __init__(self, dim: int = config.HASH_EMBEDDING_DIM,
+                 ngram_range: Tuple[int, int] = config.HASH_NGRAM_RANGE):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    @property
+    def model_name(self) -> str:
+        """Embedding cache namespace (changes with the parameters)."""
+        return f"hashing-{self.dim}-{self.ngram_range[0]}-{self.ngram_range[1]}"
+
+    def __call__(self, input: List[str]) -> np.ndarray:
+        texts = [f"{_START}{text.lower()}{_END}" for text in input]
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), _CHUNK):
+            vectors[start:start + _CHUNK] = self._embed_chunk(texts[start:start + _CHUNK])
+        return vectors
+
+    def _embed_chunk(self, texts: List[str]) -> np.ndarray:
+        """Normalized vectors for boundary-marked texts, hashed in one pass."""
+        codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        ends = np.cumsum(lengths)[doc]  # End offset of each position's text
+
+        counts = np.zeros(len(texts) * self.dim, dtype=np.float64)
+        positions = np.arange(len(codes))
+        for size in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            m = len(codes) - size + 1
+            if m <= 0:
+                continue
+            hashes = np.full(m, _FNV_OFFSET, dtype=np.uint64)
+            for j in range(size):
+                hashes = (hashes ^ codes[j:j + m]) * _FNV_PRIME  # Wraps mod 2**64
+
+            valid = positions[:m] + size <= ends[:m]  # n-gram stays inside its text
+            hashes = hashes[valid]
+            buckets = (hashes % np.uint64(self.dim)).astype(np.int64)
+            signs = 1.0 - 2.0 * (hashes >> np.uint64(63)).astype(np.float64)
+            counts += np.bincount(doc[:m][valid] * self.dim + buckets, weights=signs,
+                                  minlength=len(counts))
+
+        vectors = counts.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
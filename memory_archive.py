@@ -0,0 +1,113 @@
+"""
+memory_archive.py
+Bulk export / import of agent memories as one columnar .npz file.
+
+Embeddings travel with the memories, so importing an archive (e.g. to
+warm-start many experiments from the same seeded cast) writes straight
+into the vector store without re-embedding anything.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from memory_stream import MemoryStream, Summarizer, created_timestamp
+
+FORMAT_VERSION = 1
+
+# Text columns, each stored as UTF-8 bytes plus row offsets
+_STRING_COLUMNS = ("agent", "id", "document", "type", "created_at", "source", "tags")
+
+def _pack(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _unpack(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+def export_memories(streams: Dict[str, MemoryStream], path: str) -> int:
+    """
+    Write every stream's memories (summary included), metadata and
+    embeddings to path as an uncompressed .npz. Returns the number of rows.
+    """
+    columns = {name: [] for name in _STRING_COLUMNS}
+    created_ts, importance, embeddings = [], [], []
+    model_names = {stream.model_name for stream in streams.values()}
+    if len(model_names) > 1:
+        raise ValueError(f"Streams use different embedders: {sorted(model_names)}")
+
+    for agent_name, stream in streams.items():
+        rows = stream.dump()
+        for memory_id, document, meta in zip(rows["ids"], rows["documents"], rows["metadatas"]):
+            columns["agent"].append(agent_name)
+            columns["id"].append(memory_id)
+            columns["document"].append(document)
+            columns["type"].append(meta["type"])
+            columns["created_at"].append(str(meta.get("created_at", "")))
+            columns["source"].append(meta.get("source", ""))
+            columns["tags"].append(meta.get("tags", ""))
+            created_ts.append(created_timestamp(meta))
+            importance.append(meta["importance"])
+        if len(rows["ids"]):
+            embeddings.append(rows["embeddings"])
+
+    arrays = {
+        "format_version": np.array(FORMAT_VERSION),
+        "model": np.array(model_names.pop() if model_names else ""),
+        "created_ts": np.array(created_ts, dtype=np.float64),
+        "importance": np.array(importance, dtype=np.int8),
+        "embedding": np.concatenate(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+    }
+    for name, values in columns.items():
+        arrays[f"{name}_data"], arrays[f"{name}_offsets"] = _pack(values)
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return len(created_ts)
+
+def import_memories(path: str, agent_names: Optional[List[str]] = None,
+                    summarizer: Optional[Summarizer] = None, shared: Optional[bool] = None,
+                    backend: Optional[str] = None) -> Dict[str, MemoryStream]:
+    """
+    Open streams for agent_names (default: every agent in the archive) and
+    replace their memories with the archived rows, stored embeddings included.
+    The archive must come from the embedder the streams use.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported memory archive version: {int(data['format_version'])}")
+        model_name = str(data["model"])
+        columns = {name: _unpack(data[f"{name}_data"], data[f"{name}_offsets"]) for name in _STRING_COLUMNS}
+        created_ts = data["created_ts"].tolist()
+        importance = data["importance"].tolist()
+        embeddings = data["embedding"]
+
+    rows: Dict[str, List[int]] = {}
+    for i, agent_name in enumerate(columns["agent"]):
+        rows.setdefault(agent_name, []).append(i)
+
+    streams = MemoryStream.open_many(agent_names or list(rows), summarizer, shared, backend)
+    for stream in streams.values():
+        if rows and stream.model_name != model_name:
+            raise ValueError(f"Archive was embedded with {model_name}, stream uses {stream.model_name}")
+
+    MemoryStream.load_many(streams, {
+        agent_name: (
+            [columns["id"][i] for i in indices],
+            [columns["document"][i] for i in indices],
+            [{
+                "type": columns["type"][i],
+                "created_at": columns["created_at"][i],
+                "created_ts": created_ts[i],
+                "importance": importance[i],
+                "source": columns["source"][i],
+                "tags": columns["tags"][i]
+            } for i in indices],
+            embeddings[indices]
+        )
+        for agent_name, indices in rows.items() if agent_name in streams
+    })
+    return streams
@@ -2,157 +2,745 @@
 memory_stream.py
 Handling ChromaDB interaction and retrieval logic.
 """
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
+from collections import OrderedDict
+from contextlib import ExitStack
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+import atexit
+import heapq
+import itertools
+import json
+import logging
+import queue
+import threading
 import uuid
 
-from models import Memory, ScoredMemory
-from utils import get_hash, cosine_similarity, normalize_score
+import numpy as np
+
+from models import Memory, RetrievalFilter, ScoredMemory
+from embedding_cache import EmbeddingCache
+from vector_backend import open_backend
+from hashing_embedder import HashingEmbedder
+from utils import get_hash, cosine_similarity, normalize_score, top_k_indices
 import scoring
+import sim_clock
+import prompts
 import config
 
+logger = logging.getLogger(__name__)
+
+# (previous summary, evicted memory texts) -> new summary
+Summarizer = Callable[[str, List[str]], str]
+
+# Rows per backend call in MemoryStream.load (below Chroma's max batch size)
+LOAD_BATCH_SIZE = 4096
+
+# Process-wide pool: one instance per embedder and cache (clients: see vector_backend)
+_pool_lock = threading.Lock()
+_embedding_fns = {}
+_embedding_caches = {}
+
+def get_embedding_function(embedder: Optional[str] = None):
+    """
+    Shared embedding function (loaded once per process).
+    embedder (default config.EMBEDDER): "default" or "hashing" (offline, no model files).
+    """
+    embedder = embedder or config.EMBEDDER
+    with _pool_lock:
+        if embedder not in _embedding_fns:
+            if embedder == "hashing":
+                _embedding_fns[embedder] = HashingEmbedder()
+            elif embedder == "default":
+                from chromadb.utils import embedding_functions
+                
+                # Use default embedding function (all-MiniLM-L6-v2) for MVP simplicity
+                # If OpenAI key is available, we could switch to OpenAIEmbeddingFunction
+                _embedding_fns[embedder] = embedding_functions.DefaultEmbeddingFunction()
+            else:
+                raise ValueError(f"Unknown embedder: {embedder}")
+        return _embedding_fns[embedder]
+
+def get_embedding_cache(model_name: str, path: Optional[str] = None) -> EmbeddingCache:
+    """Shared embedding cache for model_name at path (default: config.EMBEDDING_CACHE_PATH)."""
+    path = path or config.EMBEDDING_CACHE_PATH
+    with _pool_lock:
+        if (path, model_name) not in _embedding_caches:
+            _embedding_caches[path, model_name] = EmbeddingCache(
+                path, model_name, config.EMBEDDING_CACHE_SIZE
+            )
+        return _embedding_caches[path, model_name]
+
+@atexit.register
+def flush_embedding_caches() -> None:
+    """Write back every pooled cache's hit recency (at exit, after the writers drain)."""
+    with _pool_lock:
+        caches = list(_embedding_caches.values())
+    for cache in caches:
+        cache.flush()
+
+class StreamWorker:
+    """
+    Background thread that runs one MemoryStream task (flush, consolidate)
+    for every stream scheduled on it. One worker per task serves the process.
+    """
+    def __init__(self, task: Callable[['MemoryStream'], object], name: str):
+        self._task = task
+        self._name = name
+        self._streams: "queue.Queue[MemoryStream]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, stream: 'MemoryStream'):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+        self._streams.put(stream)
+
+    def schedule_after(self, stream: 'MemoryStream', delay: float):
+        """Schedule stream after delay seconds (without holding up the worker)."""
+        timer = threading.Timer(delay, self.schedule, args=(stream,))
+        timer.daemon = True
+        timer.start()
+
+    def _run(self):
+        while True:
+            stream = self._streams.get()
+            try:
+                self._task(stream)
+            except Exception:
+                logger.exception("%s failed for %s", self._name, stream.agent_name)
+            finally:
+                self._streams.task_done()
+
+    def join(self):
+        """Block until every scheduled task has run."""
+        self._streams.join()
+
+_writer = StreamWorker(lambda stream: stream.flush(), "memory-writer")
+_consolidator = StreamWorker(lambda stream: stream.consolidate(), "memory-consolidator")
+atexit.register(_writer.join)  # Don't drop queued memories at interpreter exit
+atexit.register(_consolidator.join)
+
 class MemoryStream:
-    def __init__(self, agent_name: str):
+    def __init__(self, agent_name: str, summarizer: Optional[Summarizer] = None,
+                 shared: Optional[bool] = None, backend: Optional[str] = None,
+                 write_behind: Optional[bool] = None, _index_rows=None):
+        """
+        summarizer merges evicted memories into the agent's summary memory
+        when config.CONSOLIDATE_MEMORIES is on (default: merge_summary).
+        shared (default config.SHARED_COLLECTION) stores this agent in the
+        collection shared by all agents, keyed by the "agent" metadata field.
+        backend (default config.VECTOR_BACKEND) is "chroma" or "numpy".
+        write_behind (default config.WRITE_BEHIND) queues add_memory calls
+        for a background worker; retrieve flushes this agent's queue first.
+        """
         self.agent_name = agent_name
-        self.client = chromadb.PersistentClient(path=config.CHROMA_PERSIST_DIR)
+        self.summarizer = summarizer or merge_summary
+        self.summary_id = f"summary_{agent_name}"
+        self.shared = config.SHARED_COLLECTION if shared is None else shared
+        self._pending: List[str] = []  # Evicted memory texts awaiting consolidation
+        self._consolidation_scheduled = False
+        self._consolidate_lock = threading.Lock()
+        self.write_behind = config.WRITE_BEHIND if write_behind is None else write_behind
+        self._queued: List[Memory] = []  # Write-behind memories not yet stored
+        self._queue_space = threading.Condition()
+        self._scheduled = False
+        self._retry_delay = 0.0  # Backoff after failed flushes, 0 once one succeeds
+        self._write_lock = threading.RLock()  # Serializes index and backend writes
         
-        # Use default embedding function (all-MiniLM-L6-v2) for MVP simplicity
-        # If OpenAI key is available, we could switch to OpenAIEmbeddingFunction
-        self.embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+        # Raw vector-search candidates per (query hash, top_n, k, filter), valid
+        # while _version (bumped by every write) is unchanged and no windowed
+        # hit has aged out of its time window; re-ranked on each hit
+        self._version = 0
+        self._query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        self.embedding_fn = get_embedding_function()
+        self.model_name = getattr(self.embedding_fn, "model_name", config.EMBEDDING_MODEL_NAME)
+        # Embedders that are cheap and deterministic (cacheable = False) are never cached
+        cacheable = getattr(self.embedding_fn, "cacheable", True)
+        self.embedding_cache = get_embedding_cache(self.model_name) if config.EMBEDDING_CACHE and cacheable else None
         
-        collection_name = f"memories_{agent_name}"
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=self.embedding_fn,
-            metadata={"hnsw:space": "cosine"}
-        )
+        self.collection_name = config.SHARED_COLLECTION_NAME if self.shared else f"memories_{agent_name}"
+        self.collection = open_backend(self.collection_name, backend)
+        self._where = {"agent": agent_name} if self.shared else None
+        
+        self._seq = itertools.count()  # Tie-breaker for equal creation times
+        if _index_rows is None:
+            results = self.collection.get(where=self._where, include=['metadatas'])
+            _index_rows = zip(results['ids'], results['metadatas'])
+        self._load_index(_index_rows)
+
+    @classmethod
+    def open_many(cls, agent_names: List[str], summarizer: Optional[Summarizer] = None,
+                  shared: Optional[bool] = None, backend: Optional[str] = None) -> Dict[str, 'MemoryStream']:
+        """
+        Open streams for many agents.
+        In shared mode the eviction indexes of all agents come from a single read.
+        """
+        shared = config.SHARED_COLLECTION if shared is None else shared
+        if not shared:
+            return {name: cls(name, summarizer, shared=False, backend=backend) for name in agent_names}
+        
+        collection = open_backend(config.SHARED_COLLECTION_NAME, backend)
+        results = collection.get(include=['metadatas'])
+        rows = {name: [] for name in agent_names}
+        for memory_id, meta in zip(results['ids'], results['metadatas']):
+            if meta.get("agent") in rows:
+                rows[meta["agent"]].append((memory_id, meta))
+        
+        return {name: cls(name, summarizer, shared=True, backend=backend, _index_rows=rows[name])
+                for name in agent_names}
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeddings for texts, through the cache if enabled.
+        Backends always receive vectors, so they never need the embedder.
+        """
+        if self.embedding_cache is None:
+            return np.asarray(self.embedding_fn(texts), dtype=np.float32).tolist()  # Plain floats for Chroma
+        return self.embedding_cache.embed(texts, self.embedding_fn)
+
+    def _metadata(self, memory: Memory) -> dict:
+        metadata = memory_metadata(memory)
+        if self.shared:
+            metadata["agent"] = self.agent_name
+        return metadata
+
+    def _load_index(self, rows):
+        """
+        Build the in-process eviction index from (id, metadata) rows.
+        Heap of (created_ts, seq, id), so the oldest memory is always at [0].
+        The installed sim clock is moved past the newest stored memory, so a
+        restarted session never stamps new memories older than earlier ones.
+        """
+        self._index: List[Tuple[float, int, str]] = []
+        self._has_summary = False
+        latest = None
+        for memory_id, meta in rows:
+            created_ts = created_timestamp(meta)
+            latest = created_ts if latest is None else max(latest, created_ts)
+            if memory_id == self.summary_id:
+                self._has_summary = True  # Never evicted
+                continue
+            self._index.append((created_ts, next(self._seq), memory_id))
+        heapq.heapify(self._index)
+        if latest is not None:
+            sim_clock.resume_after(latest)
+
+    def count(self) -> int:
+        """Number of stored memories (summary included), without a ChromaDB call.
+        Write-behind memories still queued are not counted until flushed."""
+        return len(self._index) + self._has_summary
 
     def add_memory(self, memory: Memory):
         """
         Add a memory to the ChromaDB collection.
         Enforces LRU cap (Neon Society architecture).
         """
-        # Check current count
-        count = self.collection.count()
+        self.add_memories([memory])
+
+    def add_memories(self, memories: List[Memory]):
+        """
+        Add several memories with at most one upsert and one delete call.
+        The oldest memories beyond MAX_MEMORIES are evicted, including new
+        ones older than everything kept (those are never written).
+        In write-behind mode the memories are queued instead (blocking only
+        while WRITE_QUEUE_SIZE memories are already waiting).
+        """
+        if not memories:
+            return
+        if not self.write_behind:
+            with self._write_lock:
+                self._write(memories)
+            return
+        
+        with self._queue_space:
+            self._queue_space.wait_for(lambda: len(self._queued) < config.WRITE_QUEUE_SIZE)
+            self._queued.extend(memories)
+            schedule = not self._scheduled
+            self._scheduled = True
+        if schedule:
+            _writer.schedule(self)
+
+    def flush(self):
+        """
+        Store every queued write-behind memory as one batch.
+        Called by the background worker and before every retrieve.
+        If the write fails the batch goes back to the front of the queue, a
+        retry is scheduled on the background worker (backing off from
+        WRITE_RETRY_DELAY_S to WRITE_RETRY_MAX_DELAY_S) and the error is
+        raised. Producers blocked on a full queue resume once a retry succeeds.
+        """
+        with self._write_lock:
+            with self._queue_space:
+                batch, self._queued = self._queued, []
+                self._scheduled = False
+            try:
+                if batch:
+                    self._write(batch)
+                self._retry_delay = 0.0
+            except Exception:
+                with self._queue_space:
+                    self._queued = batch + self._queued
+                    retry = not self._scheduled
+                    self._scheduled = True
+                self._retry_delay = min(max(2 * self._retry_delay, config.WRITE_RETRY_DELAY_S),
+                                        config.WRITE_RETRY_MAX_DELAY_S)
+                if retry:
+                    _writer.schedule_after(self, self._retry_delay)
+                raise
+            finally:
+                with self._queue_space:
+                    self._queue_space.notify_all()
+
+    def _write(self, memories: List[Memory]):
+        """
+        Store memories and evict (caller holds _write_lock).
+        On a backend error the eviction index and pending evictions are
+        restored, so the same memories can be written again.
+        """
+        index, pending = list(self._index), len(self._pending)
+        try:
+            self._store(memories)
+        except Exception:
+            self._index = index
+            del self._pending[pending:]
+            raise
         
-        # If at capacity, remove oldest memory (LRU)
-        if count >= config.MAX_MEMORIES:
-            # Get all memories sorted by creation time
-            all_results = self.collection.get(
-                include=['metadatas']
+        # Summarize in batches, one summarizer call per CONSOLIDATION_BATCH
+        # evictions, on a background thread so writes never wait for it
+        if len(self._pending) >= config.CONSOLIDATION_BATCH and not self._consolidation_scheduled:
+            self._consolidation_scheduled = True
+            _consolidator.schedule(self)
+
+    def _store(self, memories: List[Memory]):
+        new = {memory.id: memory for memory in memories}
+        for memory in new.values():
+            heapq.heappush(self._index, (memory.created_at.timestamp(), next(self._seq), memory.id))
+        
+        # Evict oldest (LRU) beyond capacity, keeping a slot for the summary memory
+        capacity = config.MAX_MEMORIES - (self._has_summary or config.CONSOLIDATE_MEMORIES)
+        evicted_ids = []
+        while len(self._index) > capacity:
+            _, _, memory_id = heapq.heappop(self._index)
+            evicted_ids.append(memory_id)
+        
+        stored_ids = [memory_id for memory_id in evicted_ids if memory_id not in new]
+        if config.CONSOLIDATE_MEMORIES:
+            documents = self._get_documents(stored_ids) if stored_ids else {}
+            self._pending.extend(new[memory_id].content if memory_id in new else documents[memory_id]
+                                 for memory_id in evicted_ids)
+        for memory_id in evicted_ids:
+            new.pop(memory_id, None)
+        
+        if stored_ids or new:
+            self._version += 1
+        
+        # Upsert before deleting, so retrying a half-applied write is harmless
+        if new:
+            documents = [memory.content for memory in new.values()]
+            self.collection.upsert(
+                documents=documents,
+                embeddings=self._embed(documents),
+                metadatas=[self._metadata(memory) for memory in new.values()],
+                ids=list(new)
             )
-            
-            if all_results['ids']:
-                # Find oldest memory ID
-                oldest_id = None
-                oldest_time = None
-                
-                for i, meta in enumerate(all_results['metadatas']):
-                    created_at = datetime.fromisoformat(str(meta["created_at"]))
-                    if oldest_time is None or created_at < oldest_time:
-                        oldest_time = created_at
-                        oldest_id = all_results['ids'][i]
-                
-                # Delete oldest
-                if oldest_id:
-                    self.collection.delete(ids=[oldest_id])
-        
-        # Prepare metadata
-        # Chroma metadata values must be int, float, str, or bool. No lists/dicts.
-        metadata = {
-            "type": memory.memory_type,
-            "created_at": memory.created_at.isoformat(),
-            "importance": memory.importance,
-            "source": memory.source or "",
-            "tags": ",".join(memory.tags) if memory.tags else ""
+        
+        if stored_ids:
+            self.collection.delete(ids=stored_ids)
+
+    def dump(self) -> dict:
+        """
+        Every stored memory of this agent with its vector (for bulk export).
+        Chroma-shaped ids / documents / metadatas, plus embeddings as an
+        (n, dim) float32 array.
+        """
+        self.flush()
+        results = self.collection.get(where=self._where, include=['documents', 'metadatas', 'embeddings'])
+        if len(results['ids']):
+            embeddings = np.asarray(results['embeddings'], dtype=np.float32)
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        return {
+            "ids": list(results['ids']),
+            "documents": list(results['documents']),
+            "metadatas": list(results['metadatas']),
+            "embeddings": embeddings
         }
+
+    def load(self, ids: List[str], documents: List[str], metadatas: List[dict], embeddings: np.ndarray):
+        """
+        Replace this agent's memories with precomputed rows, without
+        re-embedding (bulk import, see memory_archive).
+        """
+        MemoryStream.load_many({self.agent_name: self}, {self.agent_name: (ids, documents, metadatas, embeddings)})
+
+    @staticmethod
+    def load_many(streams: Dict[str, 'MemoryStream'], rows: Dict[str, tuple]):
+        """
+        Replace many agents' memories with precomputed
+        (ids, documents, metadatas, embeddings) rows (missing agents are emptied).
+        Agents in the same collection are written together: one delete, then
+        upserts of LOAD_BATCH_SIZE rows.
+        """
+        groups: Dict[str, List[MemoryStream]] = {}
+        for stream in streams.values():
+            stream.flush()
+            groups.setdefault(stream.collection_name, []).append(stream)
         
-        self.collection.add(
-            documents=[memory.content],
-            metadatas=[metadata],
-            ids=[memory.id]
-        )
+        with ExitStack() as locks:
+            for stream in streams.values():
+                locks.enter_context(stream._write_lock)
+            
+            for group in groups.values():
+                stored, ids, documents, metadatas, embeddings = [], [], [], [], []
+                for stream in group:
+                    stored.extend(memory_id for _, _, memory_id in stream._index)
+                    if stream._has_summary:
+                        stored.append(stream.summary_id)
+                    
+                    agent_ids, agent_documents, agent_metadatas, agent_embeddings = rows.get(
+                        stream.agent_name, ([], [], [], np.zeros((0, 0), dtype=np.float32))
+                    )
+                    agent_metadatas = [dict(meta) for meta in agent_metadatas]
+                    for meta in agent_metadatas:
+                        meta.pop("agent", None)
+                        if stream.shared:
+                            meta["agent"] = stream.agent_name
+                    ids.extend(agent_ids)
+                    documents.extend(agent_documents)
+                    metadatas.extend(agent_metadatas)
+                    if len(agent_ids):
+                        embeddings.append(np.asarray(agent_embeddings, dtype=np.float32))
+                    
+                    stream._pending = []
+                    stream._load_index(zip(agent_ids, agent_metadatas))
+                    stream._version += 1
+                
+                collection = group[0].collection
+                for start in range(0, len(stored), LOAD_BATCH_SIZE):
+                    collection.delete(ids=stored[start:start + LOAD_BATCH_SIZE])
+                if ids:
+                    embeddings = np.concatenate(embeddings)
+                    for start in range(0, len(ids), LOAD_BATCH_SIZE):
+                        end = start + LOAD_BATCH_SIZE
+                        collection.upsert(
+                            ids=ids[start:end],
+                            documents=documents[start:end],
+                            metadatas=metadatas[start:end],
+                            embeddings=embeddings[start:end]
+                        )
+
+    def _get_documents(self, ids: List[str]) -> Dict[str, str]:
+        results = self.collection.get(ids=ids, include=['documents'])
+        return dict(zip(results['ids'], results['documents']))
 
-    def retrieve(self, query: str, k: int = config.K_FINAL_RETRIEVAL) -> List[ScoredMemory]:
+    def consolidate(self) -> Optional[str]:
+        """
+        Merge pending evicted memories into the agent's summary memory.
+        The summary is a single reflection memory (id summary_<agent>) that is
+        overwritten in place, so it takes one slot of the MAX_MEMORIES cap.
+        Returns the new summary, or None if nothing was pending.
+        Runs in the background after writes (see wait_consolidated); the
+        summarizer is called without holding the write lock.
+        """
+        with self._consolidate_lock:  # One summarizer call per stream at a time
+            with self._write_lock:
+                self._consolidation_scheduled = False
+                if not self._pending:
+                    return None
+                existing = self.collection.get(ids=[self.summary_id], include=['documents'])
+                previous = existing['documents'][0] if existing['ids'] else ""
+                evicted, self._pending = self._pending, []
+            
+            try:
+                summary = self.summarizer(previous, evicted)
+            except Exception:
+                with self._write_lock:
+                    self._pending = evicted + self._pending  # Retry with the next batch
+                raise
+            
+            memory = Memory(
+                id=self.summary_id,
+                content=summary,
+                memory_type="reflection",
+                importance=config.SUMMARY_IMPORTANCE,
+                source="consolidation"
+            )
+            embedding = self._embed([summary])
+            with self._write_lock:
+                self.collection.upsert(
+                    documents=[summary],
+                    embeddings=embedding,
+                    metadatas=[self._metadata(memory)],
+                    ids=[self.summary_id]
+                )
+                self._has_summary = True
+                self._version += 1
+            return summary
+
+    def wait_consolidated(self):
+        """Block until every scheduled background consolidation has run."""
+        _consolidator.join()
+
+    def retrieve(self, query: str, k: int = config.K_FINAL_RETRIEVAL,
+                 mode=None) -> List[ScoredMemory]:
         """
         Retrieve top-k relevant memories using 2-stage pipeline.
         1. Vector Search (Top-N)
         2. Re-ranking (Scoring)
+        mode is a config.RETRIEVAL_MODES name or a RetrievalFilter.
+        """
+        return self.retrieve_many([query], k, mode)[0]
+
+    def retrieve_many(self, queries: List[str], k: int = config.K_FINAL_RETRIEVAL,
+                      mode=None) -> List[List[ScoredMemory]]:
         """
+        Retrieve top-k memories for several queries in one round-trip.
+        All queries are embedded in one batch and sent as a single Chroma
+        query; each result set is re-ranked separately (same order as queries).
+        Queries repeated since this agent's last write skip the vector search.
+        
+        The mode's filters (memory type, minimum importance, creation window)
+        go into the Chroma where clause. Queries that find fewer than k
+        memories are retried with the filter widened one constraint at a
+        time (at most config.RETRIEVAL_MAX_WIDENINGS times).
+        """
+        if not queries:
+            return []
+        self.flush()  # Read-your-writes in write-behind mode
+        
+        current_time = sim_clock.now()
+        retrieval_filter = resolve_mode(mode)
+        stages = [
+            self._filter_where(stage_filter, current_time)
+            for stage_filter in widened_filters(retrieval_filter)
+        ][:config.RETRIEVAL_MAX_WIDENINGS + 1]
+        
+        # Widening stops once k hits are found, so k is part of the key. The
+        # filter itself (not its time-dependent where clause) is the scope.
         top_n = config.TOP_N_RETRIEVAL
+        version = self._version
+        now_ts = current_time.timestamp()
+        scope = json.dumps(retrieval_filter.dict(), sort_keys=True)
+        keys = [(get_hash(query), top_n, k, scope) for query in queries]
+        candidates = {key: self._cached_candidates(key, version, now_ts) for key in keys}
+        missing = list(dict.fromkeys(key for key in keys if candidates[key] is None))
         
-        # 1. Vector Search
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_n
-            # include=['documents', 'metadatas', 'distances', 'embeddings'] # default includes these except embeddings
-        )
+        # 1. Vector Search (cache misses only), widening the filter for short result sets
+        if missing:
+            first_query = dict(zip(reversed(keys), reversed(queries)))
+            embeddings = dict(zip(missing, self._embed([first_query[key] for key in missing])))
+            for key in missing:
+                candidates[key] = ([], [], [], [])
+            
+            short = missing
+            windowed = {}  # Hits of the first (time-windowed) stage per key
+            for where in stages:
+                results = self.collection.query(
+                    query_embeddings=[embeddings[key] for key in short],
+                    n_results=top_n,
+                    where=where
+                    # include=['documents', 'metadatas', 'distances', 'embeddings'] # default includes these except embeddings
+                )
+                if results['ids']:
+                    for i, key in enumerate(short):
+                        candidates[key] = merge_candidates(
+                            candidates[key],
+                            (results['ids'][i], results['documents'][i],
+                             results['metadatas'][i], results['distances'][i]),
+                            top_n
+                        )
+                if not windowed:
+                    windowed = {key: len(candidates[key][0]) for key in missing}
+                short = [key for key in short if len(candidates[key][0]) < k]
+                if not short:
+                    break
+            
+            for key in missing:
+                expires = window_expiry(candidates[key][2][:windowed.get(key, 0)],
+                                        retrieval_filter.within_hours)
+                self._cache_candidates(key, version, expires, candidates[key])
         
-        if not results['ids'] or not results['ids'][0]:
+        # 2. Re-rank every result set against the same clock
+        return [self._rerank(*candidates[key], current_time, k) for key in keys]
+
+    def _filter_where(self, retrieval_filter: RetrievalFilter,
+                      current_time: datetime) -> Optional[dict]:
+        """Chroma where clause for a filter, scoped to this agent in shared mode."""
+        clauses = [self._where] if self._where else []
+        if retrieval_filter.memory_types:
+            clauses.append({"type": {"$in": list(retrieval_filter.memory_types)}})
+        if retrieval_filter.min_importance is not None:
+            clauses.append({"importance": {"$gte": retrieval_filter.min_importance}})
+        if retrieval_filter.within_hours is not None:
+            since = current_time.timestamp() - retrieval_filter.within_hours * 3600
+            clauses.append({"created_ts": {"$gte": since}})
+        
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _cached_candidates(self, key: tuple, version: int, now_ts: float) -> Optional[tuple]:
+        entry = self._query_cache.get(key)
+        if entry is None or entry[0] != version or now_ts >= entry[1]:
+            self.query_cache_misses += 1
+            return None
+        self._query_cache.move_to_end(key)
+        self.query_cache_hits += 1
+        return entry[2]
+
+    def _cache_candidates(self, key: tuple, version: int, expires: float, candidates: tuple):
+        if config.RETRIEVAL_CACHE_SIZE <= 0:
+            return
+        self._query_cache[key] = (version, expires, candidates)
+        self._query_cache.move_to_end(key)
+        while len(self._query_cache) > config.RETRIEVAL_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    def _rerank(self, ids, documents, metadatas, distances,
+                current_time: datetime, k: int) -> List[ScoredMemory]:
+        """
+        Score one query's vector-search candidates as arrays and keep the top k.
+        Memory / ScoredMemory objects are built only for the survivors.
+        """
+        if not ids:
             return []
-            
-        # Parse results into ScoredMemory candidates
-        candidates = []
-        ids = results['ids'][0]
-        documents = results['documents'][0]
-        metadatas = results['metadatas'][0]
-        distances = results['distances'][0] # Cosine distance
         
-        current_time = datetime.now()
+        # Chroma returns cosine distance. Similarity = 1 - distance (approx for cosine)
+        similarity = 1.0 - np.asarray(distances, dtype=np.float64)
+        created_ts = np.array([created_timestamp(meta) for meta in metadatas])
+        importance = np.array([meta["importance"] for meta in metadatas], dtype=np.float64)
+        
+        clock = sim_clock.get_clock()
+        seconds_per_tick = clock.seconds_per_tick if clock else config.SIM_SECONDS_PER_TURN
+        recency = scoring.recency_table(
+            config.DECAY_FACTOR, seconds_per_tick, config.DECAY_TABLE_TICKS
+        )(created_ts, current_time.timestamp())
+        final_score = scoring.calculate_final_scores(
+            similarity,
+            recency,
+            importance,
+            w_sim=config.WEIGHT_SIMILARITY,
+            w_rec=config.WEIGHT_RECENCY,
+            w_imp=config.WEIGHT_IMPORTANCE
+        )
+        
+        # Partial selection; ties keep vector-search order
+        survivors = top_k_indices(final_score, np.arange(len(ids)), k)
         
-        for i in range(len(ids)):
+        candidates = []
+        for i in survivors:
             meta = metadatas[i]
-            doc = documents[i]
-            dist = distances[i]
-            
-            # Reconstruct Memory object
-            created_at = datetime.fromisoformat(str(meta["created_at"]))
             memory = Memory(
                 id=ids[i],
-                content=doc,
+                content=documents[i],
                 memory_type=str(meta["type"]),
-                created_at=created_at,
+                created_at=datetime.fromtimestamp(created_ts[i]),
                 importance=int(meta["importance"]),
                 source=str(meta["source"]),
                 tags=str(meta["tags"]).split(",") if meta["tags"] else []
             )
-            
-            # Calculate Scores
-            # Chroma returns distance. Similarity = 1 - distance (approx for cosine)
-            similarity = 1.0 - dist
-            
-            recency = scoring.calculate_recency_score(
-                created_at, 
-                current_time, 
-                decay_factor=config.DECAY_FACTOR
-            )
-            
-            importance_score = calculate_importance_norm(memory.importance)
-            
-            final_score = scoring.calculate_final_score(
-                similarity,
-                recency,
-                memory.importance,
-                w_sim=config.WEIGHT_SIMILARITY,
-                w_rec=config.WEIGHT_RECENCY,
-                w_imp=config.WEIGHT_IMPORTANCE
-            )
-            
             candidates.append(ScoredMemory(
                 memory=memory,
-                similarity_score=similarity,
-                recency_score=recency,
-                importance_score=importance_score,
-                final_score=final_score
+                similarity_score=float(similarity[i]),
+                recency_score=float(recency[i]),
+                importance_score=calculate_importance_norm(memory.importance),
+                final_score=float(final_score[i])
             ))
-            
-        # 2. Sort by Final Score
-        candidates.sort(key=lambda x: x.final_score, reverse=True)
         
-        return candidates[:k]
+        return candidates
+
+def memory_metadata(memory: Memory) -> dict:
+    # Chroma metadata values must be int, float, str, or bool. No lists/dicts.
+    return {
+        "type": memory.memory_type,
+        "created_at": memory.created_at.isoformat(),
+        "created_ts": memory.created_at.timestamp(),  # Numeric, so queries never parse dates
+        "importance": memory.importance,
+        "source": memory.source or "",
+        "tags": ",".join(memory.tags) if memory.tags else ""
+    }
+
+def created_timestamp(meta: dict) -> float:
+    """POSIX creation time of a stored memory (parses created_at for older stores)."""
+    if "created_ts" in meta:
+        return float(meta["created_ts"])
+    return datetime.fromisoformat(str(meta["created_at"])).timestamp()
+
+def resolve_mode(mode=None) -> RetrievalFilter:
+    """RetrievalFilter for a mode name (default config.RETRIEVAL_MODE) or filter."""
+    if isinstance(mode, RetrievalFilter):
+        return mode
+    name = mode or config.RETRIEVAL_MODE
+    if name not in config.RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {name}")
+    return RetrievalFilter(**config.RETRIEVAL_MODES[name])
+
+def widened_filters(retrieval_filter: RetrievalFilter) -> List[RetrievalFilter]:
+    """
+    The filter followed by successively wider ones, dropping the creation
+    window, then the importance floor, then the type restriction.
+    """
+    filters = [retrieval_filter]
+    for field in ("within_hours", "min_importance", "memory_types"):
+        if getattr(filters[-1], field) is not None:
+            filters.append(filters[-1].copy(update={field: None}))
+    return filters
+
+def window_expiry(metadatas: List[dict], within_hours: Optional[float]) -> float:
+    """
+    POSIX time at which the first of these time-windowed hits leaves its
+    window (inf without a window). Until then, with no writes, re-running
+    the same filtered search returns the same hits.
+    """
+    if within_hours is None or not metadatas:
+        return float("inf")
+    return min(created_timestamp(meta) for meta in metadatas) + within_hours * 3600
+
+def merge_candidates(found: tuple, more: tuple, top_n: int) -> tuple:
+    """Append (ids, documents, metadatas, distances) hits not yet in found, up to top_n."""
+    seen = set(found[0])
+    keep = [i for i, memory_id in enumerate(more[0]) if memory_id not in seen][:top_n - len(found[0])]
+    return tuple(list(column) + [extra[i] for i in keep] for column, extra in zip(found, more))
 
 def calculate_importance_norm(importance: int) -> float:
     return (importance - 1) / 9.0
+
+def merge_summary(previous: str, evicted: List[str],
+                  max_chars: int = config.SUMMARY_MAX_CHARS) -> str:
+    """
+    Default summarizer: append evicted texts to the summary (no LLM call).
+    Repeated texts are kept once; the oldest are dropped to stay within max_chars.
+    """
+    parts = [part for part in previous.split("\n") if part]
+    for text in evicted:
+        if text not in parts:
+            parts.append(text)
+    
+    while len(parts) > 1 and len("\n".join(parts)) > max_chars:
+        parts.pop(0)
+    
+    return "\n".join(parts)[-max_chars:]
+
+def llm_summarizer(client, model: str = config.DEFAULT_MODEL_NAME) -> Summarizer:
+    """
+    Summarizer that asks an (OpenAI-compatible or mock) client to rewrite the summary.
+    Falls back to merge_summary if the call fails.
+    """
+    def summarize(previous: str, evicted: List[str]) -> str:
+        old_memories = "\n".join(f"- {text}" for text in evicted)
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompts.get_consolidation_prompt(previous, old_memories)}],
+                temperature=0.2
+            )
+            return response.choices[0].message.content.strip()[:config.SUMMARY_MAX_CHARS]
+        except Exception:
+            logger.warning("Consolidation call failed, merging summary locally", exc_info=True)
+            return merge_summary(previous, evicted)
+    
+    return summarize
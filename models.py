@@ -8,11 +8,13 @@ from datetime import datetime
 from typing import Literal, Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 
+import sim_clock
+
 class Memory(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     content: str
     memory_type: Literal["observation", "reflection", "plan"]
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=sim_clock.now)  # Sim time once a clock is installed
     importance: int = Field(..., ge=1, le=10, description="Importance score 1-10")
     source: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
@@ -53,6 +55,12 @@ class ScoredMemory(BaseModel):
     importance_score: float = 0.0
     final_score: float = 0.0
 
+class RetrievalFilter(BaseModel):
+    """Metadata pre-filter pushed into the vector search (None = no constraint)."""
+    memory_types: Optional[List[Literal["observation", "reflection", "plan"]]] = None
+    min_importance: Optional[int] = Field(None, ge=1, le=10)
+    within_hours: Optional[float] = Field(None, gt=0, description="Created at most this long ago (sim time)")
+
 class StoreEvent(BaseModel):
     memory_type: str
     content: str
@@ -8,6 +8,8 @@ import time
 from typing import List
 
 from neon_models import WorldState, AgentSnapshot, Memory
+from neon_history import HistoryStore
+from neon_history_file import HistoryFile
 import neon_simulation as sim
 import neon_config as config
 
@@ -47,7 +49,7 @@ st.markdown("""
 # Initialize session state
 if 'world' not in st.session_state:
     # Create initial world with default agents
-    world = WorldState()
+    world = WorldState(seed=config.SEED)
     
     # Add Min-jun
     world.agents["Min-jun"] = AgentSnapshot(
@@ -68,12 +70,18 @@ if 'world' not in st.session_state:
     )
     
     st.session_state.world = world
-    st.session_state.history = []  # DVR history
+    st.session_state.history = HistoryStore()  # DVR history (keyframes + deltas)
     st.session_state.is_playing = False
     st.session_state.dvr_mode = False
     st.session_state.use_mock = True  # Default to mock mode
     st.session_state.gemini_configured = False
 
+def record_history():
+    """Save the current world to DVR history (recorded runs are read-only)"""
+    history = st.session_state.history
+    if not getattr(history, "read_only", False):
+        history.record(st.session_state.world)
+
 # Sidebar for configuration
 with st.sidebar:
     st.title("⚙️ Configuration")
@@ -105,10 +113,37 @@ with st.sidebar:
         
         if not st.session_state.gemini_configured and not api_key:
             st.warning("⚠️ Enter API key to use Gemini mode")
+        
+        st.session_state.concurrent_llm = st.toggle(
+            "⚡ Parallel Gemini calls",
+            value=st.session_state.get("concurrent_llm", config.CONCURRENT_LLM),
+            help=f"Up to {config.LLM_MAX_CONCURRENCY} calls in flight, "
+                 f"mock fallback after {config.LLM_CALL_DEADLINE_S:.0f}s"
+        )
     else:
         st.info("💡 Mock mode uses rule-based logic (no API needed)")
     
     st.divider()
+    
+    # Open a recorded run (neon_batch.py --history-file) without replaying it
+    history_path = st.text_input("📼 Recorded Run", placeholder="exports/neon_history")
+    if st.button("📂 Open Run", disabled=not history_path):
+        try:
+            recorded = HistoryFile(history_path, read_only=True)
+        except (FileNotFoundError, ValueError) as e:
+            st.error(f"❌ Could not open run: {e}")
+        else:
+            if len(recorded):
+                st.session_state.history = recorded
+                st.session_state.world = recorded.seek(recorded.last_tick)
+                st.session_state.is_playing = False
+                st.session_state.dvr_mode = True
+                st.rerun()
+            else:
+                st.warning("⚠️ Run has no recorded ticks")
+    
+    if getattr(st.session_state.history, "read_only", False):
+        st.caption("Viewing a recorded run (new ticks are not saved)")
 
 # Header
 st.title("🌆 Neon Society: Generative Agent RPG")
@@ -123,11 +158,14 @@ with col1:
 with col2:
     if st.button("⏭️ Single Tick"):
         # Save snapshot to history
-        snapshot = st.session_state.world.copy_snapshot()
-        st.session_state.history.append(snapshot)
+        record_history()
         
         # Advance simulation
-        st.session_state.world = sim.tick(st.session_state.world, st.session_state.use_mock)
+        st.session_state.world = sim.tick(
+            st.session_state.world,
+            st.session_state.use_mock,
+            concurrent=st.session_state.get("concurrent_llm", config.CONCURRENT_LLM)
+        )
         st.rerun()
 
 with col3:
@@ -144,28 +182,35 @@ with col4:
 # Auto-play loop
 if st.session_state.is_playing and not st.session_state.dvr_mode:
     # Save snapshot
-    snapshot = st.session_state.world.copy_snapshot()
-    st.session_state.history.append(snapshot)
+    record_history()
     
     # Advance
-    st.session_state.world = sim.tick(st.session_state.world, st.session_state.use_mock)
+    st.session_state.world = sim.tick(
+        st.session_state.world,
+        st.session_state.use_mock,
+        concurrent=st.session_state.get("concurrent_llm", config.CONCURRENT_LLM)
+    )
     
     time.sleep(config.TICK_SPEED_MS / 1000.0)
     st.rerun()
 
 # DVR Timeline
-if st.session_state.dvr_mode and st.session_state.history:
+if st.session_state.dvr_mode and len(st.session_state.history):
     st.markdown("### ⏪ Time Travel")
+    history = st.session_state.history
     
-    selected_tick = st.slider(
-        "Select Tick",
-        min_value=0,
-        max_value=len(st.session_state.history) - 1,
-        value=len(st.session_state.history) - 1
-    )
+    if history.first_tick < history.last_tick:
+        selected_tick = st.slider(
+            "Select Tick",
+            min_value=history.first_tick,
+            max_value=history.last_tick,
+            value=history.last_tick
+        )
+    else:
+        selected_tick = history.last_tick
     
-    # Load historical state
-    st.session_state.world = st.session_state.history[selected_tick]
+    # Load historical state (rebuilt from nearest keyframe + deltas)
+    st.session_state.world = history.seek(selected_tick)
     st.info(f"Viewing Tick #{st.session_state.world.tick}")
 
 # Main Display
@@ -201,6 +246,8 @@ with col_agents:
             
             # Memory count
             st.caption(f"Memories: {len(agent.memories)}/{config.MAX_MEMORIES}")
+            if agent.memory_summary:
+                st.caption(f"🗂️ {agent.memory_summary}")
 
 # Recent Interactions
 if st.session_state.world.recent_interactions:
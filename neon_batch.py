@@ -0,0 +1,178 @@
+"""
+Neon Society Headless Batch Runner
+Runs the simulation without the Streamlit UI for soak tests and offline generation
+
+Usage:
+    python neon_batch.py --agents 500 --ticks 1000 --out exports/neon_run
+    python neon_batch.py --agents 50000 --engine vector --ticks 200
+    python neon_batch.py --mode gemini --api-key $GEMINI_API_KEY --agents 4 --ticks 20
+    python neon_batch.py --mode gemini --concurrency 16 --deadline 5 --agents 40 --ticks 20
+    python neon_batch.py --agents 200 --ticks 100000 --history-file exports/neon_history
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from neon_models import WorldState, AgentSnapshot
+import neon_config as config
+import neon_simulation as sim
+
+# Cast templates cycled through when generating agents
+PERSONAS = [
+    ("Overly dramatic, speaks like Shakespeare", "Become the star of the show"),
+    ("Cynical writer, tired, coffee addict", "Finish script and avoid drama"),
+    ("Curious newcomer, friendly", "Meet everyone in town"),
+]
+
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]
+
+def build_world(num_agents: int, seed: Optional[int] = None) -> WorldState:
+    """
+    Create a world with num_agents agents at random positions
+    The seed also drives every agent's RNG stream during the run
+    """
+    rng = random.Random(seed)
+    world = WorldState(seed=seed)
+
+    for i in range(num_agents):
+        traits, goal = PERSONAS[i % len(PERSONAS)]
+        name = f"Agent-{i:05d}"
+        world.agents[name] = AgentSnapshot(
+            name=name,
+            x=rng.randint(0, config.MAP_SIZE),
+            y=rng.randint(0, config.MAP_SIZE),
+            traits=traits,
+            goal=goal,
+            # Stagger first thoughts so cognition load is spread across ticks
+            next_think_tick=rng.randint(0, config.THINK_INTERVAL - 1),
+            cached_direction=rng.choice(DIRECTIONS)
+        )
+
+    return world
+
+def run(world: WorldState, num_ticks: int, use_mock: bool = True,
+        engine: str = "object", history=None) -> Dict:
+    """
+    Advance the world num_ticks times as fast as possible
+    history (e.g. neon_history_file.HistoryFile) records every tick, object engine only
+    Returns {"world": WorldState, "elapsed": float, "timings": {phase: seconds}}
+    """
+    timings: Dict[str, float] = {}
+
+    if engine == "vector":
+        from neon_vector_engine import VectorWorld
+        vworld = VectorWorld.from_world(world)
+        start = time.perf_counter()
+        for _ in range(num_ticks):
+            vworld.step(use_mock, timings)
+        elapsed = time.perf_counter() - start
+        world = vworld.to_world()
+    else:
+        start = time.perf_counter()
+        if history is not None:
+            history.record(world)
+        for _ in range(num_ticks):
+            world = sim.tick(world, use_mock, timings)
+            if history is not None:
+                history.record(world)
+        elapsed = time.perf_counter() - start
+
+    return {"world": world, "elapsed": elapsed, "timings": timings}
+
+def write_outputs(world: WorldState, out_dir: str) -> List[str]:
+    """Write final world (world.json) and interaction log (interactions.jsonl)"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    world_path = os.path.join(out_dir, "world.json")
+    with open(world_path, "w", encoding="utf-8") as f:
+        json.dump(world.dict(exclude={"recent_interactions"}), f,
+                  default=str, ensure_ascii=False, indent=2)
+
+    log_path = os.path.join(out_dir, "interactions.jsonl")
+    with open(log_path, "w", encoding="utf-8") as f:
+        for record in world.recent_interactions:
+            f.write(json.dumps(record.dict(), default=str, ensure_ascii=False) + "\n")
+
+    return [world_path, log_path]
+
+def print_report(num_agents: int, num_ticks: int, result: Dict) -> None:
+    elapsed = result["elapsed"]
+    timings = result["timings"]
+
+    print(f"Agents: {num_agents}  Ticks: {num_ticks}  Elapsed: {elapsed:.3f}s")
+    if elapsed > 0:
+        print(f"Throughput: {num_ticks / elapsed:.1f} ticks/sec")
+
+    print("Time per phase:")
+    for phase, seconds in timings.items():
+        share = (seconds / elapsed * 100) if elapsed > 0 else 0.0
+        per_tick_ms = seconds / num_ticks * 1000 if num_ticks else 0.0
+        print(f"  {phase:<10} {seconds:8.3f}s  {per_tick_ms:8.3f} ms/tick  {share:5.1f}%")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Neon Society simulation headless")
+    parser.add_argument("--agents", type=int, default=10, help="Number of agents")
+    parser.add_argument("--ticks", type=int, default=100, help="Number of ticks to run")
+    parser.add_argument("--mode", choices=["mock", "gemini"], default="mock",
+                        help="Brain mode")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="Gemini API key (default: $GEMINI_API_KEY)")
+    parser.add_argument("--engine", choices=["object", "vector"], default="object",
+                        help="Simulation engine (vector = NumPy struct-of-arrays)")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Issue Gemini calls in parallel, up to N in flight (0 = sequential)")
+    parser.add_argument("--deadline", type=float, default=config.LLM_CALL_DEADLINE_S,
+                        help="Per-call Gemini deadline in seconds before mock fallback")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for world generation and per-agent RNG streams")
+    parser.add_argument("--history-file", default=None,
+                        help="Record every tick to an on-disk DVR history directory (object engine)")
+    parser.add_argument("--out", default=os.path.join("exports", "neon_run"),
+                        help="Output directory")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    use_mock = args.mode == "mock"
+    if not use_mock:
+        import neon_gemini_service as gemini
+        if not args.api_key or not gemini.configure_gemini(args.api_key):
+            print("Failed to configure Gemini. Provide --api-key and install google-generativeai.",
+                  file=sys.stderr)
+            return 1
+
+    if args.concurrency > 0:
+        config.CONCURRENT_LLM = True
+        config.LLM_MAX_CONCURRENCY = args.concurrency
+    config.LLM_CALL_DEADLINE_S = args.deadline
+
+    if args.history_file and args.engine != "object":
+        print("--history-file requires --engine object", file=sys.stderr)
+        return 1
+
+    history = None
+    if args.history_file:
+        from neon_history_file import HistoryFile
+        history = HistoryFile(args.history_file)
+
+    world = build_world(args.agents, args.seed)
+    try:
+        result = run(world, args.ticks, use_mock, args.engine, history)
+    finally:
+        if history is not None:
+            history.close()
+
+    print_report(args.agents, args.ticks, result)
+    for path in write_outputs(result["world"], args.out):
+        print(f"Wrote {path}")
+    if history is not None:
+        print(f"Wrote history to {args.history_file}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
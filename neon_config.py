@@ -6,6 +6,7 @@ All constants in one place
 # World Settings
 MAP_SIZE = 20  # 20x20 grid
 PROXIMITY_RADIUS = 1.5  # Distance threshold for interaction
+SEED = None  # World seed for reproducible runs (None = nondeterministic)
 
 # Cognition Settings
 THINK_INTERVAL = 8  # Ticks between deep LLM thoughts
@@ -14,6 +15,16 @@ MAX_MEMORIES = 20  # LRU memory cap
 # Memory Scoring Weights
 IMPORTANCE_WEIGHT = 0.5
 RECENCY_WEIGHT = 0.5
+PROMPT_MEMORIES = 5  # Top-scored memories included in a Gemini decision prompt
+RECENCY_HORIZON_HOURS = 24  # Recency decays linearly to 0 over this age
+
+# Simulation Clock
+SIM_SECONDS_PER_TICK = 60  # Sim time per tick (memories are stamped and scored in sim time)
+
+# Memory Consolidation
+CONSOLIDATE_MEMORIES = False  # Merge evicted memories into a rolling per-agent summary
+CONSOLIDATION_BATCH = 8  # Evicted memories merged per consolidation call
+SUMMARY_MAX_CHARS = 400  # Rolling summary length cap
 
 # Default Importance Scores
 CONVERSATION_IMPORTANCE = 7
@@ -23,8 +34,14 @@ ENVIRONMENT_IMPORTANCE = 2
 # UI Settings
 TICK_SPEED_MS = 1000  # Default tick interval in milliseconds
 MAX_HISTORY_SIZE = 200  # DVR history cap (prevent memory overflow)
+HISTORY_KEYFRAME_INTERVAL = 20  # Full snapshot every N ticks, deltas in between
 
 # Gemini/Mock Settings
 USE_MOCK = True  # Toggle between Gemini and mock brain
 GEMINI_MODEL = "gemini-pro"
 GEMINI_TEMPERATURE = 0.7
+
+# Concurrent LLM Settings (Gemini mode only)
+CONCURRENT_LLM = False  # Issue a tick's Gemini calls in parallel
+LLM_MAX_CONCURRENCY = 8  # Max in-flight Gemini calls
+LLM_CALL_DEADLINE_S = 10.0  # Per-call deadline before falling back to mock brain
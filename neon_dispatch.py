@@ -0,0 +1,131 @@
+"""
+Neon Society Concurrent Dispatch
+Runs a tick's LLM calls on a thread pool with a per-call deadline,
+and background jobs whose results are picked up on a later tick
+Both share one bounded pool per worker count, so calls that hang past
+their deadline never add threads across ticks
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_pool_lock = threading.Lock()
+_executors: Dict[int, ThreadPoolExecutor] = {}
+
+def get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool of max_workers threads (created on first use)"""
+    max_workers = max(1, max_workers)
+    with _pool_lock:
+        if max_workers not in _executors:
+            _executors[max_workers] = ThreadPoolExecutor(max_workers=max_workers,
+                                                         thread_name_prefix=f"neon-llm-{max_workers}")
+        return _executors[max_workers]
+
+def run_concurrently(jobs: Dict[Hashable, Callable[[], Any]],
+                     max_workers: int,
+                     deadline_s: float) -> Dict[Hashable, Optional[Any]]:
+    """
+    Run jobs concurrently on the shared pool, at most max_workers at a time
+    (calls still running from earlier batches count against the limit)
+    Each job gets deadline_s seconds from the moment it starts running
+    Returns {key: result}, with None for jobs that failed or missed the deadline
+    """
+    results: Dict[Hashable, Optional[Any]] = {key: None for key in jobs}
+    if not jobs:
+        return results
+
+    workers = max(1, min(max_workers, len(jobs)))
+    started: Dict[Hashable, float] = {}
+
+    def _run(key: Hashable, fn: Callable[[], Any]) -> Any:
+        started[key] = time.monotonic()
+        return fn()
+
+    # Queued jobs can't wait forever behind calls that hung past their deadline
+    batch_deadline = time.monotonic() + deadline_s * math.ceil(len(jobs) / workers)
+
+    executor = get_executor(max_workers)
+    futures = {executor.submit(_run, key, fn): key for key, fn in jobs.items()}
+    pending = set(futures)
+
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= batch_deadline:
+                break
+
+            # Drop calls that have been running past their deadline
+            pending = {
+                fut for fut in pending
+                if fut.done()
+                or futures[fut] not in started
+                or now - started[futures[fut]] < deadline_s
+            }
+            if not pending:
+                break
+
+            waits = [started[futures[fut]] + deadline_s - now
+                     for fut in pending if futures[fut] in started]
+            timeout = min(waits + [batch_deadline - now])
+
+            done, pending = wait(pending, timeout=max(timeout, 0.001),
+                                 return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    results[futures[fut]] = fut.result()
+                except Exception:
+                    logger.exception("Concurrent LLM call failed (%s)", futures[fut])
+    finally:
+        # Calls not started yet are dropped; late calls finish in the pool, results discarded
+        for fut in pending:
+            fut.cancel()
+
+    return results
+
+class BackgroundJobs:
+    """
+    Keyed jobs on the shared pool (see get_executor), collected without blocking
+    At most one job per key is in flight; a job that raised collects as None
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max(1, max_workers)
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def busy(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._futures
+
+    def submit(self, key: Hashable, fn: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._futures:
+                raise RuntimeError(f"Job {key!r} is already running")
+            self._futures[key] = get_executor(self._max_workers).submit(fn)
+
+    def collect(self) -> Dict[Hashable, Optional[Any]]:
+        """Results of the jobs that have finished since the last collect"""
+        with self._lock:
+            done = {key: fut for key, fut in self._futures.items() if fut.done()}
+            for key in done:
+                del self._futures[key]
+
+        results = {}
+        for key, fut in done.items():
+            try:
+                results[key] = fut.result()
+            except Exception:
+                logger.exception("Background job failed (%s)", key)
+                results[key] = None
+        return results
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until every job in flight has finished (or timeout)"""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait(futures, timeout=timeout)
@@ -142,3 +142,50 @@ Create a short, witty exchange (2-3 lines each). Respond ONLY with valid JSON:
     except Exception as e:
         print(f"Gemini dialogue error: {e}")
         return None
+
+def summarize_gemini_memories(agent_name: str, previous: str,
+                              contents: List[str]) -> Optional[str]:
+    """
+    Merge evicted memories into an agent's rolling long-term summary
+    Returns: summary text (at most config.SUMMARY_MAX_CHARS) or None if error
+    """
+    if not GEMINI_AVAILABLE:
+        return None
+    
+    memory_text = "\n".join([f"- {mem}" for mem in contents])
+    
+    prompt = f"""You maintain the long-term memory of {agent_name}, a character in a simulation.
+
+CURRENT SUMMARY:
+{previous if previous else "(empty)"}
+
+OLDER MEMORIES TO MERGE:
+{memory_text}
+
+Rewrite the summary so it keeps what matters from both (people met, recurring events, feelings).
+Keep it under {config.SUMMARY_MAX_CHARS} characters. Respond ONLY with valid JSON:
+{{
+  "summary": "updated summary"
+}}"""
+
+    try:
+        model = genai.GenerativeModel(config.GEMINI_MODEL)
+        
+        response = model.generate_content(
+            prompt,
+            generation_config={
+                "temperature": 0.2,
+                "response_mime_type": "application/json"
+            }
+        )
+        
+        result = json.loads(response.text)
+        
+        if not isinstance(result.get("summary"), str):
+            return None
+        
+        return result["summary"][:config.SUMMARY_MAX_CHARS]
+        
+    except Exception as e:
+        print(f"Gemini API error: {e}")
+        return None
@@ -0,0 +1,196 @@
+"""
+Neon Society DVR History
+Keyframe + delta history store with a bounded ring buffer
+
+Every HISTORY_KEYFRAME_INTERVAL-th recorded tick is a full keyframe; the
+others store only changed agent fields and a view of the interaction log.
+At most MAX_HISTORY_SIZE ticks are retained: when the buffer is full the oldest tick
+is evicted and its successor promoted to a keyframe, so any retained tick can
+be rebuilt from a keyframe plus fewer than HISTORY_KEYFRAME_INTERVAL deltas.
+"""
+from typing import Any, Dict, List, Optional
+
+from neon_models import WorldState, AgentSnapshot, InteractionLog
+import neon_config as config
+
+def _agent_fields() -> List[str]:
+    fields = getattr(AgentSnapshot, "model_fields", None) or AgentSnapshot.__fields__
+    return [name for name in fields if name not in ("name", "memories")]
+
+class _Delta:
+    """Changes from the previous recorded tick"""
+    __slots__ = ("tick", "seed", "changed", "added", "removed", "interactions")
+
+    def __init__(self, tick: int, seed: Optional[int]):
+        self.tick = tick
+        self.seed = seed
+        self.changed: Dict[str, Dict[str, Any]] = {}   # name -> {field: value}
+        self.added: Dict[str, AgentSnapshot] = {}
+        self.removed: List[str] = []
+        self.interactions: Optional[InteractionLog] = None  # Shared view of the log
+
+class HistoryStore:
+    """
+    Bounded DVR history
+    record() the world once per tick, seek() any retained tick
+    """
+
+    def __init__(self, capacity: int = config.MAX_HISTORY_SIZE,
+                 keyframe_interval: int = config.HISTORY_KEYFRAME_INTERVAL):
+        if capacity < 1 or keyframe_interval < 1:
+            raise ValueError("capacity and keyframe_interval must be positive")
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval
+        self._fields = _agent_fields()
+        self.clear()
+
+    def clear(self) -> None:
+        self._slots: List[Any] = [None] * self.capacity  # WorldState keyframe or _Delta
+        self._head = 0
+        self._size = 0
+        self._last: Optional[WorldState] = None  # State at the newest entry
+        self._since_keyframe = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        return self._entry(0).tick if self._size else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        return self._entry(self._size - 1).tick if self._size else None
+
+    def ticks(self) -> List[int]:
+        return [self._entry(i).tick for i in range(self._size)]
+
+    # ------------------------------------------------------------------
+    # Ring buffer
+    # ------------------------------------------------------------------
+
+    def _entry(self, i: int) -> Any:
+        return self._slots[(self._head + i) % self.capacity]
+
+    def _set_entry(self, i: int, entry: Any) -> None:
+        self._slots[(self._head + i) % self.capacity] = entry
+
+    def _evict_oldest(self) -> None:
+        """Drop the oldest tick, promoting its successor to a keyframe"""
+        if self._size > 1 and isinstance(self._entry(1), _Delta):
+            self._set_entry(1, self._materialize(1))
+        self._slots[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._size -= 1
+
+    def _index_of(self, tick: int) -> int:
+        """Index of the newest entry at or before tick (-1 if none)"""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid).tick <= tick:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    # ------------------------------------------------------------------
+    # Record / seek
+    # ------------------------------------------------------------------
+
+    def record(self, world: WorldState) -> None:
+        """
+        Record the world's current tick
+        Recording a tick at or before the newest one discards the newer
+        entries first (resuming from a rewound state starts a new branch)
+        """
+        if self._size and world.tick <= self.last_tick:
+            keep = self._index_of(world.tick - 1) + 1
+            for i in range(keep, self._size):
+                self._set_entry(i, None)
+            self._size = keep
+            self._last = self._materialize(keep - 1) if keep else None
+            self._since_keyframe = self.keyframe_interval  # Next entry is a keyframe
+
+        if self._size == self.capacity:
+            self._evict_oldest()
+
+        if self._last is None or self._since_keyframe + 1 >= self.keyframe_interval:
+            entry = world.copy_snapshot()
+            self._last = entry
+            self._since_keyframe = 0
+        else:
+            entry = self._diff(self._last, world)
+            self._last = world.copy_snapshot()
+            self._since_keyframe += 1
+
+        self._set_entry(self._size, entry)
+        self._size += 1
+
+    def seek(self, tick: int) -> WorldState:
+        """
+        Rebuild the world at a retained tick (or the newest one before it)
+        Returns a fresh WorldState that can be advanced (see WorldState.mutable_agent)
+        """
+        index = self._index_of(tick)
+        if index < 0:
+            raise KeyError(f"Tick {tick} is not in history")
+        return self._materialize(index)
+
+    def _materialize(self, index: int) -> WorldState:
+        """Nearest keyframe at or before index, plus the deltas after it"""
+        start = index
+        while isinstance(self._entry(start), _Delta):
+            start -= 1
+
+        world = self._entry(start).copy_snapshot()
+        for i in range(start + 1, index + 1):
+            self._apply(world, self._entry(i))
+        return world
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+
+    def _diff(self, old: WorldState, new: WorldState) -> _Delta:
+        delta = _Delta(new.tick, new.seed)
+
+        for name, agent in new.agents.items():
+            previous = old.agents.get(name)
+            if agent is previous:
+                continue  # Still shared, untouched since the last record
+            if previous is None:
+                delta.added[name] = agent
+                continue
+
+            changes = {
+                field: getattr(agent, field)
+                for field in self._fields
+                if getattr(agent, field) != getattr(previous, field)
+            }
+            if agent.memories.ids() != previous.memories.ids():
+                changes["memories"] = agent.memories  # Frozen before any later write
+            if changes:
+                delta.changed[name] = changes
+
+        delta.removed = [name for name in old.agents if name not in new.agents]
+
+        delta.interactions = new.recent_interactions.snapshot()
+        return delta
+
+    def _apply(self, world: WorldState, delta: _Delta) -> None:
+        world.tick = delta.tick
+        world.seed = delta.seed
+
+        for name in delta.removed:
+            del world.agents[name]
+        for name, agent in delta.added.items():
+            world.agents[name] = agent  # Shared; copied on first write
+        for name, changes in delta.changed.items():
+            agent = world.mutable_agent(name)
+            for field, value in changes.items():
+                if field == "memories":
+                    value.frozen = True  # Shared with this delta
+                setattr(agent, field, value)
+
+        world.recent_interactions = delta.interactions.snapshot()
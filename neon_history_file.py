@@ -0,0 +1,359 @@
+"""
+Neon Society On-Disk DVR History
+Append-only, memory-mapped history for very long runs
+
+A history file is a run directory:
+    meta.json         cast (name, traits, goal per agent) and seed
+    ticks.bin         per recorded tick: tick number, interaction log length
+    frames.bin        fixed-size agent records, one frame of len(cast) per tick
+    interactions.bin  blob offset of every interaction record
+    blobs.bin         length-prefixed UTF-8 payloads (thoughts, plans,
+                      memory lists, memory summaries, interaction records)
+
+Frames are fixed-size, so seeking any tick is an index lookup into a memory
+map; unchanged thoughts, plans and memory lists reuse the previous blob. The
+cast must stay fixed for the whole run.
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from neon_models import WorldState, AgentSnapshot, Memory, MemoryBuffer, InteractionRecord, InteractionLog
+from neon_vector_engine import STATES, DIRECTIONS, STATE_CODES, DIRECTION_CODES
+
+FORMAT_VERSION = 3
+
+FRAME_DTYPE = np.dtype([
+    ("x", "<i2"),
+    ("y", "<i2"),
+    ("state", "i1"),
+    ("cached_direction", "i1"),
+    ("next_think_tick", "<i8"),   # -1 = None
+    ("think_interval", "<i4"),    # 0 = None
+    ("current_thought", "<i8"),   # Blob offsets, -1 = empty
+    ("current_plan", "<i8"),
+    ("memories", "<i8"),
+    ("memory_summary", "<i8"),
+])
+
+TICK_DTYPE = np.dtype([("tick", "<i8"), ("interactions", "<i8")])
+OFFSET_DTYPE = np.dtype("<i8")
+
+_BLOB_HEADER = struct.Struct("<I")
+_FILES = ("ticks.bin", "frames.bin", "interactions.bin", "blobs.bin")
+
+class MappedInteractions(Sequence):
+    """Interaction records decoded on access from a history file"""
+
+    def __init__(self, history: 'HistoryFile', count: int):
+        self._history = history
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("interaction index out of range")
+        return self._history._interaction(index)
+
+class HistoryFile:
+    """
+    Disk-backed DVR history with the same interface as HistoryStore
+    read_only=True opens a finished run without replaying it
+    """
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self._meta: Optional[Dict] = None
+        self._handles: Dict[str, object] = {}
+        self._maps: Dict[str, object] = {}
+        self._mapped_sizes: Dict[str, int] = {}
+        self._reset_dedup()
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+            if self._meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported history format: {self._meta.get('version')}")
+        elif read_only:
+            raise FileNotFoundError(f"No history at {path}")
+
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+            for name in _FILES:
+                self._handles[name] = open(os.path.join(path, name), "ab")
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+        self._unmap()
+
+    def __enter__(self) -> 'HistoryFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Memory maps
+    # ------------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _unmap(self) -> None:
+        blobs = self._maps.get("blobs.bin")
+        if blobs is not None:
+            blobs.close()
+        self._maps = {}
+        self._mapped_sizes = {}
+
+    def _map(self, name: str):
+        """Map a file, remapping if it grew since the last access"""
+        size = os.path.getsize(self._file(name)) if os.path.exists(self._file(name)) else 0
+        if self._mapped_sizes.get(name) != size:
+            old = self._maps.get(name)
+            if isinstance(old, mmap.mmap):
+                old.close()
+
+            if size == 0:
+                mapped = None
+            elif name == "blobs.bin":
+                with open(self._file(name), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                dtype = {"ticks.bin": TICK_DTYPE, "interactions.bin": OFFSET_DTYPE}.get(name, FRAME_DTYPE)
+                mapped = np.memmap(self._file(name), dtype=dtype, mode="r")
+
+            self._maps[name] = mapped
+            self._mapped_sizes[name] = size
+        return self._maps[name]
+
+    def _ticks(self) -> np.ndarray:
+        ticks = self._map("ticks.bin")
+        return ticks if ticks is not None else np.zeros(0, dtype=TICK_DTYPE)
+
+    def _blob(self, offset: int) -> bytes:
+        blobs = self._map("blobs.bin")
+        (length,) = _BLOB_HEADER.unpack_from(blobs, offset)
+        start = offset + _BLOB_HEADER.size
+        return blobs[start:start + length]
+
+    def _text(self, offset: int) -> str:
+        return "" if offset < 0 else self._blob(int(offset)).decode("utf-8")
+
+    def _interaction(self, index: int) -> InteractionRecord:
+        offset = int(self._map("interactions.bin")[index])
+        return InteractionRecord(**json.loads(self._blob(offset)))
+
+    # ------------------------------------------------------------------
+    # HistoryStore interface
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._ticks())
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        ticks = self._ticks()
+        return int(ticks["tick"][0]) if len(ticks) else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        ticks = self._ticks()
+        return int(ticks["tick"][-1]) if len(ticks) else None
+
+    def ticks(self) -> List[int]:
+        return self._ticks()["tick"].tolist()
+
+    def seek(self, tick: int) -> WorldState:
+        """
+        Rebuild the world at a recorded tick (or the newest one before it)
+        Only that tick's frame is read; interactions are decoded on access
+        """
+        ticks = self._ticks()
+        index = int(np.searchsorted(ticks["tick"], tick, side="right")) - 1
+        if index < 0:
+            raise KeyError(f"Tick {tick} is not in history")
+
+        cast = self._meta["agents"]
+        frame = self._map("frames.bin")[index * len(cast):(index + 1) * len(cast)]
+
+        interactions = MappedInteractions(self, int(ticks["interactions"][index]))
+        world = WorldState(
+            tick=int(ticks["tick"][index]),
+            seed=self._meta["seed"],
+            recent_interactions=InteractionLog.over(interactions)
+        )
+        for info, row in zip(cast, frame):
+            memory_offsets = json.loads(self._text(row["memories"]) or "[]")
+            world.agents[info["name"]] = AgentSnapshot(
+                name=info["name"],
+                traits=info["traits"],
+                goal=info["goal"],
+                x=int(row["x"]),
+                y=int(row["y"]),
+                state=STATES[row["state"]],
+                cached_direction=DIRECTIONS[row["cached_direction"]],
+                next_think_tick=int(row["next_think_tick"]) if row["next_think_tick"] >= 0 else None,
+                think_interval=int(row["think_interval"]) or None,
+                current_thought=self._text(row["current_thought"]),
+                current_plan=self._text(row["current_plan"]),
+                memories=[Memory(**json.loads(self._blob(offset))) for offset in memory_offsets],
+                memory_summary=self._text(row["memory_summary"])
+            )
+
+        return world
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _reset_dedup(self) -> None:
+        """Forget the previous frame (next record rewrites every blob)"""
+        self._last_agents: Dict[str, AgentSnapshot] = {}
+        self._last_rows: Dict[str, np.void] = {}
+        self._last_memory_ids: Dict[str, List[str]] = {}
+        self._memory_offsets: Dict[str, Dict[str, int]] = {}  # name -> {memory id: blob offset}
+
+    def _write_blob(self, data: bytes) -> int:
+        handle = self._handles["blobs.bin"]
+        offset = handle.tell()
+        handle.write(_BLOB_HEADER.pack(len(data)))
+        handle.write(data)
+        return offset
+
+    def _text_ref(self, name: str, field: str, value: str) -> int:
+        previous = self._last_agents.get(name)
+        if previous is not None and getattr(previous, field) == value:
+            return int(self._last_rows[name][field])
+        return self._write_blob(value.encode("utf-8")) if value else -1
+
+    def _memories_ref(self, name: str, memories: MemoryBuffer) -> int:
+        """Memory list blob: offsets of per-memory blobs, each written once"""
+        ids = memories.ids()
+        if name in self._last_rows and self._last_memory_ids.get(name) == ids:
+            return int(self._last_rows[name]["memories"])
+        self._last_memory_ids[name] = ids
+
+        known = self._memory_offsets.get(name, {})
+        offsets = {}
+        for position, memory_id in enumerate(ids):
+            offset = known.get(memory_id)
+            if offset is None:
+                # Only new memories are resolved to full Memory objects
+                data = json.dumps(memories[position].dict(), default=str, ensure_ascii=False)
+                offset = self._write_blob(data.encode("utf-8"))
+            offsets[memory_id] = offset
+        self._memory_offsets[name] = offsets
+
+        if not memories:
+            return -1
+        return self._write_blob(json.dumps(list(offsets.values())).encode("utf-8"))
+
+    def _row(self, agent: AgentSnapshot) -> np.void:
+        name = agent.name
+        if self._last_agents.get(name) is agent:
+            return self._last_rows[name]  # Shared since the last record
+
+        row = np.zeros((), dtype=FRAME_DTYPE)
+        row["x"] = agent.x
+        row["y"] = agent.y
+        row["state"] = STATE_CODES[agent.state]
+        row["cached_direction"] = DIRECTION_CODES[agent.cached_direction]
+        row["next_think_tick"] = -1 if agent.next_think_tick is None else agent.next_think_tick
+        row["think_interval"] = agent.think_interval or 0
+        row["current_thought"] = self._text_ref(name, "current_thought", agent.current_thought)
+        row["current_plan"] = self._text_ref(name, "current_plan", agent.current_plan)
+        row["memories"] = self._memories_ref(name, agent.memories)
+        row["memory_summary"] = self._text_ref(name, "memory_summary", agent.memory_summary)
+
+        self._last_agents[name] = agent
+        self._last_rows[name] = row
+        return row
+
+    def _truncate(self, keep: int) -> None:
+        """Drop recorded ticks from index keep on (rewound run, new branch)"""
+        ticks = self._ticks()
+        interactions = int(ticks["interactions"][keep - 1]) if keep else 0
+        sizes = {
+            "ticks.bin": keep * TICK_DTYPE.itemsize,
+            "frames.bin": keep * len(self._meta["agents"]) * FRAME_DTYPE.itemsize,
+            "interactions.bin": interactions * OFFSET_DTYPE.itemsize,
+        }
+        self._unmap()
+        for name, size in sizes.items():
+            self._handles[name].flush()
+            os.truncate(self._file(name), size)
+        self._reset_dedup()
+
+    def record(self, world: WorldState) -> None:
+        """
+        Append the world's current tick
+        Recording a tick at or before the newest one truncates the newer ticks
+        """
+        if self.read_only:
+            raise PermissionError("History file is open read-only")
+
+        if self._meta is None:
+            self._meta = {
+                "version": FORMAT_VERSION,
+                "seed": world.seed,
+                "agents": [{"name": a.name, "traits": a.traits, "goal": a.goal}
+                           for a in world.agents.values()],
+            }
+            with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+                json.dump(self._meta, f, ensure_ascii=False, indent=2)
+
+        # Freeze the agents so unchanged ones can be recognised by identity next time
+        world = world.copy_snapshot()
+        cast = [info["name"] for info in self._meta["agents"]]
+        if len(cast) != len(world.agents) or any(name not in world.agents for name in cast):
+            raise ValueError("HistoryFile requires the same agents on every tick")
+
+        ticks = self._ticks()
+        keep = len(ticks)
+        if keep and world.tick <= ticks["tick"][-1]:
+            keep = int(np.searchsorted(ticks["tick"], world.tick, side="left"))
+
+        # New interaction records are read before truncating (a seeked world's
+        # log may be backed by this file)
+        recorded = int(ticks["interactions"][keep - 1]) if keep else 0
+        count = len(world.recent_interactions)
+        new_records = list(world.recent_interactions[min(recorded, count):count])
+
+        if keep < len(ticks):
+            self._truncate(keep)
+        if count < recorded:
+            self._unmap()
+            self._handles["interactions.bin"].flush()
+            os.truncate(self._file("interactions.bin"), count * OFFSET_DTYPE.itemsize)
+
+        offsets = [
+            self._write_blob(json.dumps(record.dict(), ensure_ascii=False).encode("utf-8"))
+            for record in new_records
+        ]
+        self._handles["interactions.bin"].write(np.array(offsets, dtype=OFFSET_DTYPE).tobytes())
+
+        frame = np.array([self._row(world.agents[name]) for name in cast], dtype=FRAME_DTYPE)
+        self._handles["frames.bin"].write(frame.tobytes())
+        self._handles["ticks.bin"].write(
+            np.array([(world.tick, count)], dtype=TICK_DTYPE).tobytes()
+        )
+
+        # Blobs first, index last, so a reader never sees a tick without its data
+        for name in ("blobs.bin", "interactions.bin", "frames.bin", "ticks.bin"):
+            self._handles[name].flush()
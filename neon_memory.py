@@ -2,57 +2,184 @@
 Neon Society Memory Management
 LRU + Importance-based retrieval
 """
-from typing import List
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime
-from neon_models import Memory
+from functools import lru_cache
+import math
+
+import numpy as np
+
+from neon_models import Memory, MemoryBuffer
+from sim_clock import DecayTable, SimClock
+from utils import top_k_indices
 import neon_config as config
 
-def add_memory(memories: List[Memory], new_memory: Memory) -> List[Memory]:
+def sim_time(tick: int) -> datetime:
+    """Sim time of a world tick (memories are stamped and scored with it)"""
+    return SimClock(config.SIM_SECONDS_PER_TICK).at(tick)
+
+def add_memory(memories: Iterable[Memory], new_memory: Memory) -> MemoryBuffer:
     """
     Add memory with LRU eviction if at capacity
+    Memories are kept in insertion order, so the oldest is overwritten in O(1)
+    Returns the buffer to store (a copy if memories was shared with a snapshot)
     """
-    # Add new memory
-    memories.append(new_memory)
+    if not isinstance(memories, MemoryBuffer):
+        memories = MemoryBuffer(memories)
+    elif memories.frozen:
+        memories = memories.copy()
     
-    # Enforce LRU cap
-    if len(memories) > config.MAX_MEMORIES:
-        # Sort by timestamp (oldest first)
-        memories.sort(key=lambda m: m.timestamp)
-        # Remove oldest
-        memories.pop(0)
+    memories.append(new_memory)
+    return memories
+
+def add_conversation_memory(memories: Iterable[Memory], partner: str, summary: str,
+                            importance: int = config.CONVERSATION_IMPORTANCE,
+                            timestamp: Optional[datetime] = None) -> MemoryBuffer:
+    """
+    Add a conversation memory without building a Memory object
+    Partner name and summary are interned in content_store, so both
+    participants (and every snapshot) share a single copy of the text
+    """
+    if not isinstance(memories, MemoryBuffer):
+        memories = MemoryBuffer(memories)
+    elif memories.frozen:
+        memories = memories.copy()
     
+    memories.append_conversation(partner, summary, importance, timestamp)
     return memories
 
-def get_top_memories(memories: List[Memory], k: int = 5) -> List[Memory]:
+def needs_consolidation(memories: Iterable[Memory], batch: Optional[int] = None) -> bool:
+    """Whether enough evicted memories are pending to merge into the summary"""
+    batch = batch or config.CONSOLIDATION_BATCH
+    return isinstance(memories, MemoryBuffer) and len(memories.pending) >= batch
+
+def take_evicted(memories: MemoryBuffer) -> Tuple[MemoryBuffer, List[str]]:
+    """
+    Drain the evicted memory texts awaiting consolidation
+    Returns (buffer to store, texts), the buffer copied if shared with a snapshot
+    """
+    if memories.frozen:
+        memories = memories.copy()
+    evicted, memories.pending = memories.pending, []
+    return memories, evicted
+
+def score_memories(importance: np.ndarray, timestamps: np.ndarray, now: float) -> np.ndarray:
+    """
+    Combined importance and recency score for arrays of memories
+    timestamps and now are POSIX seconds
+    """
+    # Normalize importance (1-10 -> 0-1)
+    importance_score = (importance - 1) / 9.0
+    
+    # Recency score (linear decay over the horizon, looked up per tick of age)
+    recency_score = recency_table(config.SIM_SECONDS_PER_TICK, config.RECENCY_HORIZON_HOURS)(timestamps, now)
+    
+    return importance_score * config.IMPORTANCE_WEIGHT + recency_score * config.RECENCY_WEIGHT
+
+@lru_cache(maxsize=None)
+def recency_table(seconds_per_tick: float, horizon_hours: float) -> DecayTable:
+    """Linear recency decay sampled per tick, up to the tick where it reaches 0"""
+    return DecayTable(lambda hours: np.maximum(0.0, 1.0 - hours / horizon_hours), seconds_per_tick,
+                      math.ceil(horizon_hours * 3600 / seconds_per_tick))
+
+def get_top_memories(memories: Iterable[Memory], k: int = 5, *, now: datetime) -> List[Memory]:
     """
     Retrieve top-k memories by combined importance and recency
+    now is the sim time to score recency at (see sim_time)
     """
     if not memories:
         return []
     
-    now = datetime.now()
+    if not isinstance(memories, MemoryBuffer):
+        memories = list(memories)
+        memories = MemoryBuffer(memories, capacity=len(memories))
     
-    # Score each memory
-    scored = []
-    for mem in memories:
-        # Normalize importance (1-10 -> 0-1)
-        importance_score = (mem.importance - 1) / 9.0
-        
-        # Recency score (exponential decay)
-        age_seconds = (now - mem.timestamp).total_seconds()
-        age_hours = age_seconds / 3600.0
-        recency_score = max(0.0, 1.0 - (age_hours / 24.0))  # Decay over 24 hours
-        
-        # Combined score
-        final_score = (
-            importance_score * config.IMPORTANCE_WEIGHT +
-            recency_score * config.RECENCY_WEIGHT
-        )
-        
-        scored.append((mem, final_score))
-    
-    # Sort by score descending
-    scored.sort(key=lambda x: x[1], reverse=True)
+    scores = score_memories(memories.importance, memories.timestamps, now.timestamp())
     
-    # Return top-k
-    return [mem for mem, score in scored[:k]]
+    return [memories.slot(i) for i in top_k_indices(scores, memories.order(), k)]
+
+class MemoryTable:
+    """
+    Population-level memory columns for batched scoring
+    Row r is memory position[r] (0 = oldest) of agent keys[agent[r]]
+    """
+
+    def __init__(self, keys: List[Hashable], sizes: np.ndarray, agent: np.ndarray,
+                 position: np.ndarray, importance: np.ndarray,
+                 timestamps: np.ndarray, types: np.ndarray):
+        self.keys = keys
+        self.sizes = sizes
+        self.agent = agent
+        self.position = position
+        self.importance = importance
+        self.timestamps = timestamps
+        self.types = types
+
+    @classmethod
+    def from_buffers(cls, buffers: Dict[Hashable, Sequence[Memory]]) -> 'MemoryTable':
+        """Gather agents' memories (MemoryBuffers, or lists) into one table"""
+        keys = list(buffers)
+        coerced = [
+            memories if isinstance(memories, MemoryBuffer) else MemoryBuffer(memories, capacity=max(len(memories), 1))
+            for memories in buffers.values()
+        ]
+        sizes = np.array([len(memories) for memories in coerced], dtype=np.int64)
+
+        def column(get, dtype):
+            if not coerced:
+                return np.zeros(0, dtype=dtype)
+            return np.concatenate([get(memories) for memories in coerced]).astype(dtype, copy=False)
+
+        return cls(
+            keys,
+            sizes,
+            np.repeat(np.arange(len(keys)), sizes),
+            column(MemoryBuffer.order, np.int64),
+            column(lambda m: m.importance, np.float32),
+            column(lambda m: m.timestamps, np.float64),
+            column(lambda m: m.types, np.int8),
+        )
+
+    def __len__(self) -> int:
+        return len(self.agent)
+
+    def top_k_per_agent(self, k: int, now: datetime) -> Dict[Hashable, np.ndarray]:
+        """
+        Positions (0 = oldest) of each agent's k best memories, best first
+        Scores every row in one pass on an agents x memories matrix; ties
+        break by position, matching get_top_memories
+        """
+        width = int(self.sizes.max()) if len(self.sizes) else 0
+        k = min(k, width)
+        if k <= 0:
+            return {key: np.zeros(0, dtype=np.intp) for key in self.keys}
+
+        scores = np.full((len(self.keys), width), -np.inf)
+        scores[self.agent, self.position] = score_memories(self.importance, self.timestamps, now.timestamp())
+
+        # Per-row k-th best score; everything above it is in, ties fill the rest by position
+        threshold = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > threshold
+        ties = scores == threshold
+        room = k - above.sum(axis=1, keepdims=True)
+        selected = (above | (ties & (np.cumsum(ties, axis=1) <= room))) & np.isfinite(scores)
+
+        # Selected columns first (in position order), then best-first within the k
+        columns = np.argsort(~selected, axis=1, kind="stable")[:, :k]
+        picked = np.take_along_axis(scores, columns, axis=1)
+        columns = np.take_along_axis(columns, np.lexsort((columns, -picked), axis=-1), axis=1)
+
+        counts = np.minimum(self.sizes, k)
+        return {key: columns[row, :counts[row]] for row, key in enumerate(self.keys)}
+
+def top_memories_per_agent(buffers: Dict[Hashable, Sequence[Memory]], k: int = 5, *,
+                           now: datetime) -> Dict[Hashable, List[Memory]]:
+    """Top-k memories of many agents at once (see MemoryTable.top_k_per_agent)"""
+    top = MemoryTable.from_buffers(buffers).top_k_per_agent(k, now)
+    return {key: [buffers[key][int(i)] for i in positions] for key, positions in top.items()}
+
+def top_contents_per_agent(buffers: Dict[Hashable, MemoryBuffer], k: int = 5, *,
+                           now: datetime) -> Dict[Hashable, List[str]]:
+    """Texts of many agents' top-k memories, resolved without building Memory objects"""
+    top = MemoryTable.from_buffers(buffers).top_k_per_agent(k, now)
+    return {key: [buffers[key].content(int(i)) for i in positions] for key, positions in top.items()}
@@ -3,7 +3,9 @@ Neon Society Mock Brain
 Fallback rule-based logic when Gemini unavailable
 """
 import random
-from typing import Dict, Literal
+from typing import Dict, List, Literal
+
+import neon_config as config
 
 # Template thoughts for different personality types
 DRAMATIC_THOUGHTS = [
@@ -43,28 +45,31 @@ DEFAULT_PLANS = [
 ]
 
 def get_mock_decision(agent_name: str, traits: str, goal: str, 
-                      position: tuple, nearby_agents: list) -> Dict:
+                      position: tuple, nearby_agents: list, rng=None) -> Dict:
     """
     Generate mock decision based on simple rules
+    rng: random.Random-like stream (default: global random module)
     Returns: {"thought": str, "action": str, "plan": str}
     """
+    rng = rng or random
+    
     # Select templates based on traits
     if "dramatic" in traits.lower() or "shakespeare" in traits.lower():
-        thought = random.choice(DRAMATIC_THOUGHTS)
-        plan = random.choice(DRAMATIC_PLANS)
+        thought = rng.choice(DRAMATIC_THOUGHTS)
+        plan = rng.choice(DRAMATIC_PLANS)
     elif "cynical" in traits.lower() or "tired" in traits.lower():
-        thought = random.choice(CYNICAL_THOUGHTS)
-        plan = random.choice(CYNICAL_PLANS)
+        thought = rng.choice(CYNICAL_THOUGHTS)
+        plan = rng.choice(CYNICAL_PLANS)
     else:
-        thought = random.choice(DEFAULT_THOUGHTS)
-        plan = random.choice(DEFAULT_PLANS)
+        thought = rng.choice(DEFAULT_THOUGHTS)
+        plan = rng.choice(DEFAULT_PLANS)
     
     # Random walk with slight bias toward center
     x, y = position
     center = 10
     
     # Bias toward center
-    if random.random() < 0.3:
+    if rng.random() < 0.3:
         if x < center:
             action = "RIGHT"
         elif x > center:
@@ -77,7 +82,7 @@ def get_mock_decision(agent_name: str, traits: str, goal: str,
             action = "STAY"
     else:
         # Random movement
-        action = random.choice(["UP", "DOWN", "LEFT", "RIGHT", "STAY", "STAY"])
+        action = rng.choice(["UP", "DOWN", "LEFT", "RIGHT", "STAY", "STAY"])
     
     return {
         "thought": thought,
@@ -86,11 +91,14 @@ def get_mock_decision(agent_name: str, traits: str, goal: str,
     }
 
 def generate_mock_dialogue(agent1_name: str, agent1_traits: str,
-                           agent2_name: str, agent2_traits: str) -> Dict:
+                           agent2_name: str, agent2_traits: str, rng=None) -> Dict:
     """
     Generate simple mock conversation
+    rng: random.Random-like stream (default: global random module)
     Returns: {"dialogue": str, "summary": str}
     """
+    rng = rng or random
+    
     # Simple template-based dialogue
     greetings = [
         f"{agent1_name}: 'Oh, hello there.'",
@@ -104,10 +112,30 @@ def generate_mock_dialogue(agent1_name: str, agent1_traits: str,
         f"{agent2_name}: 'Oh, hey.'",
     ]
     
-    dialogue = f"{random.choice(greetings)}\n{random.choice(responses)}"
+    dialogue = f"{rng.choice(greetings)}\n{rng.choice(responses)}"
     summary = f"{agent1_name} and {agent2_name} had a brief chat."
     
     return {
         "dialogue": dialogue,
         "summary": summary
     }
+
+SUMMARY_SEPARATOR = "; "
+
+def summarize_memories(previous: str, contents: List[str],
+                       max_chars: int = config.SUMMARY_MAX_CHARS) -> str:
+    """
+    Fold evicted memory texts into a rolling summary (deterministic)
+    Repeated texts are kept once; the oldest entries are dropped to stay within max_chars
+    """
+    parts = [part for part in previous.split(SUMMARY_SEPARATOR) if part]
+    seen = set(parts)
+    for text in contents:
+        if text not in seen:
+            seen.add(text)
+            parts.append(text)
+    
+    while len(parts) > 1 and len(SUMMARY_SEPARATOR.join(parts)) > max_chars:
+        parts.pop(0)
+    
+    return SUMMARY_SEPARATOR.join(parts)[-max_chars:]
@@ -2,11 +2,22 @@
 Neon Society Data Models
 Clean implementation following architecture specification
 """
-from pydantic import BaseModel, Field
-from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set
+from collections.abc import Sequence
+from itertools import islice
+import itertools
+import sys
+import threading
+import uuid
 from datetime import datetime
 from copy import deepcopy
 
+import numpy as np
+from pydantic_core import core_schema
+
+import neon_config as config
+
 class Memory(BaseModel):
     """Single memory entry with LRU and importance"""
     id: str = Field(default_factory=lambda: str(__import__('uuid').uuid4()))
@@ -15,6 +26,299 @@ class Memory(BaseModel):
     importance: int = Field(ge=1, le=10)  # 1-10 scale
     type: Literal["observation", "conversation"] = "observation"
 
+MEMORY_TYPES = ("observation", "conversation")
+CONVERSATION_TEMPLATE = "Conversation with {partner}: {summary}"
+
+class ContentStore:
+    """
+    Interned strings shared by every world, snapshot and agent
+    Each distinct text is stored once and referenced by an int. References
+    are counted: holders release them (MemoryBuffer on eviction and when it
+    is dropped, e.g. with an evicted history snapshot) and a text is freed,
+    its ref reused, once nothing holds it
+    """
+    
+    def __init__(self):
+        self._texts: List[Optional[str]] = []
+        self._refs: Dict[str, int] = {}
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._free: List[int] = []
+        self._lock = threading.RLock()  # Buffers may be released from any thread (GC)
+    
+    def intern(self, text: str) -> int:
+        """Ref of text, taking one reference to it"""
+        with self._lock:
+            ref = self._refs.get(text)
+            if ref is None:
+                if self._free:
+                    ref = self._free.pop()
+                    self._texts[ref] = text
+                else:
+                    ref = len(self._texts)
+                    self._texts.append(text)
+                    if ref == len(self._counts):
+                        self._counts = np.resize(self._counts, max(64, 2 * ref))
+                    self._counts[ref] = 0
+                self._refs[text] = ref
+            self._counts[ref] += 1
+            return ref
+    
+    def acquire(self, refs: np.ndarray) -> None:
+        """Take one more reference to each ref (negative refs are ignored)"""
+        refs = refs[refs >= 0]
+        if len(refs):
+            with self._lock:
+                np.add.at(self._counts, refs, 1)
+    
+    def release(self, refs: np.ndarray) -> None:
+        """Drop one reference to each ref (negative refs are ignored)"""
+        refs = refs[refs >= 0]
+        if not len(refs):
+            return
+        with self._lock:
+            np.subtract.at(self._counts, refs, 1)
+            for ref in set(refs[self._counts[refs] <= 0].tolist()):
+                del self._refs[self._texts[ref]]
+                self._texts[ref] = None
+                self._counts[ref] = 0
+                self._free.append(ref)
+    
+    def text(self, ref: int) -> str:
+        return self._texts[ref]
+    
+    def canonical(self, text: str) -> str:
+        """The stored copy of text if it is interned (lets records share one string object), else text"""
+        ref = self._refs.get(text)
+        return text if ref is None else self._texts[ref]
+    
+    def __len__(self) -> int:
+        """Number of live texts"""
+        return len(self._refs)
+
+content_store = ContentStore()
+
+# Ids for memories created by reference: cheap counter, unique per process
+_memory_ids = itertools.count()
+_MEMORY_ID_PREFIX = uuid.uuid4().hex[:12] + "-"
+
+MEMORY_ROW_DTYPE = np.dtype([
+    ("text", "<i8"),        # content_store ref (conversation: summary), -1 = Memory object
+    ("partner", "<i8"),     # content_store ref of conversation partner, -1 = none
+    ("importance", "<f4"),
+    ("timestamp", "<f8"),   # POSIX seconds
+    ("type", "i1"),         # Index into MEMORY_TYPES
+])
+
+class MemoryBuffer(Sequence):
+    """
+    Capped memory list in insertion (= timestamp) order
+    At capacity, appending overwrites the oldest entry in place (ring buffer).
+    Memories are stored as columns: importance, timestamps and types in a NumPy
+    record array for vectorized scoring (see neon_memory), text as content_store
+    refs. Memory objects are only built when an entry is read, except for
+    memories appended as objects, which are kept as given.
+    
+    A buffer shared between snapshots is frozen (see WorldState.mutable_agent);
+    the neon_memory add functions copy a frozen buffer before appending.
+    
+    With config.CONSOLIDATE_MEMORIES, the text of each evicted memory is kept
+    in pending until neon_memory.take_evicted hands it to consolidation.
+    """
+    __slots__ = ("capacity", "frozen", "pending", "_ids", "_items", "_rows", "_head")
+    
+    def __init__(self, memories: Iterable[Memory] = (), capacity: Optional[int] = None):
+        self.capacity = capacity or config.MAX_MEMORIES
+        self.frozen = False
+        self.pending: List[str] = []  # Evicted texts awaiting consolidation
+        self._ids: List[str] = []
+        self._items: List[Optional[Memory]] = []  # Memory if appended as an object
+        self._rows = np.zeros(0, dtype=MEMORY_ROW_DTYPE)
+        self._head = 0  # Slot of the oldest memory (non-zero only once full)
+        for memory in memories:
+            self.append(memory)
+    
+    def _slot_for_append(self) -> int:
+        """Slot for a new entry, evicting the oldest memory if at capacity"""
+        if self.frozen:
+            raise RuntimeError("MemoryBuffer is shared with a snapshot; copy() it first")
+        
+        size = len(self._items)
+        if size < self.capacity:
+            if size == len(self._rows):
+                # Grow geometrically up to capacity, so large caps cost nothing until used
+                grown = min(max(8, 2 * size), self.capacity)
+                self._rows = np.resize(self._rows, grown)
+            self._ids.append("")
+            self._items.append(None)
+            return size
+        
+        slot = self._head
+        if config.CONSOLIDATE_MEMORIES:
+            self.pending.append(self._content_at(slot))
+        content_store.release(np.array([self._rows[slot]["text"], self._rows[slot]["partner"]]))
+        self._head = (slot + 1) % self.capacity
+        return slot
+    
+    def append(self, memory: Memory) -> None:
+        """Add a memory, evicting the oldest one if at capacity"""
+        slot = self._slot_for_append()
+        self._ids[slot] = memory.id
+        self._items[slot] = memory
+        self._rows[slot] = (-1, -1, memory.importance, memory.timestamp.timestamp(),
+                            MEMORY_TYPES.index(memory.type))
+    
+    def append_conversation(self, partner: str, summary: str, importance: int,
+                            timestamp: Optional[datetime] = None) -> None:
+        """Add a conversation memory by reference (partner and summary interned)"""
+        slot = self._slot_for_append()
+        self._ids[slot] = f"{_MEMORY_ID_PREFIX}{next(_memory_ids)}"
+        self._items[slot] = None
+        self._rows[slot] = (content_store.intern(summary), content_store.intern(partner), importance,
+                            (timestamp or datetime.now()).timestamp(), MEMORY_TYPES.index("conversation"))
+    
+    def copy(self) -> 'MemoryBuffer':
+        clone = MemoryBuffer.__new__(MemoryBuffer)
+        clone.capacity = self.capacity
+        clone.frozen = False
+        clone.pending = list(self.pending)
+        clone._ids = list(self._ids)
+        clone._items = list(self._items)
+        clone._rows = self._rows.copy()
+        clone._head = self._head
+        content_store.acquire(clone._refs())
+        return clone
+    
+    def __copy__(self) -> 'MemoryBuffer':
+        return self.copy()  # Takes its own content_store refs
+    
+    def __deepcopy__(self, memo) -> 'MemoryBuffer':
+        clone = self.copy()
+        clone._items = deepcopy(clone._items, memo)
+        return clone
+    
+    def __reduce__(self):
+        # content_store refs are only valid in this process: pickle the resolved memories
+        return _restore_buffer, (list(self), self.capacity, list(self.pending))
+    
+    def _refs(self) -> np.ndarray:
+        """content_store refs held by this buffer (-1 where none)"""
+        rows = self._rows[:len(self._items)]
+        return np.concatenate([rows["text"], rows["partner"]])
+    
+    def __del__(self):
+        if sys.is_finalizing():
+            return
+        try:
+            content_store.release(self._refs())
+        except AttributeError:
+            pass  # Partially built
+    
+    # Slot-order views (slot i holds logical position order()[i])
+    @property
+    def importance(self) -> np.ndarray:
+        return self._rows["importance"][:len(self._items)]
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Creation times as POSIX seconds"""
+        return self._rows["timestamp"][:len(self._items)]
+    
+    @property
+    def types(self) -> np.ndarray:
+        return self._rows["type"][:len(self._items)]
+    
+    def order(self) -> np.ndarray:
+        """Logical position (0 = oldest) of every slot"""
+        size = len(self._items)
+        return (np.arange(size) - self._head) % max(size, 1)
+    
+    def _slot_of(self, index: int) -> int:
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("memory index out of range")
+        return (self._head + index) % size
+    
+    def _content_at(self, slot: int) -> str:
+        item = self._items[slot]
+        if item is not None:
+            return item.content
+        row = self._rows[slot]
+        summary = content_store.text(int(row["text"]))
+        if row["partner"] < 0:
+            return summary
+        return CONVERSATION_TEMPLATE.format(
+            partner=content_store.text(int(row["partner"])), summary=summary
+        )
+    
+    def _memory_at(self, slot: int) -> Memory:
+        item = self._items[slot]
+        if item is not None:
+            return item
+        row = self._rows[slot]
+        return Memory(
+            id=self._ids[slot],
+            content=self._content_at(slot),
+            timestamp=datetime.fromtimestamp(row["timestamp"]),
+            importance=int(row["importance"]),
+            type=MEMORY_TYPES[row["type"]]
+        )
+    
+    def slot(self, i: int) -> Memory:
+        return self._memory_at(i)
+    
+    def content(self, index: int) -> str:
+        """Text of the memory at a logical position, without building a Memory"""
+        return self._content_at(self._slot_of(index))
+    
+    def ids(self) -> List[str]:
+        """Memory ids, oldest first"""
+        return self._ids[self._head:] + self._ids[:self._head]
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        return self._memory_at(self._slot_of(index))
+    
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self._memory_at((self._head + index) % len(self._items))
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (MemoryBuffer, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+    
+    def __repr__(self) -> str:
+        return f"MemoryBuffer({list(self)!r})"
+    
+    @classmethod
+    def validate(cls, value) -> 'MemoryBuffer':
+        """Buffer as given, or built from a list of Memory objects / dicts"""
+        if isinstance(value, MemoryBuffer):
+            return value
+        return MemoryBuffer(Memory(**m) if isinstance(m, dict) else m for m in value)
+    
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Fields validate from and serialize to a plain list of memories
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda memories, info: [m.model_dump(mode=info.mode) for m in memories], info_arg=True
+            )
+        )
+
+def _restore_buffer(memories: List[Memory], capacity: int, pending: List[str]) -> MemoryBuffer:
+    """Unpickle a MemoryBuffer (see MemoryBuffer.__reduce__)"""
+    buffer = MemoryBuffer(memories, capacity=capacity)
+    buffer.pending = pending
+    return buffer
+
 class AgentSnapshot(BaseModel):
     """Complete agent state at a single point in time"""
     name: str
@@ -26,20 +330,19 @@ class AgentSnapshot(BaseModel):
     # State machine
     state: Literal["IDLE", "MOVING", "THINKING", "TALKING"] = "IDLE"
     
-    # Throttling
-    ticks_until_next_think: int = 0
+    # Throttling: tick of the agent's next deep thought (None = the first tick it is scheduled)
+    next_think_tick: Optional[int] = None
+    think_interval: Optional[int] = Field(default=None, ge=1)  # None = config.THINK_INTERVAL
     cached_direction: Literal["UP", "DOWN", "LEFT", "RIGHT", "STAY"] = "STAY"
     
     # Cognition
     current_thought: str = ""
     current_plan: str = ""
     
-    # Memory (LRU capped at 20)
-    memories: List[Memory] = Field(default_factory=list)
+    # Memory (LRU capped at config.MAX_MEMORIES)
+    memories: MemoryBuffer = Field(default_factory=MemoryBuffer)
+    memory_summary: str = ""  # Rolling summary of evicted memories (see neon_memory)
     
-    class Config:
-        arbitrary_types_allowed = True
-
 class InteractionRecord(BaseModel):
     """Record of a conversation between agents"""
     tick: int
@@ -47,19 +350,124 @@ class InteractionRecord(BaseModel):
     dialogue: str
     summary: str
 
+class InteractionLog(Sequence):
+    """
+    Append-only interaction log whose snapshots share storage
+    A snapshot is a view of the first n records of a shared list; extending a
+    view that no longer ends the list (a rewound branch), or that is backed by
+    another sequence (e.g. a history file), copies its prefix first
+    """
+    __slots__ = ("_items", "_len")
+    
+    def __init__(self, records: Optional[Iterable[InteractionRecord]] = None):
+        self._items: List[InteractionRecord] = list(records or [])
+        self._len = len(self._items)
+    
+    @classmethod
+    def over(cls, records: Sequence, length: Optional[int] = None) -> 'InteractionLog':
+        """View of the first length records of an existing sequence (not copied)"""
+        view = cls.__new__(cls)
+        view._items = records
+        view._len = len(records) if length is None else length
+        return view
+    
+    def snapshot(self) -> 'InteractionLog':
+        """O(1) frozen view of the current records"""
+        return InteractionLog.over(self._items, self._len)
+    
+    def extend(self, records: Iterable[InteractionRecord]) -> None:
+        if self._len != len(self._items) or not isinstance(self._items, list):
+            self._items = list(self._items[:self._len])
+        self._items.extend(records)
+        self._len = len(self._items)
+    
+    def append(self, record: InteractionRecord) -> None:
+        self.extend([record])
+    
+    def __len__(self) -> int:
+        return self._len
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[slice(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("interaction log index out of range")
+        return self._items[index]
+    
+    def __iter__(self):
+        return islice(self._items, self._len)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (InteractionLog, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+    
+    def __repr__(self) -> str:
+        return f"InteractionLog({list(self)!r})"
+    
+    @classmethod
+    def validate(cls, value) -> 'InteractionLog':
+        """Log as given, or built from a list of InteractionRecord objects / dicts"""
+        if isinstance(value, InteractionLog):
+            return value
+        return InteractionLog(InteractionRecord(**r) if isinstance(r, dict) else r for r in value)
+    
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Fields validate from and serialize to a plain list of records
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda log, info: [r.model_dump(mode=info.mode) for r in log], info_arg=True
+            )
+        )
+
 class WorldState(BaseModel):
-    """Immutable snapshot of entire world at a tick"""
+    """
+    Snapshot of entire world at a tick
+    Snapshots share unchanged agents and the interaction log (copy-on-write):
+    modify agents through mutable_agent(), never in place via agents[name]
+    """
     tick: int = 0
+    seed: Optional[int] = None  # Per-agent RNG streams derive from this (None = nondeterministic)
     agents: Dict[str, AgentSnapshot] = Field(default_factory=dict)
-    recent_interactions: List[InteractionRecord] = Field(default_factory=list)
+    recent_interactions: InteractionLog = Field(default_factory=InteractionLog)
+    
+    # Spatial index (neon_spatial.SpatialGrid), rebuilt lazily by the engine
+    _spatial_grid: Any = PrivateAttr(default=None)
+    # Wake-time queue (neon_scheduler.ThinkScheduler), rebuilt lazily by the engine
+    _think_scheduler: Any = PrivateAttr(default=None)
+    # Summaries being written in the background (neon_dispatch.BackgroundJobs)
+    _consolidation_jobs: Any = PrivateAttr(default=None)
+    # Agents this world may modify in place (None = all, nothing shared yet)
+    _owned_agents: Optional[Set[str]] = PrivateAttr(default=None)
+    
+    def mutable_agent(self, name: str) -> AgentSnapshot:
+        """
+        Agent that is safe to modify in place
+        Copied on first write after a snapshot; its memory buffer stays shared
+        but frozen, so the next memory write copies it (see neon_memory)
+        """
+        if self._owned_agents is not None and name not in self._owned_agents:
+            agent = self.agents[name]
+            agent.memories.frozen = True
+            self.agents[name] = agent.copy()
+            self._owned_agents.add(name)
+        return self.agents[name]
     
     def copy_snapshot(self) -> 'WorldState':
-        """Deep copy for DVR history"""
-        return WorldState(
+        """
+        Structurally shared copy for DVR history
+        Agents and interaction records are shared until either side writes
+        """
+        snapshot = WorldState.construct(
             tick=self.tick,
-            agents={name: AgentSnapshot(**agent.dict()) for name, agent in self.agents.items()},
-            recent_interactions=[InteractionRecord(**rec.dict()) for rec in self.recent_interactions]
+            seed=self.seed,
+            agents=dict(self.agents),
+            recent_interactions=self.recent_interactions.snapshot()
         )
-    
-    class Config:
-        arbitrary_types_allowed = True
+        snapshot._owned_agents = set()
+        self._owned_agents = set()
+        return snapshot
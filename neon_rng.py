@@ -0,0 +1,17 @@
+"""
+Neon Society Deterministic RNG Streams
+Per-agent random streams derived from a world-level seed
+"""
+import random
+from typing import Optional
+
+def agent_rng(seed: Optional[int], agent_name: str, tick: int, stream: str = ""):
+    """
+    Independent RNG for one agent at one tick
+    Derived only from (seed, agent, tick, stream), so results don't depend on
+    processing order and a run can be replayed from any snapshot.
+    Returns the global random module when seed is None (nondeterministic).
+    """
+    if seed is None:
+        return random
+    return random.Random(f"{seed}:{agent_name}:{tick}:{stream}")
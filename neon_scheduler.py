@@ -0,0 +1,93 @@
+"""
+Neon Society Think Scheduler
+Min-heap of agents keyed by the tick at which they next think
+
+Instead of decrementing every agent's countdown every tick, each agent is
+scheduled once for an absolute wake tick. A tick only pops the agents that
+are due, so scheduling cost scales with the number of thinkers.
+"""
+import heapq
+from typing import Dict, Iterable, KeysView, List, Optional, Tuple
+
+from neon_models import AgentSnapshot
+import neon_config as config
+
+def think_interval(agent: AgentSnapshot) -> int:
+    """Ticks between deep thoughts for this agent"""
+    return agent.think_interval or config.THINK_INTERVAL
+
+def due_tick(agent: AgentSnapshot, tick: int) -> int:
+    """
+    Tick at which the agent next thinks
+    An agent never scheduled is due at tick
+    """
+    return tick if agent.next_think_tick is None else agent.next_think_tick
+
+def countdown(agent: AgentSnapshot, tick: int) -> int:
+    """Equivalent per-tick countdown at the given world tick"""
+    return max(due_tick(agent, tick) - tick + 1, 1)
+
+class ThinkScheduler:
+    """
+    Wake-time priority queue
+    Entries are (due_tick, order, name); ties pop in agent insertion order.
+    Rescheduled agents leave stale heap entries that are skipped lazily.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, str]] = []
+        self._due: Dict[str, int] = {}
+        self._order: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._due
+
+    def names(self) -> KeysView[str]:
+        """Names of every scheduled agent (set-like)"""
+        return self._due.keys()
+
+    def due_tick(self, name: str) -> Optional[int]:
+        return self._due.get(name)
+
+    def schedule(self, name: str, tick: int) -> None:
+        """Schedule (or reschedule) an agent's next thought"""
+        if name not in self._order:
+            self._order[name] = len(self._order)
+        self._due[name] = tick
+        heapq.heappush(self._heap, (tick, self._order[name], name))
+        self._maybe_compact()
+
+    def postpone(self, names: Iterable[str], ticks: int = 1) -> None:
+        """Push back scheduled agents (their timer is paused while talking)"""
+        for name in names:
+            if name in self._due:
+                self.schedule(name, self._due[name] + ticks)
+
+    def remove(self, name: str) -> None:
+        self._due.pop(name, None)
+
+    def pop_due(self, tick: int) -> List[str]:
+        """
+        Remove and return every agent due at or before tick
+        Returned in agent insertion order; callers must reschedule them
+        """
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= tick:
+            entry_tick, _, name = heapq.heappop(heap)
+            if self._due.get(name) != entry_tick:
+                continue  # Stale entry
+            del self._due[name]
+            due.append(name)
+
+        due.sort(key=self._order.__getitem__)
+        return due
+
+    def _maybe_compact(self) -> None:
+        """Drop stale entries once they dominate the heap"""
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(tick, self._order[name], name) for name, tick in self._due.items()]
+            heapq.heapify(self._heap)
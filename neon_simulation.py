@@ -3,32 +3,79 @@ Neon Society Simulation Engine
 Tick-based world simulation with proximity interactions
 """
 import math
-from typing import List, Tuple, Dict
+import time
+from typing import List, Optional, Tuple, Dict
 from datetime import datetime
 
-from neon_models import WorldState, AgentSnapshot, Memory, InteractionRecord
+from neon_models import WorldState, AgentSnapshot, InteractionRecord, content_store
+from neon_spatial import SpatialGrid
+from neon_scheduler import ThinkScheduler
+import neon_scheduler as scheduler_lib
 import neon_config as config
 import neon_memory as memory_lib
 import neon_mock_brain as mock_brain
+from neon_rng import agent_rng
 
 def proximity_check(agent1: AgentSnapshot, agent2: AgentSnapshot) -> float:
     """Calculate Euclidean distance between two agents"""
     return math.sqrt((agent1.x - agent2.x)**2 + (agent1.y - agent2.y)**2)
 
-def find_nearby_agents(world: WorldState, agent_name: str) -> List[str]:
-    """Find all agents within proximity radius"""
-    agent = world.agents[agent_name]
-    nearby = []
+def add_phase_time(timings: Optional[Dict[str, float]], phase: str, start: float) -> float:
+    """
+    Accumulate time spent in a tick phase (no-op when timings is None)
+    Returns the current perf_counter so phases can be chained
+    """
+    now = time.perf_counter()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + (now - start)
+    return now
+
+def get_spatial_grid(world: WorldState) -> SpatialGrid:
+    """
+    Return the world's spatial index, building it if missing or stale
+    The grid is kept up to date by execute_movement afterwards
+    """
+    grid = world._spatial_grid
     
-    for other_name, other_agent in world.agents.items():
-        if other_name == agent_name:
-            continue
-        
-        distance = proximity_check(agent, other_agent)
-        if distance <= config.PROXIMITY_RADIUS:
-            nearby.append(other_name)
+    # Same count is not enough: an agent may have been swapped for another
+    if grid is None or grid.names() != world.agents.keys():
+        grid = SpatialGrid(cell_size=config.PROXIMITY_RADIUS)
+        for name, agent in world.agents.items():
+            grid.insert(name, agent.x, agent.y)
+        world._spatial_grid = grid
     
-    return nearby
+    return grid
+
+def get_consolidation_jobs(world: WorldState):
+    """Return the world's background summarization jobs, creating them if missing"""
+    if world._consolidation_jobs is None:
+        import neon_dispatch as dispatch
+        world._consolidation_jobs = dispatch.BackgroundJobs(config.LLM_MAX_CONCURRENCY)
+    return world._consolidation_jobs
+
+def get_think_scheduler(world: WorldState) -> ThinkScheduler:
+    """
+    Return the world's think scheduler, building it if missing or stale
+    Built from each agent's next_think_tick (agents never scheduled are
+    pinned to the current tick here)
+    """
+    scheduler = world._think_scheduler
+    
+    if scheduler is None or scheduler.names() != world.agents.keys():
+        scheduler = ThinkScheduler()
+        for name, agent in world.agents.items():
+            if agent.next_think_tick is None:
+                agent = world.mutable_agent(name)
+                agent.next_think_tick = scheduler_lib.due_tick(agent, world.tick)
+            scheduler.schedule(name, agent.next_think_tick)
+        world._think_scheduler = scheduler
+    
+    return scheduler
+
+def find_nearby_agents(world: WorldState, agent_name: str) -> List[str]:
+    """Find all agents within proximity radius (adjacent grid cells only)"""
+    grid = get_spatial_grid(world)
+    return grid.neighbors(agent_name, config.PROXIMITY_RADIUS)
 
 def detect_interaction_groups(world: WorldState) -> List[List[str]]:
     """
@@ -59,10 +106,187 @@ def detect_interaction_groups(world: WorldState) -> List[List[str]]:
     
     return groups
 
-def process_interaction(world: WorldState, group: List[str], use_mock: bool = True) -> InteractionRecord:
+def generate_dialogue(agent1_name: str, agent1_traits: str,
+                      agent2_name: str, agent2_traits: str,
+                      use_mock: bool = True, rng=None) -> Dict:
+    """
+    Get a conversation from Gemini, falling back to the mock brain
+    rng seeds the mock brain (see neon_rng.agent_rng)
+    Returns: {"dialogue": str, "summary": str}
+    """
+    convo = None
+    if not use_mock:
+        # Try Gemini first
+        import neon_gemini_service as gemini
+        convo = gemini.generate_gemini_dialogue(
+            agent1_name, agent1_traits,
+            agent2_name, agent2_traits
+        )
+    
+    # Fallback to mock
+    if convo is None:
+        convo = mock_brain.generate_mock_dialogue(
+            agent1_name, agent1_traits,
+            agent2_name, agent2_traits,
+            rng
+        )
+    
+    return convo
+
+def get_decision(agent_name: str, traits: str, goal: str, position: tuple,
+                 memories: List[str], use_mock: bool = True, rng=None) -> Dict:
+    """
+    Get a decision from Gemini, falling back to the mock brain
+    rng seeds the mock brain (see neon_rng.agent_rng)
+    Returns: {"thought": str, "action": str, "plan": str}
+    """
+    decision = None
+    if not use_mock:
+        # Try Gemini first
+        import neon_gemini_service as gemini
+        decision = gemini.get_gemini_decision(
+            agent_name,
+            traits,
+            goal,
+            position,
+            memories,
+            []  # TODO: pass nearby agents
+        )
+    
+    # Fallback to mock
+    if decision is None:
+        decision = mock_brain.get_mock_decision(
+            agent_name,
+            traits,
+            goal,
+            position,
+            [],
+            rng
+        )
+    
+    return decision
+
+def prompt_memories(memory_lists: Dict, k: int = config.PROMPT_MEMORIES,
+                    summaries: Optional[Dict] = None, *, now: datetime) -> Dict:
+    """
+    Memory texts for the Gemini decision prompts of many agents
+    {key: memories} -> {key: [content, ...]}, top-k scored in one batch
+    An agent's consolidated summary (summaries[key]) takes the first of its k slots
+    now is the sim time to score recency at (see memory_lib.sim_time)
+    """
+    contents = memory_lib.top_contents_per_agent(memory_lists, k, now=now)
+    for key, summary in (summaries or {}).items():
+        if summary and key in contents:
+            contents[key] = [summary] + contents[key][:k - 1]
+    return contents
+
+def summarize_memories(agent_name: str, previous: str, contents: List[str],
+                       use_mock: bool = True) -> str:
+    """
+    Merge evicted memory texts into an agent's rolling summary
+    Uses Gemini if available, falling back to the mock brain
+    """
+    summary = None
+    if not use_mock:
+        import neon_gemini_service as gemini
+        summary = gemini.summarize_gemini_memories(agent_name, previous, contents)
+    
+    if summary is None:
+        summary = mock_brain.summarize_memories(previous, contents)
+    
+    return summary
+
+def start_consolidation(jobs, requests: Dict, use_mock: bool = True) -> Dict:
+    """
+    Begin summarizing a batch of agents' evicted memories
+    requests: {key: (agent_name, previous_summary, evicted_texts)}
+    Mock summaries are cheap and returned at once; Gemini summaries run as
+    background jobs (see neon_dispatch.BackgroundJobs) and are posted back
+    by finish_consolidation on a later tick
+    Returns {key: summary} for the summaries that are already done
+    """
+    if use_mock:
+        return consolidate_memories(requests, use_mock=True)
+    
+    for key, args in requests.items():
+        jobs.submit(key, lambda args=args: summarize_memories(*args, use_mock=False))
+    return {}
+
+def finish_consolidation(jobs) -> Dict:
+    """{key: summary} of the background summaries that have landed (None = failed)"""
+    return jobs.collect()
+
+def consolidate_memories(requests: Dict, use_mock: bool = True,
+                         concurrent: bool = False) -> Dict:
+    """
+    Summaries for a batch of agents whose evicted memories are due for consolidation
+    requests: {key: (agent_name, previous_summary, evicted_texts)}
+    concurrent issues the Gemini calls in parallel (mock fallback per call)
+    Returns {key: summary}
+    """
+    if not concurrent or use_mock:
+        return {key: summarize_memories(*args, use_mock=use_mock)
+                for key, args in requests.items()}
+    
+    import neon_gemini_service as gemini
+    import neon_dispatch as dispatch
+    
+    jobs = {key: lambda args=args: gemini.summarize_gemini_memories(*args)
+            for key, args in requests.items()}
+    results = dispatch.run_concurrently(
+        jobs, config.LLM_MAX_CONCURRENCY, config.LLM_CALL_DEADLINE_S
+    )
+    
+    return {key: results[key] if results[key] is not None
+            else mock_brain.summarize_memories(*args[1:])
+            for key, args in requests.items()}
+
+def prefetch_llm_results(dialogue_requests: Dict, decision_requests: Dict,
+                         rngs: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+    """
+    Issue Gemini dialogue and decision calls concurrently
+    dialogue_requests: {key: (agent1_name, agent1_traits, agent2_name, agent2_traits)}
+    decision_requests: {key: (agent_name, traits, goal, position, memories)}
+    Calls that fail or miss LLM_CALL_DEADLINE_S fall back to the mock brain,
+    seeded from rngs[("dialogue", key)] / rngs[("decision", key)] if given
+    Returns ({key: convo}, {key: decision})
+    """
+    rngs = rngs or {}
+    import neon_gemini_service as gemini
+    import neon_dispatch as dispatch
+    
+    jobs = {}
+    for key, args in dialogue_requests.items():
+        jobs[("dialogue", key)] = lambda args=args: gemini.generate_gemini_dialogue(*args)
+    for key, args in decision_requests.items():
+        jobs[("decision", key)] = lambda args=args: gemini.get_gemini_decision(*args, [])
+    
+    results = dispatch.run_concurrently(
+        jobs, config.LLM_MAX_CONCURRENCY, config.LLM_CALL_DEADLINE_S
+    )
+    
+    convos = {}
+    for key, args in dialogue_requests.items():
+        convo = results[("dialogue", key)]
+        if convo is None:
+            convo = mock_brain.generate_mock_dialogue(*args, rngs.get(("dialogue", key)))
+        convos[key] = convo
+    
+    decisions = {}
+    for key, args in decision_requests.items():
+        decision = results[("decision", key)]
+        if decision is None:
+            decision = mock_brain.get_mock_decision(*args[:4], [], rngs.get(("decision", key)))
+        decisions[key] = decision
+    
+    return convos, decisions
+
+def process_interaction(world: WorldState, group: List[str], use_mock: bool = True,
+                        convo: Optional[Dict] = None) -> InteractionRecord:
     """
     Generate conversation for a group of agents
     Currently supports pairs (first 2 agents)
+    A prefetched convo skips the brain call
     """
     # For MVP, handle pairs
     if len(group) < 2:
@@ -71,110 +295,76 @@ def process_interaction(world: WorldState, group: List[str], use_mock: bool = Tr
     agent1_name = group[0]
     agent2_name = group[1]
     
-    agent1 = world.agents[agent1_name]
-    agent2 = world.agents[agent2_name]
+    agent1 = world.mutable_agent(agent1_name)
+    agent2 = world.mutable_agent(agent2_name)
     
     # Mark as TALKING
     agent1.state = "TALKING"
     agent2.state = "TALKING"
     
     # Generate dialogue
-    convo = None
-    if not use_mock:
-        # Try Gemini first
-        import neon_gemini_service as gemini
-        convo = gemini.generate_gemini_dialogue(
-            agent1_name, agent1.traits,
-            agent2_name, agent2.traits
-        )
-    
-    # Fallback to mock
     if convo is None:
-        convo = mock_brain.generate_mock_dialogue(
+        convo = generate_dialogue(
             agent1_name, agent1.traits,
-            agent2_name, agent2.traits
+            agent2_name, agent2.traits,
+            use_mock,
+            agent_rng(world.seed, agent1_name, world.tick, "dialogue")
         )
     
-    # Add to both agents' memories
-    memory1 = Memory(
-        content=f"Conversation with {agent2_name}: {convo['summary']}",
-        importance=config.CONVERSATION_IMPORTANCE,
-        type="conversation"
-    )
-    
-    memory2 = Memory(
-        content=f"Conversation with {agent1_name}: {convo['summary']}",
-        importance=config.CONVERSATION_IMPORTANCE,
-        type="conversation"
-    )
-    
-    agent1.memories = memory_lib.add_memory(agent1.memories, memory1)
-    agent2.memories = memory_lib.add_memory(agent2.memories, memory2)
+    # Add to both agents' memories (summary text is interned, stored once), stamped in sim time
+    now = memory_lib.sim_time(world.tick)
+    agent1.memories = memory_lib.add_conversation_memory(agent1.memories, agent2_name, convo['summary'],
+                                                         timestamp=now)
+    agent2.memories = memory_lib.add_conversation_memory(agent2.memories, agent1_name, convo['summary'],
+                                                         timestamp=now)
     
     # Create interaction record
     return InteractionRecord(
         tick=world.tick,
         participants=[agent1_name, agent2_name],
-        dialogue=convo['dialogue'],
-        summary=convo['summary']
+        dialogue=content_store.canonical(convo['dialogue']),
+        summary=content_store.canonical(convo['summary'])
     )
 
-def process_agent_cognition(agent: AgentSnapshot, use_mock: bool = True) -> None:
+def think(agent: AgentSnapshot, tick: int, use_mock: bool = True,
+          decision: Optional[Dict] = None, seed: Optional[int] = None,
+          memories: Optional[List[str]] = None) -> int:
     """
-    Handle agent's thinking and movement
-    Implements THINK_INTERVAL throttling
+    Deep thought for an agent whose think timer expired
+    A prefetched decision is used instead of calling the brain
+    seed is the world seed for the agent's RNG stream
+    memories are the prompt memory texts (default: scored from agent.memories)
+    Returns the tick at which the agent should think next
     """
-    # Decrement think timer
-    if agent.ticks_until_next_think > 0:
-        agent.ticks_until_next_think -= 1
-    
-    # Time for deep thought?
-    if agent.ticks_until_next_think <= 0:
-        # Get decision from brain
-        decision = None
-        
-        if not use_mock:
-            # Try Gemini first
-            import neon_gemini_service as gemini
-            memories = [m.content for m in agent.memories]
-            decision = gemini.get_gemini_decision(
-                agent.name,
-                agent.traits,
-                agent.goal,
-                (agent.x, agent.y),
-                memories,
-                []  # TODO: pass nearby agents
-            )
-        
-        # Fallback to mock
-        if decision is None:
-            decision = mock_brain.get_mock_decision(
-                agent.name,
-                agent.traits,
-                agent.goal,
-                (agent.x, agent.y),
-                []
-            )
-        
-        # Update agent state
-        agent.state = "THINKING"
-        agent.current_thought = decision['thought']
-        agent.current_plan = decision['plan']
-        agent.cached_direction = decision['action']
-        
-        # Reset timer
-        agent.ticks_until_next_think = config.THINK_INTERVAL
+    # Get decision from brain
+    if decision is None:
+        if memories is None and not use_mock:
+            memories = prompt_memories({agent.name: agent.memories},
+                                       summaries={agent.name: agent.memory_summary},
+                                       now=memory_lib.sim_time(tick))[agent.name]
+        decision = get_decision(
+            agent.name,
+            agent.traits,
+            agent.goal,
+            (agent.x, agent.y),
+            memories or [],
+            use_mock,
+            agent_rng(seed, agent.name, tick, "decision")
+        )
     
-    # Execute movement (using cached direction)
-    execute_movement(agent)
-
-def execute_movement(agent: AgentSnapshot) -> None:
-    """Move agent based on cached direction"""
-    if agent.state == "TALKING":
-        return  # Don't move while talking
+    # Update agent state
+    agent.state = "THINKING"
+    agent.current_thought = decision['thought']
+    agent.current_plan = decision['plan']
+    agent.cached_direction = decision['action']
     
-    agent.state = "MOVING"
+    # Reset timer
+    agent.next_think_tick = tick + scheduler_lib.think_interval(agent)
     
+    return agent.next_think_tick
+
+def movement_target(agent: AgentSnapshot) -> Tuple[int, int]:
+    """Position the agent's cached direction leads to"""
     direction = agent.cached_direction
     
     dx, dy = 0, 0
@@ -188,38 +378,138 @@ def execute_movement(agent: AgentSnapshot) -> None:
         dx = 1
     # STAY = no movement
     
-    # Apply movement with boundary checks
-    new_x = max(0, min(config.MAP_SIZE, agent.x + dx))
-    new_y = max(0, min(config.MAP_SIZE, agent.y + dy))
+    # Boundary checks
+    return (max(0, min(config.MAP_SIZE, agent.x + dx)),
+            max(0, min(config.MAP_SIZE, agent.y + dy)))
+
+def movement_changes(agent: AgentSnapshot) -> bool:
+    """Whether execute_movement would modify the agent (skips copy-on-write)"""
+    if agent.state == "TALKING":
+        return False
+    return agent.state != "MOVING" or movement_target(agent) != (agent.x, agent.y)
+
+def execute_movement(agent: AgentSnapshot, grid: Optional[SpatialGrid] = None) -> None:
+    """Move agent based on cached direction, keeping the spatial index in sync"""
+    if agent.state == "TALKING":
+        return  # Don't move while talking
+    
+    agent.state = "MOVING"
     
+    new_x, new_y = movement_target(agent)
     agent.x = new_x
     agent.y = new_y
+    
+    if grid is not None:
+        grid.move(agent.name, new_x, new_y)
 
-def tick(world: WorldState, use_mock: bool = True) -> WorldState:
+def tick(world: WorldState, use_mock: bool = True,
+         timings: Optional[Dict[str, float]] = None,
+         concurrent: Optional[bool] = None) -> WorldState:
     """
     Execute one simulation tick
+    If timings is given, seconds spent per phase are accumulated into it
+    concurrent (default config.CONCURRENT_LLM) issues the tick's Gemini calls in parallel
     Returns updated world state
     """
+    if concurrent is None:
+        concurrent = config.CONCURRENT_LLM
+    
+    start = time.perf_counter()
+    grid = get_spatial_grid(world)
+    scheduler = get_think_scheduler(world)
+    
     # Phase 1: Detect interactions
     interaction_groups = detect_interaction_groups(world)
+    interacting_agents = set()
+    for group in interaction_groups:
+        interacting_agents.update(group)
+    
+    # Talking pauses the think timer; everyone else due this tick thinks
+    scheduler.postpone(interacting_agents)
+    for agent_name in interacting_agents:
+        world.mutable_agent(agent_name).next_think_tick = scheduler.due_tick(agent_name)
+    thinkers = scheduler.pop_due(world.tick)
+    
+    # Gemini prompts: score every thinker's memories in one batch
+    memories = {}
+    if not use_mock and thinkers:
+        memories = prompt_memories({name: world.agents[name].memories for name in thinkers},
+                                   summaries={name: world.agents[name].memory_summary
+                                              for name in thinkers},
+                                   now=memory_lib.sim_time(world.tick))
+    start = add_phase_time(timings, "detect", start)
+    
+    # Optional: issue every Gemini call of this tick up front, concurrently
+    convos, decisions = {}, {}
+    if concurrent and not use_mock:
+        dialogue_requests = {}
+        for group in interaction_groups:
+            agent1, agent2 = world.agents[group[0]], world.agents[group[1]]
+            dialogue_requests[tuple(group)] = (agent1.name, agent1.traits, agent2.name, agent2.traits)
+        
+        decision_requests = {}
+        for agent_name in thinkers:
+            agent = world.agents[agent_name]
+            decision_requests[agent_name] = (
+                agent.name, agent.traits, agent.goal, (agent.x, agent.y),
+                memories[agent_name]
+            )
+        
+        rngs = {("dialogue", key): agent_rng(world.seed, key[0], world.tick, "dialogue")
+                for key in dialogue_requests}
+        rngs.update({("decision", key): agent_rng(world.seed, key, world.tick, "decision")
+                     for key in decision_requests})
+        
+        convos, decisions = prefetch_llm_results(dialogue_requests, decision_requests, rngs)
+        start = add_phase_time(timings, "llm", start)
     
     # Phase 2: Process interactions
     new_interactions = []
-    interacting_agents = set()
     
     for group in interaction_groups:
-        record = process_interaction(world, group, use_mock)
+        record = process_interaction(world, group, use_mock, convos.get(tuple(group)))
         if record:
             new_interactions.append(record)
-            interacting_agents.update(group)
+    start = add_phase_time(timings, "interact", start)
+    
+    # Optional: fold evicted memories into rolling summaries, a batch at a time
+    # Only agents that just talked can have new evictions; Gemini summaries
+    # are written in the background and posted back when they land
+    if config.CONSOLIDATE_MEMORIES:
+        jobs = get_consolidation_jobs(world)
+        done = finish_consolidation(jobs)
+        
+        requests = {}
+        for agent_name in interacting_agents:
+            agent = world.agents[agent_name]
+            if memory_lib.needs_consolidation(agent.memories) and not jobs.busy(agent_name):
+                agent = world.mutable_agent(agent_name)
+                agent.memories, evicted = memory_lib.take_evicted(agent.memories)
+                requests[agent_name] = (agent_name, agent.memory_summary, evicted)
+        
+        done.update(start_consolidation(jobs, requests, use_mock))
+        for agent_name, summary in done.items():
+            if summary is not None and agent_name in world.agents:
+                world.mutable_agent(agent_name).memory_summary = summary
+        start = add_phase_time(timings, "consolidate", start)
+    
+    # Phase 3: Cognition for due agents only
+    for agent_name in thinkers:
+        next_tick = think(world.mutable_agent(agent_name), world.tick, use_mock,
+                          decisions.get(agent_name), world.seed, memories.get(agent_name))
+        scheduler.schedule(agent_name, next_tick)
+    start = add_phase_time(timings, "cognition", start)
     
-    # Phase 3: Process cognition & movement (for non-interacting agents)
+    # Phase 4: Bulk movement for non-interacting agents
+    # Agents whose state wouldn't change are left shared with earlier snapshots
     for agent_name, agent in world.agents.items():
         if agent_name not in interacting_agents:
-            process_agent_cognition(agent, use_mock)
-        else:
+            if movement_changes(agent):
+                execute_movement(world.mutable_agent(agent_name), grid)
+        elif agent.state != "IDLE":
             # Return to IDLE after conversation
-            agent.state = "IDLE"
+            world.mutable_agent(agent_name).state = "IDLE"
+    add_phase_time(timings, "movement", start)
     
     # Update world
     world.recent_interactions.extend(new_interactions)
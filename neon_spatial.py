@@ -0,0 +1,121 @@
+"""
+Neon Society Spatial Index
+Spatial hash grid for proximity queries (only adjacent cells are scanned)
+"""
+import math
+from typing import Dict, KeysView, List, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+
+class SpatialGrid:
+    """
+    Spatial hash grid keyed by cell size.
+    Tracks positions by name so agents can be moved incrementally.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._cell_of: Dict[str, Cell] = {}
+        # Insertion order keeps query results identical to a naive scan
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def names(self) -> KeysView[str]:
+        """Names of every entry (set-like)"""
+        return self._positions.keys()
+
+    def _get_cell(self, x: float, y: float) -> Cell:
+        """Convert world coords to cell coords"""
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, name: str, x: float, y: float) -> None:
+        """Insert (or re-insert) an entry at a position"""
+        if name in self._positions:
+            self.move(name, x, y)
+            return
+
+        cell = self._get_cell(x, y)
+        self._cells.setdefault(cell, set()).add(name)
+        self._positions[name] = (x, y)
+        self._cell_of[name] = cell
+        self._order[name] = self._next_order
+        self._next_order += 1
+
+    def remove(self, name: str) -> None:
+        """Remove an entry (no-op if unknown)"""
+        if name not in self._positions:
+            return
+
+        cell = self._cell_of.pop(name)
+        members = self._cells[cell]
+        members.discard(name)
+        if not members:
+            del self._cells[cell]
+        del self._positions[name]
+        del self._order[name]
+
+    def move(self, name: str, x: float, y: float) -> None:
+        """Update an entry's position, touching cells only if it changed cell"""
+        if name not in self._positions:
+            self.insert(name, x, y)
+            return
+
+        self._positions[name] = (x, y)
+        old_cell = self._cell_of[name]
+        new_cell = self._get_cell(x, y)
+        if new_cell == old_cell:
+            return
+
+        members = self._cells[old_cell]
+        members.discard(name)
+        if not members:
+            del self._cells[old_cell]
+        self._cells.setdefault(new_cell, set()).add(name)
+        self._cell_of[name] = new_cell
+
+    def position(self, name: str) -> Tuple[float, float]:
+        return self._positions[name]
+
+    def query(self, x: float, y: float, radius: float,
+              exclude: Optional[str] = None) -> List[str]:
+        """
+        Find all entries within radius of (x, y)
+        Results are returned in insertion order
+        """
+        cell_x, cell_y = self._get_cell(x, y)
+        cell_radius = math.ceil(radius / self.cell_size)
+        radius_sq = radius * radius
+
+        found = []
+        for dx in range(-cell_radius, cell_radius + 1):
+            for dy in range(-cell_radius, cell_radius + 1):
+                members = self._cells.get((cell_x + dx, cell_y + dy))
+                if not members:
+                    continue
+                for other in members:
+                    if other == exclude:
+                        continue
+                    ox, oy = self._positions[other]
+                    if (x - ox) ** 2 + (y - oy) ** 2 <= radius_sq:
+                        found.append(other)
+
+        found.sort(key=self._order.__getitem__)
+        return found
+
+    def neighbors(self, name: str, radius: float) -> List[str]:
+        """Find all other entries within radius of a tracked entry"""
+        x, y = self._positions[name]
+        return self.query(x, y, radius, exclude=name)
+
+    def order_of(self, name: str) -> int:
+        return self._order[name]
@@ -0,0 +1,382 @@
+"""
+Neon Society Vectorized Engine
+Struct-of-arrays world for large populations (10k-100k agents)
+
+Positions, states, think timers and cached directions live in NumPy arrays,
+so countdown, movement, clamping and proximity run as whole-array operations.
+AgentSnapshot objects are only built at the UI / snapshot boundary (to_world).
+Tick semantics match neon_simulation.tick.
+"""
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from neon_models import WorldState, AgentSnapshot, MemoryBuffer, InteractionRecord, content_store
+import neon_config as config
+import neon_memory as memory_lib
+import neon_scheduler as scheduler_lib
+import neon_simulation as sim
+from neon_rng import agent_rng
+
+STATES = ("IDLE", "MOVING", "THINKING", "TALKING")
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT", "STAY")
+
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+IDLE, MOVING, THINKING, TALKING = range(len(STATES))
+
+# Movement deltas indexed by direction code
+DIRECTION_DX = np.array([0, 0, -1, 1, 0], dtype=np.int32)
+DIRECTION_DY = np.array([-1, 1, 0, 0, 0], dtype=np.int32)
+
+def _proximity_offsets(radius: float) -> np.ndarray:
+    """All integer (dx, dy) offsets within radius, including (0, 0)"""
+    reach = int(math.floor(radius))
+    offsets = [
+        (dx, dy)
+        for dx in range(-reach, reach + 1)
+        for dy in range(-reach, reach + 1)
+        if dx * dx + dy * dy <= radius * radius
+    ]
+    return np.array(offsets, dtype=np.int32)
+
+class VectorWorld:
+    """
+    Struct-of-arrays world state
+    Agent i is described by index i in every array / list
+    """
+
+    def __init__(self, tick: int = 0, seed: Optional[int] = None):
+        self.tick = tick
+        self.seed = seed
+        self.names: List[str] = []
+        self.traits: List[str] = []
+        self.goals: List[str] = []
+        self.current_thought: List[str] = []
+        self.current_plan: List[str] = []
+        self.memories: List[MemoryBuffer] = []
+        self.memory_summary: List[str] = []
+        self.recent_interactions: List[InteractionRecord] = []
+
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.state = np.zeros(0, dtype=np.int8)
+        self.ticks_until_next_think = np.zeros(0, dtype=np.int32)
+        self.think_interval = np.zeros(0, dtype=np.int32)
+        self.cached_direction = np.zeros(0, dtype=np.int8)
+
+        self._index: Dict[str, int] = {}
+        self._offsets = _proximity_offsets(config.PROXIMITY_RADIUS)
+        self._side = config.MAP_SIZE + 1  # Coordinates are 0..MAP_SIZE inclusive
+        self._buckets = None
+        self._consolidation_jobs = None  # Background summaries (see sim.start_consolidation)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ------------------------------------------------------------------
+    # Boundary conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_agents(cls, agents: List[AgentSnapshot], tick: int = 0,
+                    seed: Optional[int] = None) -> 'VectorWorld':
+        """Build from AgentSnapshot objects in one pass"""
+        world = cls(tick=tick, seed=seed)
+        world.names = [a.name for a in agents]
+        world.traits = [a.traits for a in agents]
+        world.goals = [a.goal for a in agents]
+        world.current_thought = [a.current_thought for a in agents]
+        world.current_plan = [a.current_plan for a in agents]
+        world.memories = [a.memories.copy() for a in agents]
+        world.memory_summary = [a.memory_summary for a in agents]
+
+        world.x = np.array([a.x for a in agents], dtype=np.int32)
+        world.y = np.array([a.y for a in agents], dtype=np.int32)
+        world.state = np.array([STATE_CODES[a.state] for a in agents], dtype=np.int8)
+        world.ticks_until_next_think = np.array(
+            [scheduler_lib.countdown(a, tick) for a in agents], dtype=np.int32
+        )
+        world.think_interval = np.array(
+            [scheduler_lib.think_interval(a) for a in agents], dtype=np.int32
+        )
+        world.cached_direction = np.array(
+            [DIRECTION_CODES[a.cached_direction] for a in agents], dtype=np.int8
+        )
+
+        world._index = {name: i for i, name in enumerate(world.names)}
+        if len(world._index) != len(world.names):
+            raise ValueError("Agent names must be unique")
+        return world
+
+    @classmethod
+    def from_world(cls, world: WorldState) -> 'VectorWorld':
+        """Convert an object-based WorldState"""
+        vworld = cls.from_agents(list(world.agents.values()), tick=world.tick, seed=world.seed)
+        vworld.recent_interactions = list(world.recent_interactions)
+        return vworld
+
+    def agent_snapshot(self, i: int) -> AgentSnapshot:
+        """Materialize a single agent (UI boundary)"""
+        countdown = int(self.ticks_until_next_think[i])
+        interval = int(self.think_interval[i])
+        return AgentSnapshot(
+            name=self.names[i],
+            x=int(self.x[i]),
+            y=int(self.y[i]),
+            traits=self.traits[i],
+            goal=self.goals[i],
+            state=STATES[self.state[i]],
+            next_think_tick=self.tick + max(countdown, 1) - 1,
+            think_interval=None if interval == config.THINK_INTERVAL else interval,
+            cached_direction=DIRECTIONS[self.cached_direction[i]],
+            current_thought=self.current_thought[i],
+            current_plan=self.current_plan[i],
+            memories=self.memories[i].copy(),
+            memory_summary=self.memory_summary[i]
+        )
+
+    def to_world(self) -> WorldState:
+        """Materialize a full WorldState (snapshot boundary)"""
+        return WorldState(
+            tick=self.tick,
+            seed=self.seed,
+            agents={name: self.agent_snapshot(i) for i, name in enumerate(self.names)},
+            recent_interactions=list(self.recent_interactions)
+        )
+
+    def index_of(self, name: str) -> int:
+        return self._index[name]
+
+    # ------------------------------------------------------------------
+    # Proximity
+    # ------------------------------------------------------------------
+
+    def _build_buckets(self) -> None:
+        """Sort agents by cell so each cell's members are a contiguous slice"""
+        cells = self.x * self._side + self.y
+        order = np.argsort(cells, kind="stable")
+        starts = np.searchsorted(cells[order], np.arange(self._side * self._side + 1))
+        counts = np.diff(starts).reshape(self._side, self._side)
+        self._buckets = (order, starts, counts)
+
+    def _neighbor_counts(self) -> np.ndarray:
+        """Number of other agents within radius, for every agent"""
+        _, _, counts = self._buckets
+        reach = int(np.abs(self._offsets).max())
+        padded = np.pad(counts, reach)
+        totals = np.zeros_like(counts)
+        for dx, dy in self._offsets:
+            totals += padded[reach + dx:reach + dx + self._side,
+                             reach + dy:reach + dy + self._side]
+        return totals[self.x, self.y] - 1
+
+    def nearby(self, i: int) -> np.ndarray:
+        """Indices of other agents within radius of agent i, in index order"""
+        if self._buckets is None:
+            self._build_buckets()
+        order, starts, _ = self._buckets
+
+        cx = self.x[i] + self._offsets[:, 0]
+        cy = self.y[i] + self._offsets[:, 1]
+        inside = (cx >= 0) & (cx < self._side) & (cy >= 0) & (cy < self._side)
+        cells = cx[inside] * self._side + cy[inside]
+
+        found = np.concatenate([order[starts[c]:starts[c + 1]] for c in cells])
+        found = found[found != i]
+        found.sort()
+        return found
+
+    def detect_interaction_groups(self) -> List[np.ndarray]:
+        """
+        Same greedy grouping as neon_simulation.detect_interaction_groups:
+        each unprocessed agent with neighbors leads a group of itself plus
+        all agents within radius
+        """
+        self._build_buckets()
+        has_neighbor = self._neighbor_counts() > 0
+
+        processed = np.zeros(len(self), dtype=bool)
+        groups = []
+        for i in np.flatnonzero(has_neighbor):
+            if processed[i]:
+                continue
+            group = np.concatenate(([i], self.nearby(i)))
+            groups.append(group)
+            processed[group] = True
+
+        return groups
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def _process_interaction(self, i: int, j: int, use_mock: bool,
+                             convo: Optional[Dict] = None) -> InteractionRecord:
+        """Conversation between the first two members of a group"""
+        self.state[[i, j]] = TALKING
+
+        if convo is None:
+            convo = sim.generate_dialogue(
+                self.names[i], self.traits[i],
+                self.names[j], self.traits[j],
+                use_mock,
+                agent_rng(self.seed, self.names[i], self.tick, "dialogue")
+            )
+
+        now = memory_lib.sim_time(self.tick)
+        self.memories[i] = memory_lib.add_conversation_memory(self.memories[i], self.names[j], convo['summary'],
+                                                              timestamp=now)
+        self.memories[j] = memory_lib.add_conversation_memory(self.memories[j], self.names[i], convo['summary'],
+                                                              timestamp=now)
+
+        return InteractionRecord(
+            tick=self.tick,
+            participants=[self.names[i], self.names[j]],
+            dialogue=content_store.canonical(convo['dialogue']),
+            summary=content_store.canonical(convo['summary'])
+        )
+
+    def _think(self, i: int, use_mock: bool, decision: Optional[Dict] = None,
+               memories: Optional[List[str]] = None) -> None:
+        """Deep thought for a single due agent (memories: prompt memory texts)"""
+        if decision is None:
+            decision = sim.get_decision(
+                self.names[i],
+                self.traits[i],
+                self.goals[i],
+                (int(self.x[i]), int(self.y[i])),
+                memories or [],
+                use_mock,
+                agent_rng(self.seed, self.names[i], self.tick, "decision")
+            )
+
+        self.state[i] = THINKING
+        self.current_thought[i] = decision['thought']
+        self.current_plan[i] = decision['plan']
+        self.cached_direction[i] = DIRECTION_CODES[decision['action']]
+
+    def _prompt_memories(self, indices: np.ndarray) -> Dict[int, List[str]]:
+        """Gemini prompt memory texts for many agents (see sim.prompt_memories)"""
+        return sim.prompt_memories({int(i): self.memories[i] for i in indices},
+                                   summaries={int(i): self.memory_summary[i] for i in indices},
+                                   now=memory_lib.sim_time(self.tick))
+
+    def _consolidate(self, indices: np.ndarray, use_mock: bool) -> None:
+        """Fold pending evicted memories into rolling summaries (see sim.start_consolidation)"""
+        if self._consolidation_jobs is None:
+            import neon_dispatch as dispatch
+            self._consolidation_jobs = dispatch.BackgroundJobs(config.LLM_MAX_CONCURRENCY)
+        jobs = self._consolidation_jobs
+        done = sim.finish_consolidation(jobs)
+
+        requests = {}
+        for i in indices:
+            i = int(i)
+            if memory_lib.needs_consolidation(self.memories[i]) and not jobs.busy(i):
+                self.memories[i], evicted = memory_lib.take_evicted(self.memories[i])
+                requests[i] = (self.names[i], self.memory_summary[i], evicted)
+
+        done.update(sim.start_consolidation(jobs, requests, use_mock))
+        for i, summary in done.items():
+            if summary is not None:
+                self.memory_summary[i] = summary
+
+    def _prefetch(self, groups: List[np.ndarray], thinkers: np.ndarray):
+        """Issue this tick's Gemini calls concurrently (see sim.prefetch_llm_results)"""
+        dialogue_requests = {}
+        for group in groups:
+            i, j = int(group[0]), int(group[1])
+            dialogue_requests[i] = (self.names[i], self.traits[i], self.names[j], self.traits[j])
+
+        memories = self._prompt_memories(thinkers)
+        decision_requests = {}
+        for i in thinkers:
+            i = int(i)
+            decision_requests[i] = (
+                self.names[i], self.traits[i], self.goals[i],
+                (int(self.x[i]), int(self.y[i])),
+                memories[i]
+            )
+
+        rngs = {("dialogue", i): agent_rng(self.seed, self.names[i], self.tick, "dialogue")
+                for i in dialogue_requests}
+        rngs.update({("decision", i): agent_rng(self.seed, self.names[i], self.tick, "decision")
+                     for i in decision_requests})
+
+        return sim.prefetch_llm_results(dialogue_requests, decision_requests, rngs)
+
+    def step(self, use_mock: bool = True,
+             timings: Optional[Dict[str, float]] = None,
+             concurrent: Optional[bool] = None) -> 'VectorWorld':
+        """
+        Execute one simulation tick (advances self.tick)
+        If timings is given, seconds spent per phase are accumulated into it
+        concurrent (default config.CONCURRENT_LLM) issues the tick's Gemini calls in parallel
+        """
+        if concurrent is None:
+            concurrent = config.CONCURRENT_LLM
+        start = time.perf_counter()
+
+        # Phase 1: Detect interactions
+        groups = self.detect_interaction_groups()
+        interacting = np.zeros(len(self), dtype=bool)
+        for group in groups:
+            interacting[group] = True
+        start = sim.add_phase_time(timings, "detect", start)
+
+        # Optional: issue every Gemini call of this tick up front, concurrently
+        convos, decisions = {}, {}
+        if concurrent and not use_mock:
+            thinkers = np.flatnonzero(~interacting & (self.ticks_until_next_think <= 1))
+            convos, decisions = self._prefetch(groups, thinkers)
+            start = sim.add_phase_time(timings, "llm", start)
+
+        # Phase 2: Process interactions
+        new_interactions = []
+        for group in groups:
+            i, j = int(group[0]), int(group[1])
+            new_interactions.append(
+                self._process_interaction(i, j, use_mock, convos.get(i))
+            )
+        start = sim.add_phase_time(timings, "interact", start)
+
+        # Optional: fold evicted memories into rolling summaries (talkers only)
+        if config.CONSOLIDATE_MEMORIES:
+            self._consolidate(np.flatnonzero(interacting), use_mock)
+            start = sim.add_phase_time(timings, "consolidate", start)
+
+        # Phase 3: Cognition countdown (non-interacting agents only)
+        free = ~interacting
+        timers = self.ticks_until_next_think
+        timers[free & (timers > 0)] -= 1
+
+        due = np.flatnonzero(free & (timers <= 0))
+        memories = {}
+        if not use_mock and len(due):
+            # Gemini prompts: score every thinker's memories in one batch
+            memories = self._prompt_memories(due)
+        for i in due:
+            self._think(int(i), use_mock, decisions.get(int(i)), memories.get(int(i)))
+        timers[due] = self.think_interval[due]
+        start = sim.add_phase_time(timings, "cognition", start)
+
+        # Phase 4: Movement with boundary clamping
+        movers = free & (self.state != TALKING)
+        self.state[movers] = MOVING
+        direction = self.cached_direction[movers]
+        self.x[movers] = np.clip(self.x[movers] + DIRECTION_DX[direction], 0, config.MAP_SIZE)
+        self.y[movers] = np.clip(self.y[movers] + DIRECTION_DY[direction], 0, config.MAP_SIZE)
+
+        # Return to IDLE after conversation
+        self.state[interacting] = IDLE
+        sim.add_phase_time(timings, "movement", start)
+
+        self.recent_interactions.extend(new_interactions)
+        self.tick += 1
+        self._buckets = None
+
+        return self
@@ -36,6 +36,18 @@ def get_reflection_prompt(recent_observations: str) -> str:
 명확한 정보가 없다면 "특이 사항 없음"이라고 해라.
 """
 
+def get_consolidation_prompt(previous_summary: str, old_memories: str) -> str:
+    return f"""
+지금까지의 장기 기억 요약:
+{previous_summary or "(없음)"}
+
+오래되어 잊혀질 기억:
+{old_memories}
+
+위 내용을 합쳐 **장기 기억 요약**을 새로 작성해라.
+만난 사람, 반복되는 사건, 감정과 관계의 변화를 중심으로 3문장 이내로 정리해라.
+"""
+
 def get_speaker_selection_prompt(context: str, active_agents: list[str]) -> str:
     agents_str = ", ".join(active_agents)
     return f"""
@@ -4,7 +4,10 @@ Importance rules, recency calculation, final score aggregation.
 """
 import math
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
 from models import Memory
+from sim_clock import DecayTable
 
 # Keywords for importance scoring
 IMPORTANT_KEYWORDS = {
@@ -62,3 +65,29 @@ def calculate_final_score(
         return 0.0
         
     return (w_sim * similarity + w_rec * recency + w_imp * importance_norm)
+
+@lru_cache(maxsize=None)
+def recency_table(decay_factor: float, seconds_per_tick: float, size: int) -> DecayTable:
+    """
+    Shared lookup table of decay_factor ^ hours for ages of 0..size ticks.
+    Ages past the table are computed directly. The vectorized counterpart
+    of calculate_recency_score (call it on POSIX timestamps and now).
+    """
+    return DecayTable(lambda hours: np.power(decay_factor, hours), seconds_per_tick, size)
+
+def calculate_final_scores(
+    similarity: np.ndarray,
+    recency: np.ndarray,
+    importance: np.ndarray,
+    w_sim: float = 1.0,
+    w_rec: float = 1.0,
+    w_imp: float = 1.0
+) -> np.ndarray:
+    """
+    Vectorized calculate_final_score over arrays of candidates.
+    """
+    if w_sim + w_rec + w_imp == 0:
+        return np.zeros(len(similarity))
+    
+    importance_norm = (importance - 1) / 9
+    return w_sim * similarity + w_rec * recency + w_imp * importance_norm
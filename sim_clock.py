@@ -0,0 +1,90 @@
+"""
+sim_clock.py
+Simulation time: a tick counter mapped onto datetimes, and recency decay
+lookup tables indexed by tick delta.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import math
+
+import numpy as np
+
+SIM_EPOCH = datetime(2000, 1, 1)  # Sim time of tick 0 (fixed, so seeded runs stamp identically)
+
+class SimClock:
+    """
+    Discrete simulation clock: tick t is epoch + t * seconds_per_tick.
+    Driven by the simulation loop (WorldState.tick, the classic turn_idx),
+    so memory ages follow simulated time however fast the ticks run.
+    """
+
+    def __init__(self, seconds_per_tick: float, tick: int = 0, epoch: datetime = SIM_EPOCH):
+        self.seconds_per_tick = seconds_per_tick
+        self.tick = tick
+        self.epoch = epoch
+
+    def at(self, tick: int) -> datetime:
+        """Sim time of a tick."""
+        return self.epoch + timedelta(seconds=tick * self.seconds_per_tick)
+
+    def now(self) -> datetime:
+        return self.at(self.tick)
+
+    def advance(self, ticks: int = 1) -> int:
+        self.tick += ticks
+        return self.tick
+
+    def resume_after(self, timestamp: float) -> int:
+        """
+        Move forward (never back) to the first tick later than timestamp
+        (POSIX seconds), e.g. the newest memory stored by an earlier session.
+        """
+        elapsed = timestamp - self.epoch.timestamp()
+        self.tick = max(self.tick, math.floor(elapsed / self.seconds_per_tick) + 1)
+        return self.tick
+
+class DecayTable:
+    """
+    Recency curve precomputed once per tick of age.
+    A whole-tick age is one array lookup; fractional ages interpolate between
+    neighbouring entries and ages past the table fall back to the curve.
+    Memories stamped after now count as brand new.
+    """
+
+    def __init__(self, curve: Callable[[np.ndarray], np.ndarray], seconds_per_tick: float, size: int):
+        self.curve = curve  # Recency as a function of age in hours
+        self.seconds_per_tick = seconds_per_tick
+        self.values = np.asarray(curve(np.arange(max(size, 1) + 1) * (seconds_per_tick / 3600.0)),
+                                 dtype=np.float64)
+
+    def __call__(self, timestamps: np.ndarray, now: float) -> np.ndarray:
+        """Recency of memories created at timestamps (POSIX seconds) as of now."""
+        ages = np.maximum(now - np.asarray(timestamps, dtype=np.float64), 0.0) / self.seconds_per_tick
+        last = len(self.values) - 1
+        index = np.minimum(ages.astype(np.int64), last - 1)
+        lower = self.values[index]
+        recency = lower + (ages - index) * (self.values[index + 1] - lower)
+        beyond = ages > last
+        if beyond.any():
+            recency[beyond] = self.curve(ages[beyond] * (self.seconds_per_tick / 3600.0))
+        return recency
+
+# Clock stamping and scoring classic-mode memories (None = wall clock)
+_clock: Optional[SimClock] = None
+
+def set_clock(clock: Optional[SimClock]) -> None:
+    """Install the clock behind now() (None restores the wall clock)."""
+    global _clock
+    _clock = clock
+
+def get_clock() -> Optional[SimClock]:
+    return _clock
+
+def resume_after(timestamp: float) -> None:
+    """Move the installed clock past timestamp (the wall clock needs nothing)."""
+    if _clock is not None:
+        _clock.resume_after(timestamp)
+
+def now() -> datetime:
+    """Current time on the installed clock, or wall-clock time if none."""
+    return _clock.now() if _clock is not None else datetime.now()
@@ -0,0 +1,37 @@
+"""
+test_batch.py
+"""
+import json
+
+import pytest
+
+from neon_batch import build_world, run, write_outputs, main
+from neon_models import WorldState, InteractionRecord
+import neon_config as config
+
+@pytest.mark.parametrize("engine", ["object", "vector"])
+def test_run_writes_parseable_outputs(tmp_path, engine):
+    world = build_world(12, seed=4)
+    result = run(world, 25, use_mock=True, engine=engine)
+    assert result["world"].tick == 25 and result["elapsed"] > 0
+    assert set(result["timings"]) >= {"detect", "interact", "cognition"}
+
+    world_path, log_path = write_outputs(result["world"], str(tmp_path))
+    with open(world_path, encoding="utf-8") as f:
+        saved = WorldState.parse_obj(json.load(f))
+    assert saved.tick == 25 and saved.agents.keys() == result["world"].agents.keys()
+    assert saved.dict(exclude={"recent_interactions"}) == \
+        result["world"].dict(exclude={"recent_interactions"})
+
+    with open(log_path, encoding="utf-8") as f:
+        records = [InteractionRecord(**json.loads(line)) for line in f]
+    assert records and records == list(result["world"].recent_interactions)
+
+def test_main_reports_and_writes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(config, "LLM_CALL_DEADLINE_S", config.LLM_CALL_DEADLINE_S)  # main() sets it
+    out = tmp_path / "run"
+    assert main(["--agents", "5", "--ticks", "10", "--seed", "1", "--out", str(out)]) == 0
+
+    report = capsys.readouterr().out
+    assert "ticks/sec" in report and "Time per phase:" in report
+    assert json.loads((out / "world.json").read_text(encoding="utf-8"))["tick"] == 10
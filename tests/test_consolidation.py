@@ -0,0 +1,106 @@
+"""
+test_consolidation.py
+"""
+import threading
+
+import pytest
+
+from neon_models import Memory, MemoryBuffer
+import neon_memory as memory_lib
+import neon_mock_brain as mock_brain
+import neon_simulation as sim
+import neon_config as config
+from neon_batch import build_world
+from memory_stream import merge_summary, llm_summarizer
+from mock_llm import MockOpenAI
+
+@pytest.fixture
+def consolidating(monkeypatch):
+    monkeypatch.setattr(config, "CONSOLIDATE_MEMORIES", True)
+    monkeypatch.setattr(config, "CONSOLIDATION_BATCH", 2)
+
+def test_eviction_queues_texts_only_when_enabled(consolidating, monkeypatch):
+    memories = MemoryBuffer(capacity=2)
+    for i in range(4):
+        memories.append(Memory(content=f"m{i}", importance=5))
+    assert memories.pending == ["m0", "m1"]
+    assert memory_lib.needs_consolidation(memories)
+
+    monkeypatch.setattr(config, "CONSOLIDATE_MEMORIES", False)
+    memories = MemoryBuffer([Memory(content=f"m{i}", importance=5) for i in range(4)], capacity=2)
+    assert memories.pending == []
+
+def test_take_evicted_copies_frozen_buffer(consolidating):
+    memories = MemoryBuffer([Memory(content=f"m{i}", importance=5) for i in range(3)], capacity=2)
+    memories.frozen = True
+
+    drained, evicted = memory_lib.take_evicted(memories)
+    assert evicted == ["m0"]
+    assert drained is not memories and drained.pending == []
+    assert memories.pending == ["m0"]  # Snapshot untouched
+
+def test_mock_summary_dedupes_and_caps():
+    summary = mock_brain.summarize_memories("a", ["b", "a", "b", "c"])
+    assert summary == "a; b; c"
+
+    long = mock_brain.summarize_memories("", [f"memory {i}" for i in range(100)], max_chars=40)
+    assert len(long) <= 40 and long.endswith("memory 99")
+
+def test_tick_consolidates_talkers(consolidating, monkeypatch):
+    monkeypatch.setattr(config, "MAX_MEMORIES", 2)
+    world = build_world(30, seed=3)
+    for _ in range(40):
+        world = sim.tick(world)
+
+    summarized = [a for a in world.agents.values() if a.memory_summary]
+    assert summarized
+    for agent in world.agents.values():
+        assert len(agent.memories.pending) < config.CONSOLIDATION_BATCH
+
+def test_prompt_memories_lead_with_summary():
+    memories = MemoryBuffer([Memory(content=f"m{i}", importance=i + 1) for i in range(6)])
+    prompts = sim.prompt_memories({"a": memories, "b": memories}, k=3, summaries={"a": "long ago"},
+                                  now=memories[-1].timestamp)
+    assert prompts["a"] == ["long ago", "m5", "m4"]
+    assert prompts["b"] == ["m5", "m4", "m3"]
+
+def test_memory_stream_summarizers():
+    assert merge_summary("a", ["b", "a"]) == "a\nb"
+
+    summarize = llm_summarizer(MockOpenAI(seed=1))
+    assert summarize("met Min-jun", ["coffee with Seo-yeon"]) == "met Min-jun / coffee with Seo-yeon"
+
+def test_llm_summarizer_logs_and_merges_on_failure(caplog):
+    class BrokenClient:
+        @property
+        def chat(self):
+            raise RuntimeError("rate limited")
+
+    summarize = llm_summarizer(BrokenClient())
+    assert summarize("a", ["b"]) == merge_summary("a", ["b"])
+    assert "Consolidation call failed" in caplog.text and "rate limited" in caplog.text
+
+def test_tick_does_not_wait_for_gemini_summaries(consolidating, monkeypatch):
+    import neon_gemini_service as gemini
+    release = threading.Event()
+
+    def slow_summary(agent_name, previous, contents):
+        assert release.wait(5)
+        return f"summary of {len(contents)}"
+
+    monkeypatch.setattr(gemini, "get_gemini_decision", lambda *args, **kwargs: None)
+    monkeypatch.setattr(gemini, "generate_gemini_dialogue", lambda *args, **kwargs: None)
+    monkeypatch.setattr(gemini, "summarize_gemini_memories", slow_summary)
+    monkeypatch.setattr(config, "MAX_MEMORIES", 2)
+
+    world = build_world(30, seed=3)
+    for _ in range(40):
+        world = sim.tick(world, use_mock=False)  # Returns while every summary is blocked
+    jobs = sim.get_consolidation_jobs(world)
+    assert not any(a.memory_summary for a in world.agents.values())
+    assert any(jobs.busy(name) for name in world.agents)
+
+    release.set()
+    jobs.wait(5)
+    world = sim.tick(world, use_mock=False)
+    assert any(a.memory_summary.startswith("summary of") for a in world.agents.values())
@@ -0,0 +1,80 @@
+"""
+test_dispatch.py
+Concurrent Gemini calls against a local fake endpoint
+"""
+import threading
+import time
+import pytest
+from neon_models import WorldState, AgentSnapshot
+import neon_dispatch as dispatch
+import neon_gemini_service as gemini
+import neon_simulation as sim
+import neon_config as config
+
+CALL_DELAY = 0.2
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Stand-in for the Gemini API: fixed latency, one agent never answers in time"""
+    def fake_decision(agent_name, traits, goal, position, memories, nearby_agents):
+        time.sleep(2.0 if agent_name == "Slow" else CALL_DELAY)
+        return {"thought": f"{agent_name} thinks", "action": "STAY", "plan": "fake plan"}
+
+    def fake_dialogue(agent1_name, agent1_traits, agent2_name, agent2_traits):
+        time.sleep(CALL_DELAY)
+        return {"dialogue": "fake dialogue", "summary": "fake summary"}
+
+    monkeypatch.setattr(gemini, "get_gemini_decision", fake_decision)
+    monkeypatch.setattr(gemini, "generate_gemini_dialogue", fake_dialogue)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 16)
+    monkeypatch.setattr(config, "LLM_CALL_DEADLINE_S", 0.5)
+
+def make_world(names):
+    world = WorldState()
+    # Spread out so nobody interacts except the pair at the origin
+    for i, name in enumerate(names):
+        world.agents[name] = AgentSnapshot(name=name, x=(i * 3) % 21, y=(i * 3) // 21 * 3 + 6,
+                                           traits="calm", goal="test")
+    world.agents["Pair-A"] = AgentSnapshot(name="Pair-A", x=0, y=0, traits="calm", goal="test")
+    world.agents["Pair-B"] = AgentSnapshot(name="Pair-B", x=1, y=0, traits="calm", goal="test")
+    return world
+
+def test_run_concurrently_deadline():
+    release = threading.Event()
+    jobs = {
+        "fast": lambda: "ok",
+        "slow": lambda: release.wait(5) and "late",  # Blocks until released, far past the deadline
+        "broken": lambda: 1 / 0,
+    }
+    try:
+        results = dispatch.run_concurrently(jobs, max_workers=3, deadline_s=0.2)
+    finally:
+        release.set()
+    assert results == {"fast": "ok", "slow": None, "broken": None}
+
+def test_hung_calls_do_not_grow_the_pool():
+    release = threading.Event()
+    hung = {i: (lambda: release.wait(5)) for i in range(2)}
+    try:
+        for _ in range(3):
+            assert dispatch.run_concurrently(hung, max_workers=2, deadline_s=0.05) == {0: None, 1: None}
+        assert sum(t.name.startswith("neon-llm-2_") for t in threading.enumerate()) == 2
+    finally:
+        release.set()
+    assert dispatch.run_concurrently({"a": lambda: 1}, max_workers=2, deadline_s=1.0) == {"a": 1}
+
+def test_concurrent_tick_falls_back_on_deadline(fake_gemini):
+    names = [f"Agent-{i}" for i in range(8)] + ["Slow"]
+    world = make_world(names)
+
+    start = time.perf_counter()
+    sim.tick(world, use_mock=False, concurrent=True)
+    elapsed = time.perf_counter() - start
+
+    # 9 decisions + 1 dialogue sequentially would take >= 2s + 9 * 0.2s
+    assert elapsed < 1.5
+    assert world.recent_interactions[0].summary == "fake summary"
+    assert world.agents["Agent-0"].current_thought == "Agent-0 thinks"
+    # Missed the deadline: mock brain filled in
+    assert world.agents["Slow"].current_thought != "Slow thinks"
+    assert world.agents["Slow"].current_plan
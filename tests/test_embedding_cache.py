@@ -0,0 +1,114 @@
+"""
+test_embedding_cache.py
+"""
+import pytest
+
+from embedding_cache import EmbeddingCache
+import memory_stream
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), "test-model", max_entries=3)
+    yield cache
+    cache.close()
+
+def test_repeated_text_embedded_once(cache):
+    embedder = CountingEmbedder()
+    first = cache.embed(["a", "bb", "a"], embedder)
+    second = cache.embed(["bb", "a"], embedder)
+
+    assert embedder.calls == [["a", "bb"]]
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [first[1], first[0]]
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 3
+
+def test_lru_eviction_keeps_recent_entries(cache):
+    embedder = CountingEmbedder()
+    for text in ["a", "b", "c"]:
+        cache.embed([text], embedder)
+    cache.embed(["a"], embedder)  # a becomes most recently used
+    cache.embed(["d"], embedder)  # evicts b
+
+    assert len(cache) == 3
+    embedder.calls.clear()
+    cache.embed(["a", "b"], embedder)
+    assert embedder.calls == [["b"]]
+
+def test_persists_and_namespaces_by_model(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    embedder = CountingEmbedder()
+    EmbeddingCache(path, "model-a").embed(["hello"], embedder)
+
+    EmbeddingCache(path, "model-a").embed(["hello"], embedder)
+    assert len(embedder.calls) == 1
+
+    EmbeddingCache(path, "model-b").embed(["hello"], embedder)
+    assert len(embedder.calls) == 2
+
+def test_hits_do_not_write(cache):
+    embedder = CountingEmbedder()
+    cache.embed(["a", "b"], embedder)
+    changes = cache._conn.total_changes
+
+    cache.embed(["b", "a", "b"], embedder)
+    assert cache._conn.total_changes == changes and not cache._conn.in_transaction
+    assert len(cache) == 2 and cache.stats()["hits"] == 3
+
+def test_eviction_budget_is_per_model(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    embedder = CountingEmbedder()
+    other = EmbeddingCache(path, "model-b", max_entries=3)
+    other.embed(["x", "y"], embedder)
+
+    cache = EmbeddingCache(path, "model-a", max_entries=3)
+    assert len(cache) == 0
+    for text in ["a", "b", "c", "d"]:
+        cache.embed([text], embedder)
+    assert len(cache) == 3
+
+    embedder.calls.clear()
+    other.embed(["x", "y"], embedder)
+    assert embedder.calls == [] and len(other) == 2
+
+def test_size_stays_bounded_across_instances(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    embedder = CountingEmbedder()
+    first = EmbeddingCache(path, "model-a", max_entries=3)
+    second = EmbeddingCache(path, "model-a", max_entries=3)
+    for text in ["a", "b", "c", "d"]:
+        first.embed([text], embedder)
+        second.embed([text + text], embedder)
+    assert len(first) == len(second) == first._count() == 3
+
+def test_flush_writes_hit_recency(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(path, "model-a", max_entries=2)
+    cache.embed(["a"], embedder)
+    cache.embed(["b"], embedder)
+    cache.embed(["a"], embedder)  # Hit: a is now the most recently used
+    cache.flush()
+
+    reopened = EmbeddingCache(path, "model-a", max_entries=2)
+    reopened.embed(["c"], embedder)  # Evicts b, not a
+    embedder.calls.clear()
+    reopened.embed(["a"], embedder)
+    assert embedder.calls == []
+
+def test_pooled_caches_flushed_at_exit(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_stream, "_embedding_caches", {})
+    cache = memory_stream.get_embedding_cache("model-a", str(tmp_path / "embeddings.sqlite3"))
+    cache.embed(["a"], CountingEmbedder())
+    cache.embed(["a"], CountingEmbedder())
+    assert cache._touched
+
+    memory_stream.flush_embedding_caches()
+    assert not cache._touched and not cache._conn.in_transaction
@@ -0,0 +1,55 @@
+"""
+test_history.py
+"""
+import pytest
+
+from neon_batch import build_world
+from neon_history import HistoryStore
+import neon_simulation as sim
+
+def test_seek_matches_recorded_ticks():
+    world = build_world(6, seed=3)
+    history = HistoryStore(capacity=25, keyframe_interval=4)
+    expected = {}
+
+    for _ in range(40):
+        history.record(world)
+        expected[world.tick] = world.dict()
+        sim.tick(world)
+
+    # Hard cap: only the newest 25 ticks are retained
+    assert len(history) == 25
+    assert history.first_tick == 15 and history.last_tick == 39
+    for tick in history.ticks():
+        assert history.seek(tick).dict() == expected[tick]
+
+    with pytest.raises(KeyError):
+        history.seek(14)
+
+def test_seek_returns_independent_copy():
+    world = build_world(3, seed=1)
+    history = HistoryStore(capacity=10, keyframe_interval=3)
+    for _ in range(5):
+        history.record(world)
+        sim.tick(world)
+
+    rewound = history.seek(2)
+    rewound.mutable_agent("Agent-00000").x = 999
+    assert history.seek(2).agents["Agent-00000"].x != 999
+
+def test_record_after_rewind_starts_new_branch():
+    world = build_world(3, seed=2)
+    history = HistoryStore(capacity=50, keyframe_interval=5)
+    for _ in range(12):
+        history.record(world)
+        sim.tick(world)
+
+    world = history.seek(6)
+    expected = world.dict()
+    history.record(world)
+    assert history.last_tick == 6
+    assert history.seek(6).dict() == expected
+
+    sim.tick(world)
+    history.record(world)
+    assert history.ticks() == list(range(8))
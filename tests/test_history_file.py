@@ -0,0 +1,49 @@
+"""
+test_history_file.py
+"""
+import pytest
+
+from neon_batch import build_world, run
+from neon_history_file import HistoryFile
+import neon_simulation as sim
+
+def test_seek_matches_recorded_ticks(tmp_path):
+    world = build_world(8, seed=5)
+    expected = {}
+    with HistoryFile(str(tmp_path)) as history:
+        for _ in range(30):
+            history.record(world)
+            expected[world.tick] = world.dict()
+            sim.tick(world)
+
+    # A finished run opens read-only without replaying
+    history = HistoryFile(str(tmp_path), read_only=True)
+    assert history.ticks() == list(range(30))
+    for tick in (0, 7, 29):
+        assert history.seek(tick).dict() == expected[tick]
+    with pytest.raises(PermissionError):
+        history.record(world)
+    history.close()
+
+def test_record_after_rewind_truncates(tmp_path):
+    with HistoryFile(str(tmp_path)) as history:
+        run(build_world(6, seed=1), 20, history=history)
+        assert history.last_tick == 20
+
+        world = history.seek(10)
+        expected = world.dict()
+        history.record(world)
+        assert history.last_tick == 10
+        assert history.seek(10).dict() == expected
+
+        sim.tick(world)
+        history.record(world)
+        assert history.ticks() == list(range(12))
+
+def test_rejects_changed_cast(tmp_path):
+    world = build_world(3, seed=0)
+    with HistoryFile(str(tmp_path)) as history:
+        history.record(world)
+        del world.agents["Agent-00002"]
+        with pytest.raises(ValueError):
+            history.record(world)
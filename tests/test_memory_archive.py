@@ -0,0 +1,71 @@
+"""
+test_memory_archive.py
+"""
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+from models import Memory
+from memory_stream import MemoryStream
+from memory_archive import export_memories, import_memories
+from hashing_embedder import HashingEmbedder
+import memory_stream
+import vector_backend
+import config
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(config, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(config, "NUMPY_PERSIST_DIR", None)
+    monkeypatch.setattr(config, "EMBEDDER", "hashing")
+    monkeypatch.setattr(config, "EMBEDDING_CACHE", False)
+    monkeypatch.setattr(vector_backend, "_numpy_stores", {})
+
+def _cast():
+    now = datetime.now()
+    streams = MemoryStream.open_many(["Min-jun", "Seo-yeon"])
+    streams["Min-jun"].add_memories([
+        Memory(content="Seo-yeon spilled her coffee on the script", memory_type="observation",
+               importance=7, created_at=now - timedelta(hours=2), tags=["coffee", "script"]),
+        Memory(content="오늘 오디션에 합격했다", memory_type="reflection", importance=9, created_at=now),
+    ])
+    streams["Seo-yeon"].add_memory(Memory(content="Min-jun rehearsed a monologue",
+                                          memory_type="observation", importance=4))
+    return streams
+
+def _rows(stream):
+    rows = stream.dump()
+    return {memory_id: (document, dict(meta), embedding) for memory_id, document, meta, embedding
+            in zip(rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"])}
+
+def test_round_trip_without_reembedding(tmp_path, monkeypatch):
+    streams = _cast()
+    path = str(tmp_path / "cast.npz")
+    assert export_memories(streams, path) == 3
+
+    monkeypatch.setattr(vector_backend, "_numpy_stores", {})  # Fresh experiment
+    monkeypatch.setattr(config, "SHARED_COLLECTION", True)
+    calls = []
+    embed = streams["Min-jun"].embedding_fn
+    monkeypatch.setattr(type(embed), "__call__", lambda self, texts: calls.append(texts) or [])
+    clones = import_memories(path)
+    assert calls == []
+
+    for name, stream in streams.items():
+        original, clone = _rows(stream), _rows(clones[name])
+        assert clone.keys() == original.keys() and clones[name].count() == stream.count()
+        for memory_id, (document, meta, embedding) in original.items():
+            clone_document, clone_meta, clone_embedding = clone[memory_id]
+            assert clone_document == document
+            assert clone_meta.pop("agent") == name  # Imported into the shared collection
+            assert clone_meta == meta  # type, created_at, created_ts, importance, source, tags
+            assert np.array_equal(clone_embedding, embedding)
+    assert any(meta["tags"] == "coffee,script" for _, meta, _ in _rows(clones["Min-jun"]).values())
+
+def test_import_rejects_other_embedder(tmp_path, monkeypatch):
+    path = str(tmp_path / "cast.npz")
+    export_memories(_cast(), path)
+    monkeypatch.setattr(vector_backend, "_numpy_stores", {})
+    monkeypatch.setattr(memory_stream, "_embedding_fns", {"hashing": HashingEmbedder(dim=64)})
+    with pytest.raises(ValueError):
+        import_memories(path)
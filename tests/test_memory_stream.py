@@ -0,0 +1,293 @@
+"""
+test_memory_stream.py
+Offline MemoryStream tests (NumPy backend, hashing embedder)
+"""
+import threading
+
+import pytest
+from datetime import datetime, timedelta
+
+from models import Memory, RetrievalFilter
+from memory_stream import MemoryStream, _writer
+from hashing_embedder import HashingEmbedder
+from sim_clock import SimClock
+import sim_clock
+import memory_stream
+import vector_backend
+import config
+
+NOW = datetime.now()
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(config, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(config, "NUMPY_PERSIST_DIR", None)
+    monkeypatch.setattr(config, "EMBEDDER", "hashing")
+    monkeypatch.setattr(config, "EMBEDDING_CACHE", False)
+    monkeypatch.setattr(config, "MAX_MEMORIES", 5)
+    monkeypatch.setattr(vector_backend, "_numpy_stores", {})
+
+class RecordingStore:
+    """Backend proxy that records the calls a stream makes"""
+    def __init__(self, store):
+        self.store = store
+        self.calls = []
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return getattr(self.store, name)
+
+def _memory(content, hours_ago=0.0, importance=5):
+    return Memory(content=content, memory_type="observation", importance=importance,
+                  created_at=NOW - timedelta(hours=hours_ago))
+
+def test_hashing_embedder_is_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    first = embedder(["Min-jun said: hello", "coffee"])
+    again = HashingEmbedder(dim=64)(["coffee", "Min-jun said: hello"])
+    assert (first[0] == again[1]).all() and (first[1] == again[0]).all()
+    assert abs(float(first[0] @ first[0]) - 1.0) < 1e-5
+
+def test_hashing_embedder_skips_embedding_cache(monkeypatch):
+    monkeypatch.setattr(config, "EMBEDDING_CACHE", True)
+    assert MemoryStream("Min-jun").embedding_cache is None
+
+def test_retrieve_prefers_similar_text():
+    stream = MemoryStream("Min-jun")
+    stream.add_memories([
+        _memory("Seo-yeon spilled her coffee on the script"),
+        _memory("The weather was sunny in the park"),
+        _memory("Min-jun rehearsed a dramatic monologue"),
+    ])
+    results = stream.retrieve("coffee on the script", k=1)
+    assert results[0].memory.content == "Seo-yeon spilled her coffee on the script"
+
+def test_eviction_keeps_newest_memories():
+    stream = MemoryStream("Seo-yeon")
+    for i in range(4):
+        stream.add_memory(_memory(f"memory {i}", hours_ago=10 - i))
+    stream.add_memories([_memory(f"batch {i}", hours_ago=5 - i) for i in range(3)])
+
+    assert stream.count() == config.MAX_MEMORIES
+    kept = set(stream.collection.get()["documents"])
+    assert kept == {"memory 2", "memory 3", "batch 0", "batch 1", "batch 2"}
+
+def test_add_memories_is_one_upsert_and_one_delete():
+    stream = MemoryStream("Seo-yeon")
+    stream.add_memories([_memory(f"memory {i}", hours_ago=10 - i) for i in range(5)])
+    stream.collection = RecordingStore(stream.collection)
+
+    # Two of the new memories are older than everything kept: evicted without being written
+    stream.add_memories([_memory("new", hours_ago=0), _memory("stale 0", hours_ago=20),
+                         _memory("stale 1", hours_ago=30), _memory("newer", hours_ago=-1)])
+    assert stream.collection.calls == ["upsert", "delete"]
+    assert set(stream.collection.get()["documents"]) == {"memory 2", "memory 3", "memory 4", "new", "newer"}
+
+def test_eviction_index_rebuilt_on_open():
+    stream = MemoryStream("Seo-yeon")
+    stream.add_memories([_memory(f"memory {i}", hours_ago=10 - i) for i in range(5)])
+
+    reopened = MemoryStream("Seo-yeon")  # Same store, index rebuilt from stored metadata
+    reopened.add_memory(_memory("latest"))
+    assert reopened.count() == config.MAX_MEMORIES
+    assert "memory 0" not in reopened.collection.get()["documents"]
+
+def test_shared_collection_isolates_agents(monkeypatch):
+    monkeypatch.setattr(config, "SHARED_COLLECTION", True)
+    seed = MemoryStream.open_many(["Min-jun", "Seo-yeon"])
+    seed["Seo-yeon"].add_memories([_memory(f"seo-yeon {i}", hours_ago=20 - i) for i in range(3)])
+    seed["Min-jun"].add_memories([_memory(f"min-jun {i}", hours_ago=10 - i) for i in range(4)])
+
+    store = seed["Min-jun"].collection
+    recorder = RecordingStore(store)
+    monkeypatch.setattr(memory_stream, "open_backend", lambda name, backend=None: recorder)
+    streams = MemoryStream.open_many(["Min-jun", "Seo-yeon", "Newcomer"])
+    assert recorder.calls == ["get"]  # One read builds every agent's eviction index
+
+    # Filling one agent past the cap evicts only its own (older-than-everyone) memories
+    streams["Min-jun"].add_memories([_memory(f"min-jun late {i}") for i in range(3)])
+    assert streams["Min-jun"].count() == config.MAX_MEMORIES
+    assert streams["Seo-yeon"].count() == 3 and streams["Newcomer"].count() == 0
+    assert store.count() == config.MAX_MEMORIES + 3
+
+    # Queries are scoped to the agent by the where clause
+    results = streams["Seo-yeon"].retrieve("min-jun late", k=5)
+    assert results and all(r.memory.content.startswith("seo-yeon") for r in results)
+    assert streams["Newcomer"].retrieve("min-jun", k=5) == []
+
+def test_retrieve_many_matches_retrieve():
+    stream = MemoryStream("Min-jun")
+    stream.add_memories([_memory(text) for text in ["coffee break", "script deadline", "stage lights"]])
+    queries = ["coffee", "deadline"]
+    batched = stream.retrieve_many(queries, k=2)
+    for query, results in zip(queries, batched):
+        assert [r.memory.id for r in results] == [r.memory.id for r in stream.retrieve(query, k=2)]
+
+def test_retrieve_many_is_one_round_trip(monkeypatch):
+    stream = MemoryStream("Min-jun")
+    stream.add_memories([_memory(text) for text in ["coffee break", "script deadline", "stage lights"]])
+    embedded = []
+    embed = stream.embedding_fn
+    monkeypatch.setattr(stream, "embedding_fn", lambda texts: embedded.append(list(texts)) or embed(texts))
+    stream.collection = RecordingStore(stream.collection)
+
+    batched = stream.retrieve_many(["lights", "coffee", "lights"], k=1)
+    assert stream.collection.calls == ["query"]  # Every query in a single vector search
+    assert embedded == [["lights", "coffee"]]  # Repeated queries embedded once
+    assert [[r.memory.content for r in results] for results in batched] == \
+        [["stage lights"], ["coffee break"], ["stage lights"]]
+    assert stream.retrieve_many([], k=1) == []
+
+def test_consolidation_summary_takes_one_slot(monkeypatch):
+    monkeypatch.setattr(config, "CONSOLIDATE_MEMORIES", True)
+    monkeypatch.setattr(config, "CONSOLIDATION_BATCH", 2)
+    stream = MemoryStream("Min-jun")
+    stream.add_memories([_memory(f"memory {i}", hours_ago=10 - i) for i in range(8)])
+    stream.wait_consolidated()
+
+    documents = stream.collection.get(ids=[stream.summary_id])["documents"]
+    assert documents == ["memory 0\nmemory 1\nmemory 2\nmemory 3"]
+    assert stream.count() == config.MAX_MEMORIES
+
+def test_write_behind_is_read_your_writes():
+    stream = MemoryStream("Min-jun", write_behind=True)
+    stream.add_memory(_memory("Seo-yeon spilled her coffee on the script", hours_ago=1))
+    stream.add_memory(_memory("The weather was sunny in the park"))
+
+    results = stream.retrieve("coffee on the script", k=1)
+    assert results[0].memory.content == "Seo-yeon spilled her coffee on the script"
+
+    for i in range(10):
+        stream.add_memory(_memory(f"later {i}"))
+    stream.flush()
+    assert stream.count() == config.MAX_MEMORIES
+
+def test_failed_flush_requeues_batch(monkeypatch, caplog):
+    stream = MemoryStream("Min-jun", write_behind=True)
+    delete = stream.collection.delete
+    failures = []
+
+    def flaky_delete(**kwargs):
+        if not failures:
+            failures.append(kwargs)
+            raise RuntimeError("backend unavailable")
+        return delete(**kwargs)
+
+    stream.add_memories([_memory(f"memory {i}", hours_ago=10 - i) for i in range(5)])
+    stream.flush()
+    monkeypatch.setattr(stream.collection, "delete", flaky_delete)
+    stream.add_memories([_memory(f"later {i}") for i in range(2)])
+    _writer.join()  # Background flush fails and is logged, the batch stays queued
+    assert failures and "memory-writer failed for Min-jun" in caplog.text
+
+    assert stream.retrieve("later", k=1)  # Retried before reading
+    assert stream.count() == config.MAX_MEMORIES
+    assert set(stream.collection.get()["documents"]) == {"memory 2", "memory 3", "memory 4", "later 0", "later 1"}
+
+def test_blocked_producer_resumes_after_failed_flush(monkeypatch):
+    monkeypatch.setattr(config, "WRITE_QUEUE_SIZE", 2)
+    monkeypatch.setattr(config, "WRITE_RETRY_DELAY_S", 0.01)
+    stream = MemoryStream("Min-jun", write_behind=True)
+    upsert = stream.collection.upsert
+    failures = []
+
+    def flaky_upsert(**kwargs):
+        if len(failures) < 2:
+            failures.append(kwargs)
+            raise RuntimeError("backend unavailable")
+        return upsert(**kwargs)
+
+    monkeypatch.setattr(stream.collection, "upsert", flaky_upsert)
+    producer = threading.Thread(target=lambda: [stream.add_memory(_memory(f"m {i}")) for i in range(6)], daemon=True)
+    producer.start()
+    producer.join(timeout=5)  # Blocks on the full queue until a retry succeeds
+    assert not producer.is_alive() and len(failures) == 2
+
+    stream.flush()
+    assert stream.count() == config.MAX_MEMORIES
+
+def test_retrieval_cache_reuses_candidates_until_write():
+    stream = MemoryStream("Min-jun")
+    stream.add_memories([_memory(text) for text in ["coffee break", "script deadline"]])
+    first = stream.retrieve("coffee", k=2)
+    again = stream.retrieve("coffee", k=2)
+    assert (stream.query_cache_hits, stream.query_cache_misses) == (1, 1)
+    assert [r.memory.id for r in again] == [r.memory.id for r in first]
+
+    stream.add_memory(_memory("coffee spilled on stage"))
+    assert len(stream.retrieve("coffee", k=3)) == 3
+    assert stream.query_cache_misses == 2
+
+def test_filtered_retrieval_and_widening():
+    stream = MemoryStream("Seo-yeon")
+    stream.add_memories([
+        _memory("coffee with the director", hours_ago=30, importance=9),
+        _memory("coffee machine is broken", hours_ago=1, importance=2),
+        _memory("coffee order for the cast", hours_ago=2, importance=3),
+    ])
+    important = stream.retrieve("coffee", k=1, mode="important")
+    assert [r.memory.content for r in important] == ["coffee with the director"]
+
+    # Only one recent important memory exists: the filter widens to fill k
+    recent = stream.retrieve("coffee", k=3, mode=RetrievalFilter(min_importance=6, within_hours=24))
+    assert len(recent) == 3
+
+def test_retrieval_cache_widens_for_larger_k():
+    stream = MemoryStream("Seo-yeon")
+    stream.add_memories([
+        _memory("coffee with the director", importance=9),
+        _memory("coffee machine is broken", importance=2),
+        _memory("coffee order for the cast", importance=3),
+    ])
+    assert len(stream.retrieve("coffee", k=1, mode="important")) == 1
+    assert len(stream.retrieve("coffee", k=3, mode="important")) == 3
+
+def test_recent_mode_hits_cache_under_wall_clock():
+    stream = MemoryStream("Seo-yeon")
+    stream.add_memories([_memory("coffee break", hours_ago=1), _memory("coffee spill", hours_ago=2)])
+    first = stream.retrieve("coffee", k=2, mode="recent")
+    again = stream.retrieve("coffee", k=2, mode="recent")
+    assert stream.query_cache_hits == 1
+    assert [r.memory.id for r in again] == [r.memory.id for r in first]
+
+def test_add_does_not_wait_for_summarizer(monkeypatch):
+    monkeypatch.setattr(config, "CONSOLIDATE_MEMORIES", True)
+    monkeypatch.setattr(config, "CONSOLIDATION_BATCH", 2)
+    release = threading.Event()
+
+    def slow_summarizer(previous, evicted):
+        assert release.wait(5)
+        return "\n".join(evicted)
+
+    stream = MemoryStream("Min-jun", summarizer=slow_summarizer)
+    stream.add_memories([_memory(f"memory {i}", hours_ago=10 - i) for i in range(6)])
+    assert stream.collection.get(ids=[stream.summary_id])["ids"] == []  # Still summarizing
+    assert stream.retrieve("memory", k=1)
+
+    release.set()
+    stream.wait_consolidated()
+    assert stream.collection.get(ids=[stream.summary_id])["documents"] == ["memory 0\nmemory 1"]
+
+def test_restarted_session_clock_resumes_after_stored_memories(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MAX_MEMORIES", 3)
+    monkeypatch.setattr(config, "NUMPY_PERSIST_DIR", str(tmp_path))
+
+    def session(prefix, turns):
+        clock = SimClock(config.SIM_SECONDS_PER_TURN)  # Every session starts at turn 0
+        sim_clock.set_clock(clock)
+        stream = MemoryStream("Min-jun")
+        for turn in range(turns):
+            stream.add_memory(Memory(content=f"{prefix} turn {turn}", memory_type="observation", importance=5))
+            clock.advance()
+        return stream
+
+    try:
+        first = session("s1", 10)
+        first.collection.close()
+        monkeypatch.setattr(vector_backend, "_numpy_stores", {})  # Reopen from disk
+
+        second = session("s2", 5)
+        assert sorted(second.collection.get()["documents"]) == ["s2 turn 2", "s2 turn 3", "s2 turn 4"]
+        assert sim_clock.now().timestamp() > max(m["created_ts"] for m in second.collection.get()["metadatas"])
+    finally:
+        sim_clock.set_clock(None)
@@ -0,0 +1,112 @@
+"""
+test_neon_memory.py
+"""
+import copy
+import gc
+import pickle
+import random
+from datetime import datetime, timedelta
+
+from neon_models import AgentSnapshot, Memory, MemoryBuffer, content_store
+import neon_memory as memory_lib
+import neon_config as config
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+def _memory(i, importance=5, hours_ago=0.0):
+    return Memory(content=f"m{i}", importance=importance,
+                  timestamp=NOW - timedelta(hours=hours_ago))
+
+def _reference_top(memories, k):
+    def score(m):
+        age_hours = (NOW - m.timestamp).total_seconds() / 3600.0
+        return ((m.importance - 1) / 9.0 * config.IMPORTANCE_WEIGHT
+                + max(0.0, 1.0 - age_hours / 24.0) * config.RECENCY_WEIGHT)
+    return sorted(memories, key=score, reverse=True)[:k]
+
+def test_add_memory_evicts_oldest_in_order():
+    memories = MemoryBuffer(capacity=3)
+    for i in range(5):
+        memories = memory_lib.add_memory(memories, _memory(i, hours_ago=5 - i))
+    assert [m.content for m in memories] == ["m2", "m3", "m4"]
+    assert memories[0].content == "m2" and memories[-1].content == "m4"
+
+def test_top_k_matches_full_sort():
+    rng = random.Random(7)
+    memories = MemoryBuffer(capacity=2000)
+    kept = []
+    for i in range(2500):
+        memory = _memory(i, importance=rng.randint(1, 10), hours_ago=rng.choice([0, 30, rng.random() * 24]))
+        memories.append(memory)
+        kept = (kept + [memory])[-2000:]
+
+    for k in (1, 5, 50, 3000):
+        assert memory_lib.get_top_memories(memories, k, now=NOW) == _reference_top(kept, k)
+
+def test_top_k_accepts_plain_lists():
+    memories = [_memory(i, importance=i + 1) for i in range(4)]
+    top = memory_lib.get_top_memories(memories, 2, now=NOW)
+    assert [m.content for m in top] == ["m3", "m2"]
+
+def test_top_k_per_agent_matches_single_agent():
+    rng = random.Random(3)
+    buffers = {}
+    for agent in range(50):
+        memories = MemoryBuffer(capacity=12)
+        for i in range(rng.randint(0, 20)):
+            memories.append(_memory(f"{agent}-{i}", importance=rng.randint(1, 10),
+                                    hours_ago=rng.choice([0, 30, rng.random() * 24])))
+        buffers[agent] = memories
+
+    for k in (1, 5, 12):
+        top = memory_lib.top_memories_per_agent(buffers, k, now=NOW)
+        for agent, memories in buffers.items():
+            assert top[agent] == memory_lib.get_top_memories(memories, k, now=NOW)
+
+def test_conversation_memories_share_interned_text():
+    summary = "A and B argued about coffee."
+    live = len(content_store)
+    a = memory_lib.add_conversation_memory(MemoryBuffer(capacity=2), "B", summary)
+    b = memory_lib.add_conversation_memory(MemoryBuffer(capacity=2), "A", summary)
+
+    assert a.content(0) == f"Conversation with B: {summary}"
+    assert b[0].content == f"Conversation with A: {summary}"
+    assert b[0].type == "conversation" and b[0].importance == config.CONVERSATION_IMPORTANCE
+    assert len(content_store) == live + 3  # One summary, two partners
+    assert content_store.canonical(summary) is content_store.canonical("A and B argued " + "about coffee.")
+
+    # Resolved memories are stable across reads and copies
+    assert a[0] == a.copy()[0]
+    assert a.ids() == [a[0].id]
+
+def test_content_store_releases_evicted_and_dropped_text():
+    live = len(content_store)
+    memories = MemoryBuffer(capacity=2)
+    for i in range(5):
+        memories = memory_lib.add_conversation_memory(memories, "Z", f"release test {i}")
+    assert len(content_store) == live + 3  # Partner plus the two kept summaries
+
+    memories.frozen = True
+    copy = memory_lib.add_conversation_memory(memories, "Z", "release test 5")
+    assert [m.content for m in memories] == ["Conversation with Z: release test 3",
+                                             "Conversation with Z: release test 4"]
+    del memories
+    assert [m.content for m in copy][-1] == "Conversation with Z: release test 5"
+    del copy
+    assert len(content_store) == live
+
+def test_copies_hold_their_own_text_refs():
+    memories = memory_lib.add_conversation_memory(MemoryBuffer(capacity=2), "Y", "copy test summary")
+    agent = AgentSnapshot(name="X", traits="t", goal="g", memories=memories)
+    expected = list(memories)
+
+    for make_copy in (copy.copy, copy.deepcopy, lambda m: agent.model_copy(deep=True).memories):
+        clone = make_copy(memories)
+        assert list(clone) == expected
+        del clone
+        gc.collect()
+        memory_lib.add_conversation_memory(MemoryBuffer(capacity=2), "Q", "reuses freed refs")
+        assert list(memories) == expected
+
+    restored = pickle.loads(pickle.dumps(memories))
+    assert list(restored) == expected and restored.capacity == memories.capacity
@@ -0,0 +1,41 @@
+"""
+test_scheduler.py
+"""
+from neon_models import WorldState, AgentSnapshot
+from neon_scheduler import ThinkScheduler
+import neon_simulation as sim
+
+def test_pop_due_in_insertion_order():
+    scheduler = ThinkScheduler()
+    scheduler.schedule("b", 3)
+    scheduler.schedule("a", 1)
+    scheduler.schedule("c", 3)
+    assert scheduler.pop_due(0) == []
+    assert scheduler.pop_due(3) == ["b", "a", "c"]
+    assert len(scheduler) == 0
+
+def test_postpone_and_reschedule():
+    scheduler = ThinkScheduler()
+    scheduler.schedule("a", 2)
+    scheduler.postpone(["a"])
+    assert scheduler.pop_due(2) == []
+    assert scheduler.pop_due(3) == ["a"]
+    # Popped agents are no longer scheduled until rescheduled
+    assert scheduler.pop_due(10) == []
+
+def test_per_agent_think_interval():
+    world = WorldState()
+    world.agents["fast"] = AgentSnapshot(name="fast", x=0, y=0, traits="t", goal="g", think_interval=2)
+    world.agents["slow"] = AgentSnapshot(name="slow", x=20, y=20, traits="t", goal="g", think_interval=5)
+
+    thoughts = {"fast": [], "slow": []}
+    for _ in range(10):
+        before = {name: agent.next_think_tick for name, agent in world.agents.items()}
+        tick = world.tick
+        sim.tick(world)
+        for name, agent in world.agents.items():
+            if before[name] != agent.next_think_tick:
+                thoughts[name].append(tick)
+
+    assert thoughts["fast"] == [0, 2, 4, 6, 8]
+    assert thoughts["slow"] == [0, 5]
@@ -21,3 +21,18 @@ def test_final_score():
     score = calculate_final_score(similarity=0.9, recency=0.5, importance=10) # imp norm = 1.0
     # 0.9 + 0.5 + 1.0 = 2.4
     assert score == 2.4
+
+def test_vectorized_scores_match_scalar():
+    import numpy as np
+    from scoring import recency_table, calculate_final_scores
+    now = datetime.now()
+    created = [now - timedelta(hours=h) for h in (0, 1.5, 24, 300)]
+    similarity = np.array([0.9, 0.1, 0.5, 0.7])
+    importance = np.array([1, 10, 5, 7])
+
+    recency = recency_table(0.995, 900, 16)(np.array([c.timestamp() for c in created]), now.timestamp())
+    final = calculate_final_scores(similarity, recency, importance, w_rec=0.5)
+    for i, c in enumerate(created):
+        expected_recency = calculate_recency_score(c, now, 0.995)
+        assert recency[i] == pytest.approx(expected_recency)
+        assert final[i] == pytest.approx(calculate_final_score(similarity[i], expected_recency, importance[i], w_rec=0.5))
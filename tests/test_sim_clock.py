@@ -0,0 +1,52 @@
+"""
+test_sim_clock.py
+"""
+import numpy as np
+
+from sim_clock import SimClock, DecayTable
+from neon_models import MemoryBuffer
+import neon_memory as memory_lib
+import scoring
+
+def test_clock_maps_ticks_to_sim_time():
+    clock = SimClock(seconds_per_tick=60)
+    start = clock.now()
+    clock.advance(90)
+    assert (clock.now() - start).total_seconds() == 5400
+    assert clock.at(90) == clock.now()
+
+def test_decay_table_matches_curve():
+    table = scoring.recency_table(0.995, 900, 16)
+    now = 1e6
+    # Ages in ticks: whole and fractional inside the table, past it, and in the future
+    ages = np.array([0.0, 3.0, 2.5, 15.75, 40.0, now / 900.0, -40.0])
+    created = now - 900.0 * ages
+    expected = np.power(0.995, np.maximum(ages, 0) * 900 / 3600)
+    assert np.allclose(table(created, now), expected, rtol=1e-4)
+    assert np.allclose(table(created[4:], now), expected[4:], rtol=1e-12)  # Beyond the table: exact
+    assert table(np.array([900.0 * 3]), 900.0 * 10)[0] == table.values[7]
+    # Inside the table a fractional age interpolates between neighbouring ticks
+    assert table(np.array([now - 900.0 * 2.5]), now)[0] == (table.values[2] + table.values[3]) / 2
+
+def test_fast_forwarded_ticks_keep_recency_meaningful():
+    memories = MemoryBuffer(capacity=3)
+    for tick in (0, 500, 1000):
+        memory_lib.add_conversation_memory(memories, "B", f"talk at {tick}", importance=5,
+                                           timestamp=memory_lib.sim_time(tick))
+    now = memory_lib.sim_time(1200)
+    scores = memory_lib.score_memories(memories.importance, memories.timestamps, now.timestamp())
+    assert scores[0] < scores[1] < scores[2]
+    assert [m.content for m in memory_lib.get_top_memories(memories, 1, now=now)] == ["Conversation with B: talk at 1000"]
+
+def test_decay_table_past_its_end_calls_the_curve():
+    table = DecayTable(lambda hours: 1.0 / (1.0 + hours), seconds_per_tick=3600, size=4)
+    assert len(table.values) == 5 and table.values[4] == 0.2
+    now = 3600.0 * 10
+    # Ages of 10h and 7.5h (past the table), 1.5h (interpolated) and -2h (future)
+    created = np.array([0.0, 3600.0 * 2.5, now - 3600.0 * 1.5, now + 7200.0])
+    assert np.allclose(table(created, now), [1.0 / 11, 1.0 / 8.5, (1.0 / 2 + 1.0 / 3) / 2, 1.0])
+
+def test_clock_resumes_after_timestamp_without_rewinding():
+    clock = SimClock(seconds_per_tick=60, tick=5)
+    assert clock.resume_after(clock.at(2).timestamp()) == 5
+    assert clock.resume_after(clock.at(40).timestamp() + 30) == 41
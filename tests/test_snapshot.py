@@ -0,0 +1,52 @@
+"""
+test_snapshot.py
+"""
+from neon_batch import build_world
+from neon_models import InteractionLog, InteractionRecord, WorldState
+import neon_simulation as sim
+
+def test_snapshot_shares_untouched_agents():
+    world = build_world(30, seed=4)
+    sim.tick(world)
+    snapshot = world.copy_snapshot()
+    frozen = snapshot.dict()
+    frozen_log = list(snapshot.recent_interactions)
+
+    sim.tick(world)
+
+    shared = [name for name in world.agents if world.agents[name] is snapshot.agents[name]]
+    assert 0 < len(shared) < len(world.agents)
+    # The snapshot is unaffected by the tick
+    assert snapshot.dict(exclude={"recent_interactions"}) == \
+        {k: v for k, v in frozen.items() if k != "recent_interactions"}
+    assert list(snapshot.recent_interactions) == frozen_log
+
+def test_mutable_agent_copies_once():
+    world = build_world(2, seed=0)
+    world.copy_snapshot()
+    first = world.mutable_agent("Agent-00000")
+    assert world.mutable_agent("Agent-00000") is first
+
+def test_interaction_log_views():
+    record = lambda tick: InteractionRecord(tick=tick, participants=["a", "b"], dialogue="", summary="")
+    log = InteractionLog([record(0), record(1)])
+    view = log.snapshot()
+    log.append(record(2))
+
+    assert len(view) == 2 and view[-1].tick == 1
+    assert [r.tick for r in log[-2:]] == [1, 2]
+
+    # Extending an older view branches off without touching the newer one
+    view.append(record(9))
+    assert [r.tick for r in view] == [0, 1, 9]
+    assert [r.tick for r in log] == [0, 1, 2]
+
+def test_world_state_round_trips_through_json():
+    world = build_world(6, seed=2)
+    for _ in range(20):
+        sim.tick(world)
+    assert len(world.recent_interactions) and any(len(a.memories) for a in world.agents.values())
+
+    restored = WorldState.parse_raw(world.json())
+    assert restored.dict() == world.dict()
+    assert WorldState.parse_obj(world.dict()).dict() == world.dict()
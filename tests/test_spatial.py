@@ -0,0 +1,69 @@
+"""
+test_spatial.py
+"""
+import random
+from neon_spatial import SpatialGrid
+from neon_models import WorldState, AgentSnapshot
+import neon_simulation as sim
+import neon_config as config
+
+def naive_nearby(world, agent_name):
+    agent = world.agents[agent_name]
+    return [
+        name for name, other in world.agents.items()
+        if name != agent_name and sim.proximity_check(agent, other) <= config.PROXIMITY_RADIUS
+    ]
+
+def make_world(n, seed=0):
+    rng = random.Random(seed)
+    world = WorldState()
+    for i in range(n):
+        name = f"agent_{i}"
+        world.agents[name] = AgentSnapshot(
+            name=name,
+            x=rng.randint(0, config.MAP_SIZE),
+            y=rng.randint(0, config.MAP_SIZE),
+            traits="test",
+            goal="test",
+            cached_direction=rng.choice(["UP", "DOWN", "LEFT", "RIGHT", "STAY"])
+        )
+    return world
+
+def test_grid_query_matches_naive():
+    world = make_world(60)
+    for name in world.agents:
+        assert sim.find_nearby_agents(world, name) == naive_nearby(world, name)
+
+def test_grid_tracks_movement():
+    world = make_world(60, seed=1)
+    for _ in range(10):
+        sim.tick(world, use_mock=True)
+    # Incrementally-maintained grid must agree with a fresh scan
+    grid = sim.get_spatial_grid(world)
+    for name, agent in world.agents.items():
+        assert grid.position(name) == (agent.x, agent.y)
+        assert sim.find_nearby_agents(world, name) == naive_nearby(world, name)
+
+def test_grid_move_and_remove():
+    grid = SpatialGrid(cell_size=2)
+    grid.insert("a", 0, 0)
+    grid.insert("b", 1, 1)
+    assert grid.neighbors("a", 2) == ["b"]
+    grid.move("b", 10, 10)
+    assert grid.neighbors("a", 2) == []
+    grid.remove("b")
+    assert "b" not in grid
+    assert len(grid) == 1
+
+def test_grid_rebuilt_when_agent_swapped():
+    world = make_world(10, seed=2)
+    sim.get_spatial_grid(world)
+    sim.get_think_scheduler(world)
+
+    # Same agent count, different cast
+    del world.agents["agent_0"]
+    world.agents["newcomer"] = AgentSnapshot(name="newcomer", x=3, y=4, traits="test", goal="test")
+
+    assert "newcomer" in sim.get_spatial_grid(world) and "agent_0" not in sim.get_spatial_grid(world)
+    assert "newcomer" in sim.get_think_scheduler(world)
+    assert sim.find_nearby_agents(world, "newcomer") == naive_nearby(world, "newcomer")
@@ -0,0 +1,76 @@
+"""
+test_vector_backend.py
+"""
+import numpy as np
+
+from vector_backend import NumpyBackend, matches_where
+
+def _store(persist_dir=None):
+    store = NumpyBackend("test", persist_dir=persist_dir)
+    store.add(
+        ids=["a", "b", "c"],
+        documents=["doc a", "doc b", "doc c"],
+        metadatas=[{"agent": "x"}, {"agent": "y"}, {"agent": "x"}],
+        embeddings=[[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]]
+    )
+    return store
+
+def test_query_is_exact_cosine_top_n():
+    store = _store()
+    result = store.query(query_embeddings=[[1.0, 0.1], [0.0, 1.0]], n_results=2)
+
+    assert result["ids"] == [["a", "c"], ["b", "c"]]
+    expected = 1.0 - np.dot([1.0, 0.1], [1.0, 1.0]) / (np.linalg.norm([1.0, 0.1]) * np.sqrt(2))
+    assert np.isclose(result["distances"][0][1], expected, atol=1e-6)
+
+def test_where_filter_and_delete():
+    store = _store()
+    result = store.query(query_embeddings=[[0.0, 1.0]], n_results=5, where={"agent": "x"})
+    assert result["ids"] == [["c", "a"]]
+
+    store.delete(["a"])
+    assert store.count() == 2
+    assert store.get(where={"agent": "x"})["ids"] == ["c"]
+    assert store.query(query_embeddings=[[1.0, 0.0]], n_results=1)["ids"] == [["c"]]
+
+def test_upsert_replaces_and_add_skips_existing():
+    store = _store()
+    store.add(ids=["a"], documents=["ignored"], metadatas=[{}], embeddings=[[0.0, 1.0]])
+    assert store.get(ids=["a"])["documents"] == ["doc a"]
+
+    store.upsert(ids=["a"], documents=["new a"], metadatas=[{"agent": "y"}], embeddings=[[0.0, 1.0]])
+    assert store.get(ids=["a"])["documents"] == ["new a"]
+    assert store.count() == 3
+
+def test_persistence_round_trip(tmp_path):
+    store = _store(str(tmp_path))
+    store.delete(["b"])
+    assert not list(tmp_path.iterdir())  # Saved on flush, not on every write
+    store.flush()
+
+    reopened = NumpyBackend("test", persist_dir=str(tmp_path))
+    assert reopened.get()["ids"] == store.get()["ids"]
+    assert reopened.query(query_embeddings=[[1.0, 0.0]], n_results=2)["ids"] == [["a", "c"]]
+
+def test_where_operators():
+    store = _store()
+    store.upsert(ids=["c"], documents=["doc c"], metadatas=[{"agent": "x", "importance": 7}],
+                 embeddings=[[1.0, 1.0]])
+    where = {"$and": [{"agent": "x"}, {"importance": {"$gte": 5}}]}
+    assert store.query(query_embeddings=[[1.0, 0.0]], n_results=3, where=where)["ids"] == [["c"]]
+    assert store.get(where={"agent": {"$in": ["y", "z"]}})["ids"] == ["b"]
+
+def test_where_columns_follow_writes():
+    store = _store()
+    assert store.get(where={"agent": "x"})["ids"] == ["a", "c"]  # Builds the agent column
+
+    store.upsert(ids=["b", "d"], documents=["doc b", "doc d"],
+                 metadatas=[{"agent": "x", "importance": 3}, {"agent": "z", "importance": 9}],
+                 embeddings=[[0.0, 1.0], [1.0, 0.0]])
+    store.delete(["a"])
+    rows = store.get()
+    for where in ({"agent": "x"}, {"agent": {"$ne": "x"}}, {"importance": {"$lt": 5}},
+                  {"$or": [{"agent": "z"}, {"importance": 3}]}, {"importance": {"$nin": [3]}}):
+        expected = [memory_id for memory_id, meta in zip(rows["ids"], rows["metadatas"])
+                    if matches_where(meta, where)]
+        assert expected and store.get(where=where)["ids"] == expected
@@ -0,0 +1,53 @@
+"""
+test_vector_engine.py
+"""
+import random
+from neon_models import WorldState, AgentSnapshot
+from neon_vector_engine import VectorWorld
+import neon_simulation as sim
+import neon_scheduler as scheduler_lib
+import neon_config as config
+
+def make_world(n, seed=0):
+    rng = random.Random(seed)
+    world = WorldState()
+    for i in range(n):
+        name = f"agent_{i}"
+        world.agents[name] = AgentSnapshot(
+            name=name,
+            x=rng.randint(0, config.MAP_SIZE),
+            y=rng.randint(0, config.MAP_SIZE),
+            traits=rng.choice(["dramatic", "cynical", "calm"]),
+            goal="test",
+            next_think_tick=rng.randint(0, config.THINK_INTERVAL - 1)
+        )
+    return world
+
+def test_roundtrip_preserves_agents():
+    world = make_world(10)
+    restored = VectorWorld.from_world(world).to_world()
+    for name, agent in world.agents.items():
+        assert restored.agents[name].dict() == agent.dict()
+
+def test_matches_object_engine():
+    world = make_world(80, seed=3)
+    vworld = VectorWorld.from_world(world)
+
+    # Both engines consume the mock brain's RNG in the same order
+    random.seed(5)
+    for _ in range(30):
+        sim.tick(world)
+    random.seed(5)
+    for _ in range(30):
+        vworld.step()
+
+    result = vworld.to_world()
+    assert result.tick == world.tick
+    for name, agent in world.agents.items():
+        other = result.agents[name]
+        assert (other.x, other.y, other.state) == (agent.x, agent.y, agent.state)
+        assert scheduler_lib.due_tick(other, result.tick) == \
+            scheduler_lib.due_tick(agent, world.tick)
+        assert other.current_thought == agent.current_thought
+    assert [r.participants for r in result.recent_interactions] == \
+        [r.participants for r in world.recent_interactions]
@@ -27,3 +27,23 @@ def normalize_score(score: float, min_val: float, max_val: float) -> float:
     if max_val == min_val:
         return 0.0
     return (score - min_val) / (max_val - min_val)
+
+def top_k_indices(scores: np.ndarray, order: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, ties broken by ascending order.
+    Uses partial selection (argpartition), so cost is O(n + k log k).
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    
+    if k >= n:
+        candidates = np.arange(n)
+    else:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)
+        ties = ties[np.argsort(order[ties], kind="stable")][:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    
+    return candidates[np.lexsort((order[candidates], -scores[candidates]))]
@@ -0,0 +1,413 @@
+"""
+vector_backend.py
+Vector stores behind MemoryStream: ChromaDB or an in-process NumPy matrix.
+
+Both backends expose the small collection interface MemoryStream uses
+(get / add / upsert / delete / query / count, Chroma-shaped results), so a
+stream works the same on either.
+"""
+import atexit
+import json
+import numbers
+import operator
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import config
+
+# Process-wide pool: one Chroma client per persist dir, one NumPy store per name
+_pool_lock = threading.Lock()
+_clients = {}
+_numpy_stores = {}
+
+# Chroma where-clause comparison operators supported by NumpyBackend
+_OPERATORS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, options: value in options,
+    "$nin": lambda value, options: value not in options,
+}
+
+def matches_where(metadata: dict, where: dict) -> bool:
+    """
+    Chroma where-clause semantics on one metadata dict: field equality,
+    $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin operators, and $and/$or nesting.
+    A missing field never matches.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key not in metadata:
+            return False
+        elif isinstance(condition, dict):
+            if not all(_OPERATORS[op](metadata[key], operand) for op, operand in condition.items()):
+                return False
+        elif metadata[key] != condition:
+            return False
+    return True
+
+def _is_number(value) -> bool:
+    return isinstance(value, numbers.Real)
+
+class _Column:
+    """
+    One metadata field of a NumpyBackend as arrays aligned with its rows,
+    so where clauses on it are array comparisons.
+    Numbers go in numbers (NaN elsewhere); any other value gets a small
+    integer code in codes (-1 elsewhere, i.e. missing or numeric).
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.numbers = np.full(capacity, np.nan)
+        self.codes = np.full(capacity, -1, dtype=np.int64)
+        self.lookup: Dict[object, int] = {}
+
+    def set(self, position: int, value) -> None:
+        if position >= len(self.numbers):
+            grown = max(position + 1, 2 * len(self.numbers))
+            self.numbers = np.concatenate([self.numbers, np.full(grown - len(self.numbers), np.nan)])
+            self.codes = np.concatenate([self.codes, np.full(grown - len(self.codes), -1, dtype=np.int64)])
+        if value is None:
+            self.numbers[position], self.codes[position] = np.nan, -1
+        elif _is_number(value):
+            self.numbers[position], self.codes[position] = value, -1
+        else:
+            self.numbers[position] = np.nan
+            self.codes[position] = self.lookup.setdefault(value, len(self.lookup))
+
+    def move(self, source: int, target: int) -> None:
+        self.numbers[target] = self.numbers[source]
+        self.codes[target] = self.codes[source]
+
+    def present(self, n: int) -> np.ndarray:
+        return ~np.isnan(self.numbers[:n]) | (self.codes[:n] >= 0)
+
+    def isin(self, values, n: int) -> np.ndarray:
+        numeric = [value for value in values if _is_number(value)]
+        codes = [self.lookup[value] for value in values if not _is_number(value) and value in self.lookup]
+        return np.isin(self.numbers[:n], numeric) | np.isin(self.codes[:n], codes)
+
+def get_client(path: Optional[str] = None):
+    """Shared PersistentClient for path (default: config.CHROMA_PERSIST_DIR)."""
+    import chromadb  # Only needed for the Chroma backend
+
+    path = path or config.CHROMA_PERSIST_DIR
+    with _pool_lock:
+        if path not in _clients:
+            _clients[path] = chromadb.PersistentClient(path=path)
+        return _clients[path]
+
+def open_backend(name: str, backend: Optional[str] = None):
+    """
+    Collection name in the configured backend ("chroma" or "numpy",
+    default config.VECTOR_BACKEND). Reopening a name returns the same store.
+    Writes and queries pass precomputed embeddings (see MemoryStream._embed).
+    """
+    backend = backend or config.VECTOR_BACKEND
+    if backend == "chroma":
+        return ChromaBackend(name)
+    if backend == "numpy":
+        key = (config.NUMPY_PERSIST_DIR, name)
+        with _pool_lock:
+            if key not in _numpy_stores:
+                _numpy_stores[key] = NumpyBackend(name, persist_dir=config.NUMPY_PERSIST_DIR)
+            return _numpy_stores[key]
+    raise ValueError(f"Unknown vector backend: {backend}")
+
+@atexit.register
+def flush_backends() -> None:
+    """Save every NumPy store with unsaved writes (runs at interpreter exit)."""
+    with _pool_lock:
+        stores = list(_numpy_stores.values())
+    for store in stores:
+        store.flush()
+
+class ChromaBackend:
+    """
+    Cosine-space Chroma collection on the shared PersistentClient.
+    Opened without an embedding function: callers supply the vectors, so any
+    embedder works and existing collections open unchanged.
+    """
+
+    def __init__(self, name: str):
+        self.collection = get_client().get_or_create_collection(
+            name=name,
+            embedding_function=None,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get(self, ids=None, where=None, include=('metadatas',)):
+        return self.collection.get(ids=ids, where=where, include=list(include))
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        self.collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def flush(self):
+        """Nothing to do: Chroma persists every write."""
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10, where=None):
+        return self.collection.query(
+            query_texts=query_texts,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where
+        )
+
+class NumpyBackend:
+    """
+    Exact cosine search over a contiguous float32 matrix.
+    Rows are L2-normalized on insert, so a query is one matrix-vector
+    product plus partial selection. Where clauses are evaluated on per-field
+    metadata columns (built on first use, kept up to date by writes).
+    With persist_dir the store is saved (np.save + JSON sidecar) by flush(),
+    close() and at interpreter exit, and reloaded on open.
+    """
+
+    def __init__(self, name: str, embedding_fn=None, persist_dir: Optional[str] = None):
+        self.name = name
+        self.embedding_fn = embedding_fn
+        self.persist_dir = persist_dir
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)  # Capacity rows, first count() in use
+        self._columns: Dict[str, _Column] = {}  # Metadata fields used in where clauses
+        self._dirty = False  # Writes not yet saved to persist_dir
+        if persist_dir:
+            self._load()
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _vectors(self, texts: Optional[List[str]], embeddings) -> np.ndarray:
+        """Normalized rows for embeddings (embedded from texts if None)"""
+        if embeddings is None:
+            embeddings = self.embedding_fn(texts)
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Rows already of unit length are kept bit-exact (e.g. vectors imported from an archive)
+        return vectors / np.where((norms == 0) | (np.abs(norms - 1) < 1e-6), 1, norms)
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        size = self.count()
+        if self._matrix.shape[1] != dim:
+            if size:
+                raise ValueError(f"Embedding dimension {dim} does not match store dimension {self._matrix.shape[1]}")
+            self._matrix = np.zeros((0, dim), dtype=np.float32)
+        if size + rows > len(self._matrix):
+            grown = np.zeros((max(size + rows, 2 * len(self._matrix), 16), dim), dtype=np.float32)
+            grown[:size] = self._matrix[:size]
+            self._matrix = grown
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        if not ids:
+            return
+        vectors = self._vectors(documents, embeddings)
+        with self._lock:
+            self._reserve(len(ids), vectors.shape[1])
+            for memory_id, document, metadata, vector in zip(ids, documents, metadatas, vectors):
+                position = self._positions.get(memory_id)
+                if position is None:
+                    position = self.count()
+                    self._positions[memory_id] = position
+                    self._ids.append(memory_id)
+                    self._documents.append(document)
+                    self._metadatas.append(dict(metadata))
+                else:
+                    self._documents[position] = document
+                    self._metadatas[position] = dict(metadata)
+                self._matrix[position] = vector
+                for field, column in self._columns.items():
+                    column.set(position, metadata.get(field))
+            self._dirty = True
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        """Insert new ids (existing ids are left unchanged, as in Chroma)."""
+        with self._lock:
+            keep = [i for i, memory_id in enumerate(ids) if memory_id not in self._positions]
+            if embeddings is not None:
+                embeddings = [embeddings[i] for i in keep]
+            self.upsert([ids[i] for i in keep], [documents[i] for i in keep],
+                        [metadatas[i] for i in keep], embeddings)
+
+    def delete(self, ids):
+        with self._lock:
+            for memory_id in ids:
+                position = self._positions.pop(memory_id, None)
+                if position is None:
+                    continue
+                # Move the last row into the hole so rows stay contiguous
+                last = self.count() - 1
+                if position != last:
+                    moved = self._ids[last]
+                    self._ids[position] = moved
+                    self._documents[position] = self._documents[last]
+                    self._metadatas[position] = self._metadatas[last]
+                    self._matrix[position] = self._matrix[last]
+                    self._positions[moved] = position
+                    for column in self._columns.values():
+                        column.move(last, position)
+                self._ids.pop()
+                self._documents.pop()
+                self._metadatas.pop()
+                self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _column(self, field: str) -> _Column:
+        column = self._columns.get(field)
+        if column is None:
+            column = _Column(max(len(self._matrix), 16))
+            for position, metadata in enumerate(self._metadatas):
+                column.set(position, metadata.get(field))
+            self._columns[field] = column
+        return column
+
+    def _mask(self, where: dict) -> np.ndarray:
+        """Rows matching a where clause (matches_where semantics, as arrays)."""
+        mask = np.ones(self.count(), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._mask(clause)
+            elif key == "$or":
+                mask &= np.logical_or.reduce([self._mask(clause) for clause in condition],
+                                             initial=False)
+            elif isinstance(condition, dict):
+                for op, operand in condition.items():
+                    mask &= self._compare(key, op, operand)
+            else:
+                mask &= self._compare(key, "$eq", condition)
+        return mask
+
+    def _compare(self, field: str, op: str, operand) -> np.ndarray:
+        n = self.count()
+        column = self._column(field)
+        if op == "$eq":
+            return column.isin([operand], n)
+        if op == "$ne":
+            return column.present(n) & ~column.isin([operand], n)
+        if op == "$in":
+            return column.isin(operand, n)
+        if op == "$nin":
+            return column.present(n) & ~column.isin(operand, n)
+        if _is_number(operand):
+            with np.errstate(invalid="ignore"):
+                return _OPERATORS[op](column.numbers[:n], operand)  # NaN (missing) never matches
+        # Ordering on non-numbers: per row, as matches_where does
+        return np.fromiter((matches_where(metadata, {field: {op: operand}}) for metadata in self._metadatas),
+                           dtype=bool, count=n)
+
+    def _matching(self, where: Optional[dict]) -> np.ndarray:
+        """Row positions whose metadata matches the where clause."""
+        if not where:
+            return np.arange(self.count())
+        return np.flatnonzero(self._mask(where))
+
+    def get(self, ids=None, where=None, include=('metadatas',)):
+        with self._lock:
+            if ids is not None:
+                positions = [self._positions[i] for i in ids if i in self._positions]
+            else:
+                positions = self._matching(where).tolist()
+            result = {
+                "ids": [self._ids[i] for i in positions],
+                "documents": [self._documents[i] for i in positions],
+                "metadatas": [self._metadatas[i] for i in positions]
+            }
+            if "embeddings" in include:
+                result["embeddings"] = self._matrix[positions]  # Normalized rows (a copy)
+            return result
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10, where=None):
+        queries = self._vectors(query_texts, query_embeddings)
+        with self._lock:
+            positions = self._matching(where)
+            result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            if len(positions) == 0:
+                for key in result:
+                    result[key] = [[] for _ in queries]
+                return result
+
+            rows = self._matrix[positions] if where else self._matrix[:self.count()]
+            similarity = queries @ rows.T  # (queries, rows) cosine similarity
+            n = min(n_results, len(positions))
+            for scores in similarity:
+                top = np.argpartition(-scores, n - 1)[:n] if n < len(scores) else np.arange(len(scores))
+                top = top[np.argsort(-scores[top], kind="stable")]
+                hits = positions[top]
+                result["ids"].append([self._ids[i] for i in hits])
+                result["documents"].append([self._documents[i] for i in hits])
+                result["metadatas"].append([self._metadatas[i] for i in hits])
+                result["distances"].append((1.0 - scores[top]).tolist())
+            return result
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _paths(self):
+        base = os.path.join(self.persist_dir, self.name)
+        return base + ".npy", base + ".json"
+
+    def flush(self) -> None:
+        """Save unsaved writes to persist_dir (no-op without one)."""
+        with self._lock:
+            if self._dirty and self.persist_dir:
+                self._save()
+            self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+
+    def _save(self) -> None:
+        os.makedirs(self.persist_dir, exist_ok=True)
+        matrix_path, meta_path = self._paths()
+        # Write to temp files first so a crash never leaves a half-written store
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, self._matrix[:self.count()])
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas},
+                      f, ensure_ascii=False)
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def _load(self) -> None:
+        matrix_path, meta_path = self._paths()
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._matrix = np.ascontiguousarray(np.load(matrix_path), dtype=np.float32)
+        self._ids = data["ids"]
+        self._documents = data["documents"]
+        self._metadatas = data["metadatas"]
+        self._positions = {memory_id: i for i, memory_id in enumerate(self._ids)}